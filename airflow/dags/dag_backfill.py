@@ -0,0 +1,153 @@
+"""
+Airflow DAG: Date-Range Backfill
+
+Rebuilds a historical date range of the date-keyed raw tables (orders and
+their lines, shipments, returns, waste, quality inspections). Triggered
+manually with a `start_date`/`end_date` window, it fans out one mapped task
+group per date partition:
+
+    generate (data_generators/backfill.py --date) -> load (ingest.py --date)
+
+A partition is generated deterministically from its date and its load
+replaces exactly that date in the warehouse, so partitions are independent,
+retry on their own and can be re-run safely. Generation fans out to
+`BACKFILL_CONCURRENCY` tasks at once, but loads run one at a time: each is a
+DELETE + INSERT on the same raw tables, and concurrent writers to one table
+conflict on Databricks (and contend on the other warehouses). A year's
+backfill therefore takes roughly 365 loads back to back, with generation
+running ahead of them. Loads also share the `warehouse_ingestion` pool with
+`data_ingestion`.
+
+Backfills write the partitioned layout (see generate_all.py --partitioned)
+to their own directory, `<project_root>/backfill_data`, and load it with
+`--layout partitioned`. The daily `data_ingestion` DAG reads `sample_data`
+in the configured layout, so it never picks up backfilled partitions.
+
+Trigger with:
+    airflow dags trigger data_backfill \
+        --conf '{"start_date": "2024-01-01", "end_date": "2024-12-31"}'
+"""
+
+from datetime import date, timedelta
+from airflow import DAG
+from airflow.decorators import task_group
+from airflow.operators.python import PythonOperator
+from airflow.operators.bash import BashOperator
+from airflow.operators.empty import EmptyOperator
+from airflow.utils.dates import days_ago
+
+from pipeline_datasets import raw_table_dataset
+from pipeline_metrics import record_dag_run
+
+# Date-keyed raw tables rebuilt by a backfill. They load in one ingest.py
+# run, which puts order_lines before orders (ingestion/common.py load_order)
+BACKFILL_TABLES = ['order_lines', 'orders', 'shipments', 'returns', 'waste', 'quality_inspections']
+
+# Where backfills write their date partitions, apart from the daily data
+BACKFILL_DATA_PATH = '{{ var.value.project_root }}/backfill_data'
+
+# Maximum generate/load tasks running at once across all partitions
+BACKFILL_CONCURRENCY = 8
+
+# Loads running at once: they all replace rows in the same tables
+MAX_CONCURRENT_LOADS = 1
+
+# Longest window accepted in one run
+MAX_BACKFILL_DAYS = 3 * 365
+
+INGESTION_POOL = 'warehouse_ingestion'
+
+# Default arguments
+default_args = {
+    'owner': 'data_engineering',
+    'depends_on_past': False,
+    'email': ['data-team@example.com'],
+    'email_on_failure': True,
+    'email_on_retry': False,
+    'retries': 2,  # Per partition task
+    'retry_delay': timedelta(minutes=5),
+}
+
+# DAG definition
+dag = DAG(
+    'data_backfill',
+    default_args=default_args,
+    description='Regenerate and reload a historical date range, partition by partition',
+    schedule=None,  # Triggered manually
+    start_date=days_ago(1),
+    catchup=False,
+    max_active_runs=1,
+    max_active_tasks=BACKFILL_CONCURRENCY,
+    params={'start_date': None, 'end_date': None},
+    on_success_callback=record_dag_run,  # Task timings + critical path
+    on_failure_callback=record_dag_run,
+    tags=['ingestion', 'backfill'],
+)
+
+# Task: Expand the requested window into date partitions
+def list_backfill_partitions(**context):
+    """Return the window's days (YYYY-MM-DD); defaults to yesterday."""
+    params = context['params']
+    yesterday = (context['logical_date'] - timedelta(days=1)).date()
+    start = date.fromisoformat(params['start_date']) if params.get('start_date') else yesterday
+    end = date.fromisoformat(params['end_date']) if params.get('end_date') else start
+
+    if end < start:
+        raise ValueError(f"end_date {end} is before start_date {start}")
+    num_days = (end - start).days + 1
+    if num_days > MAX_BACKFILL_DAYS:
+        raise ValueError(f"Backfill window of {num_days} days exceeds {MAX_BACKFILL_DAYS}; split it up")
+
+    print(f"Backfilling {num_days} partitions from {start} to {end}")
+    return [(start + timedelta(days=d)).isoformat() for d in range(num_days)]
+
+list_partitions = PythonOperator(
+    task_id='list_partitions',
+    python_callable=list_backfill_partitions,
+    dag=dag,
+)
+
+# Task group: Generate one date partition, then load it.
+# Mapped over the window; each instance retries independently.
+@task_group(group_id='backfill_partition')
+def backfill_partition(day):
+    """Generate and load one date partition."""
+    generate = BashOperator(
+        task_id='generate',
+        bash_command='''
+            cd {{ var.value.project_root }}/data_generators && \
+            python backfill.py --date "$DAY" --output-dir ''' + BACKFILL_DATA_PATH + ''' --workers 1
+        ''',
+        env={'DAY': day},
+        append_env=True,
+    )
+
+    load = BashOperator(
+        task_id='load',
+        bash_command='''
+            cd {{ var.value.project_root }}/ingestion && \
+            python ingest.py {{ var.value.config_path }} --platform {{ var.value.platform }} --date "$DAY" \
+                --data-path ''' + BACKFILL_DATA_PATH + ''' --layout partitioned \
+                ''' + ' '.join(f'--table {table}' for table in BACKFILL_TABLES),
+        env={'DAY': day},
+        append_env=True,
+        pool=INGESTION_POOL,
+        max_active_tis_per_dag=MAX_CONCURRENT_LOADS,
+        retries=3,
+        retry_exponential_backoff=True,
+    )
+
+    generate >> load
+
+with dag:
+    partitions = backfill_partition.expand(day=list_partitions.output)
+
+# Task: Mark the backfilled raw tables as updated
+backfill_complete = EmptyOperator(
+    task_id='backfill_complete',
+    outlets=[raw_table_dataset(table) for table in BACKFILL_TABLES],
+    dag=dag,
+)
+
+# Define task dependencies
+partitions >> backfill_complete
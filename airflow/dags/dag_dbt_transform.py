@@ -2,12 +2,85 @@
 Airflow DAG: dbt Transformation
 
 Orchestrates dbt models to transform raw data into analytics-ready marts.
+
+Triggered by data: runs once `data_ingestion` has updated every raw table
+dataset, and updates the marts dataset that triggers `data_quality_checks`.
+
+The task graph is generated from `dbt_project/target/manifest.json`: one
+task per model (`models.<name>`), per snapshot (`snapshots.<name>`, the
+SCD Type 2 customer/product history) and per test (`tests.<name>`), wired
+by the nodes' real ref() dependencies, so a slow or failed model only holds
+up its own descendants and retries on its own. The parsed graph is cached
+(see dbt_manifest.py), and `dbt_select_nodes` re-parses the project each
+run so model changes show up on the next DAG parse. Without a manifest the
+DAG falls back to a single `dbt build`.
+
+Fixed per-run overhead is kept down (see dbt_runtime.py): `dbt_deps`
+installs packages from a cache keyed by packages.yml, `dbt_select_nodes`
+runs connection check, parse, source freshness and selection in one dbt
+process, and model/test tasks start from the persisted partial parse state.
+
+Runs are selective: `dbt_select_nodes` picks the descendants of sources
+with new data (`source:raw.<table>+`, from source freshness) plus
+`state:modified+` against the manifest saved by the last successful run
+(see dbt_state.py). Every other model/test task skips itself, and the
+selected and skipped nodes are logged to `dbt_project/state/`.
+
+Every run's per-model execution times are recorded by `dbt_record_timings`
+(see dbt_run_metrics.py), which reports regressions and the critical path
+through the model graph.
+
+Incremental models (fact_sales, and the large staging models with
+`incremental_staging`) only reprocess recent changes. Trigger with
+`--conf '{"full_refresh": true}'` to rebuild every model from scratch.
 """
 
+import os
 from datetime import datetime, timedelta
 from airflow import DAG
+from airflow.models import Variable
 from airflow.operators.bash import BashOperator
+from airflow.operators.empty import EmptyOperator
+from airflow.operators.python import PythonOperator
 from airflow.utils.dates import days_ago
+from airflow.utils.task_group import TaskGroup
+
+from pipeline_datasets import RAW_TABLES, RAW_TABLE_DATASETS, MARTS_DATASET
+from dbt_manifest import load_dbt_graph
+from dbt_state import select_nodes, record_selection, save_state
+from dbt_runtime import NODE_PARTIAL_PARSE, DbtSession, ensure_packages
+from pipeline_metrics import record_dag_run
+from dbt_run_metrics import record_dbt_run, format_report
+from run_history import DEFAULT_THRESHOLD_PCT
+
+# Maximum dbt model/test tasks running at once
+DBT_MAX_PARALLEL = 8
+
+# Read at parse time; set AIRFLOW_VAR_PROJECT_ROOT in the scheduler
+# environment to avoid a metadata database lookup on every parse
+PROJECT_ROOT = Variable.get('project_root', default_var=None)
+
+DBT_CD = 'cd {{ var.value.project_root }}/dbt_project && '
+
+# Each node task writes to its own target path so concurrent dbt processes
+# do not overwrite each other's run_results.json / partial parse state; each
+# starts from a copy of the project's partial parse state (NODE_PARTIAL_PARSE)
+DBT_NODE_FLAGS = '--target-path target/airflow/{{ ti.task_id }}'
+
+# Rebuilds incremental models from scratch when triggered with full_refresh
+DBT_FULL_REFRESH_FLAG = "{{ '--full-refresh' if params.full_refresh else '' }}"
+
+
+def selective_command(node, command):
+    """Wrap a node command so it only runs if `dbt_select_nodes` selected it.
+
+    Exit code 99 marks the task as skipped (BashOperator skip_on_exit_code).
+    """
+    return (
+        f"{{% if '{node}' in ti.xcom_pull(task_ids='dbt_select_nodes')['selected'] %}}"
+        f"{command}"
+        f"{{% else %}}echo 'Not affected by new data or code changes, skipping'; exit 99{{% endif %}}"
+    )
 
 # Default arguments
 default_args = {
@@ -16,7 +89,7 @@ default_args = {
     'email': ['data-team@example.com'],
     'email_on_failure': True,
     'email_on_retry': False,
-    'retries': 2,
+    'retries': 2,  # Per model / test task
     'retry_delay': timedelta(minutes=5),
 }
 
@@ -25,92 +98,186 @@ dag = DAG(
     'dbt_transformation',
     default_args=default_args,
     description='Run dbt transformations to create analytics marts',
-    schedule_interval='0 3 * * *',  # Daily at 3 AM (after ingestion)
+    schedule=RAW_TABLE_DATASETS,  # When every raw table has been ingested
     start_date=days_ago(1),
     catchup=False,
+    max_active_tasks=DBT_MAX_PARALLEL,
+    params={'full_refresh': False},
+    on_success_callback=record_dag_run,  # Task timings + critical path
+    on_failure_callback=record_dag_run,
     tags=['dbt', 'transformation', 'marts'],
 )
 
-# Task: Install dbt dependencies
-dbt_deps = BashOperator(
+# Task: Install dbt packages, from the cache unless packages.yml changed
+def install_dbt_packages(**context):
+    """Install dbt_packages/ from the content-addressed cache."""
+    project_dir = f"{context['var']['value'].project_root}/dbt_project"
+    print(f"dbt packages: {ensure_packages(project_dir)}")
+
+dbt_deps = PythonOperator(
     task_id='dbt_deps',
-    bash_command='cd {{ var.value.project_root }}/dbt_project && dbt deps',
+    python_callable=install_dbt_packages,
     dag=dag,
 )
 
-# Task: Run dbt debug to verify connection
-dbt_debug = BashOperator(
-    task_id='dbt_debug',
-    bash_command='cd {{ var.value.project_root }}/dbt_project && dbt debug',
-    dag=dag,
-)
+# Task: Check the connection, parse, check source freshness and select the
+# models/tests affected by new data or code changes, in one dbt process
+def select_dbt_nodes(**context):
+    """Prepare the run and work out which nodes to run this time."""
+    project_dir = f"{context['var']['value'].project_root}/dbt_project"
+    session = DbtSession(project_dir)
+    session.invoke(['debug', '--connection'])
+    session.parse()  # Refreshes target/manifest.json for the next DAG parse
+    
+    # A source whose freshness query fails gets no max_loaded_at in
+    # sources.json, so it counts as changed and its models are rebuilt
+    # (dbt_state.changed_sources). A stale sources.json must not stand in
+    # for this run's results.
+    sources_path = f"{project_dir}/target/sources.json"
+    if os.path.exists(sources_path):
+        os.remove(sources_path)
+    try:
+        session.invoke(['source', 'freshness'])
+    except Exception as e:
+        print(f"  Note: Source freshness failed, rebuilding the affected sources: {e}")
+    
+    graph = load_dbt_graph(project_dir)
+    if graph is None:
+        return {'changed_sources': RAW_TABLES, 'selected': [], 'skipped': []}
+    
+    full_refresh = bool(context['params'].get('full_refresh'))
+    selection = select_nodes(project_dir, graph, RAW_TABLES, session, full_refresh)
+    record_selection(project_dir, context['run_id'], selection)
+    
+    print(f"Sources with new data: {selection['changed_sources'] or 'none'}")
+    print(f"Selected {len(selection['selected'])} nodes, skipping {len(selection['skipped'])}")
+    for node in selection['skipped']:
+        print(f"  skip: {node}")
+    return selection
 
-# Task: Run staging models
-dbt_run_staging = BashOperator(
-    task_id='dbt_run_staging',
-    bash_command='cd {{ var.value.project_root }}/dbt_project && dbt run --models staging',
+dbt_select_nodes = PythonOperator(
+    task_id='dbt_select_nodes',
+    python_callable=select_dbt_nodes,
     dag=dag,
 )
 
-# Task: Test staging models
-dbt_test_staging = BashOperator(
-    task_id='dbt_test_staging',
-    bash_command='cd {{ var.value.project_root }}/dbt_project && dbt test --models staging',
+# Task: Mark the marts as updated once every model and test has passed
+marts_complete = EmptyOperator(
+    task_id='marts_complete',
+    outlets=[MARTS_DATASET],
+    trigger_rule='none_failed',  # Skipped (unaffected) nodes are fine
     dag=dag,
 )
 
-# Task: Run core mart models (dimensions and facts)
-dbt_run_marts_core = BashOperator(
-    task_id='dbt_run_marts_core',
-    bash_command='cd {{ var.value.project_root }}/dbt_project && dbt run --models marts.core',
-    dag=dag,
-)
+# Task: Save manifest + source freshness as the baseline for the next run
+def save_dbt_state(**context):
+    """Save the state the next run's selection is compared against."""
+    save_state(f"{context['var']['value'].project_root}/dbt_project")
 
-# Task: Test core mart models
-dbt_test_marts_core = BashOperator(
-    task_id='dbt_test_marts_core',
-    bash_command='cd {{ var.value.project_root }}/dbt_project && dbt test --models marts.core',
+dbt_save_state = PythonOperator(
+    task_id='dbt_save_state',
+    python_callable=save_dbt_state,
     dag=dag,
 )
 
-# Task: Run metrics models
-dbt_run_metrics = BashOperator(
-    task_id='dbt_run_metrics',
-    bash_command='cd {{ var.value.project_root }}/dbt_project && dbt run --models marts.metrics',
-    dag=dag,
-)
+# Task: Record per-model timings, regressions and the critical path
+def record_dbt_timings(**context):
+    """Record the run_results.json every node task of this run wrote."""
+    project_root = context['var']['value'].project_root
+    dag_run = context['dag_run']
+    path = Variable.get(
+        'dbt_run_metrics_path',
+        default_var=f'{project_root}/monitoring/dbt_run_metrics.db'
+    )
+    threshold_pct = float(Variable.get('dbt_regression_threshold_pct', default_var=DEFAULT_THRESHOLD_PCT))
+    report = record_dbt_run(
+        f'{project_root}/dbt_project', path, threshold_pct,
+        since=dag_run.start_date,  # Skip results left by skipped tasks
+        invocation_id=f'{dag_run.dag_id}/{dag_run.run_id}',
+    )
+    if report is None:
+        print("No dbt nodes ran")
+        return
+    print(format_report(report))
 
-# Task: Test metrics models
-dbt_test_metrics = BashOperator(
-    task_id='dbt_test_metrics',
-    bash_command='cd {{ var.value.project_root }}/dbt_project && dbt test --models marts.metrics',
+dbt_record_timings = PythonOperator(
+    task_id='dbt_record_timings',
+    python_callable=record_dbt_timings,
+    trigger_rule='all_done',  # Failed runs are timed too
     dag=dag,
 )
 
 # Task: Generate dbt documentation
 dbt_docs_generate = BashOperator(
     task_id='dbt_docs_generate',
-    bash_command='cd {{ var.value.project_root }}/dbt_project && dbt docs generate',
+    bash_command=DBT_CD + 'dbt docs generate',
     dag=dag,
 )
 
-# Task: Run source freshness checks
-dbt_source_freshness = BashOperator(
-    task_id='dbt_source_freshness',
-    bash_command='cd {{ var.value.project_root }}/dbt_project && dbt source freshness',
-    dag=dag,
-)
+dbt_graph = load_dbt_graph(f'{PROJECT_ROOT}/dbt_project') if PROJECT_ROOT else None
+
+if dbt_graph:
+    # Tasks: One task per model, wired by ref() dependencies
+    node_tasks = {}
+    with TaskGroup('models', dag=dag):
+        for model in dbt_graph['models']:
+            node_tasks[model] = BashOperator(
+                task_id=model,
+                bash_command=selective_command(
+                    model, DBT_CD + NODE_PARTIAL_PARSE + f'dbt run --select {model} ' + DBT_NODE_FLAGS + ' ' + DBT_FULL_REFRESH_FLAG
+                ),
+                trigger_rule='none_failed',
+                dag=dag,
+            )
+
+    # Tasks: One task per snapshot (SCD Type 2 history), between the
+    # staging models it reads and the dimensions built from it
+    with TaskGroup('snapshots', dag=dag):
+        for snapshot in dbt_graph['snapshots']:
+            node_tasks[snapshot] = BashOperator(
+                task_id=snapshot,
+                bash_command=selective_command(
+                    snapshot, DBT_CD + NODE_PARTIAL_PARSE + f'dbt snapshot --select {snapshot} ' + DBT_NODE_FLAGS
+                ),
+                trigger_rule='none_failed',
+                dag=dag,
+            )
+
+    for node, upstream in {**dbt_graph['models'], **dbt_graph['snapshots']}.items():
+        if upstream:
+            [node_tasks[u] for u in upstream] >> node_tasks[node]
+        else:
+            dbt_select_nodes >> node_tasks[node]
+        node_tasks[node] >> marts_complete
 
-# Task: Snapshot models (if any SCD Type 2 dimensions)
-# dbt_snapshot = BashOperator(
-#     task_id='dbt_snapshot',
-#     bash_command='cd {{ var.value.project_root }}/dbt_project && dbt snapshot',
-#     dag=dag,
-# )
+    # Tasks: One task per test, after every model it touches
+    with TaskGroup('tests', dag=dag):
+        for test, tested_models in dbt_graph['tests'].items():
+            test_task = BashOperator(
+                task_id=test,
+                bash_command=selective_command(
+                    test, DBT_CD + NODE_PARTIAL_PARSE + f'dbt test --select {test} ' + DBT_NODE_FLAGS
+                ),
+                trigger_rule='none_failed',
+                dag=dag,
+            )
+            if tested_models:
+                [node_tasks[m] for m in tested_models] >> test_task
+            else:
+                dbt_select_nodes >> test_task
+            test_task >> marts_complete
+else:
+    # Task: No manifest yet, build everything in one dbt invocation
+    dbt_build = BashOperator(
+        task_id='dbt_build',
+        bash_command=DBT_CD + 'dbt build ' + DBT_FULL_REFRESH_FLAG,
+        dag=dag,
+    )
+    dbt_select_nodes >> dbt_build >> marts_complete
 
 # Define task dependencies
-dbt_deps >> dbt_debug >> dbt_source_freshness
-dbt_source_freshness >> dbt_run_staging >> dbt_test_staging
-dbt_test_staging >> dbt_run_marts_core >> dbt_test_marts_core
-dbt_test_marts_core >> dbt_run_metrics >> dbt_test_metrics
-dbt_test_metrics >> dbt_docs_generate
+dbt_deps >> dbt_select_nodes
+marts_complete >> dbt_save_state
+marts_complete >> dbt_record_timings
+# docs generate rewrites target/run_results.json, which the timings read
+[marts_complete, dbt_record_timings] >> dbt_docs_generate
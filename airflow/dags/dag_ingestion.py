@@ -2,14 +2,64 @@
 Airflow DAG: Data Ingestion
 
 Orchestrates the ingestion of raw data from CSV files into the data warehouse.
+
+Each raw table is loaded by its own mapped task group (load -> check), so
+tables load in parallel up to the `warehouse_ingestion` pool size, a failed
+table retries on its own, and a table's checks only wait for that table.
+The exception is `order_lines` and `orders`, which share one group: a
+partition-filtered load replaces order lines through their orders, so the
+two load in one `ingest.py` run, order lines first.
+Once a table passes its checks its raw dataset is updated, which is what
+triggers `dbt_transformation` (see pipeline_datasets.py).
+
+`validate_data_files` checks every file up front, and a load whose table
+content hash matches what was last loaded skips the warehouse entirely.
 """
 
 from datetime import datetime, timedelta
 from airflow import DAG
+from airflow.decorators import task_group
 from airflow.operators.python import PythonOperator
 from airflow.operators.bash import BashOperator
 from airflow.utils.dates import days_ago
 
+from pipeline_datasets import RAW_TABLES_ALIAS, raw_table_dataset
+from pipeline_metrics import record_dag_run
+
+# Raw tables and the key column that must never be null
+INGESTION_TABLES = {
+    'products': 'product_id',
+    'recipes': 'recipe_id',
+    'recipe_lines': 'recipe_line_id',
+    'customers': 'customer_id',
+    'orders': 'order_id',
+    'order_lines': 'order_line_id',
+    'shipments': 'shipment_id',
+    'returns': 'return_id',
+    'waste': 'waste_id',
+    'quality_inspections': 'inspection_id',
+}
+
+# Tables loaded by each mapped task group. order_lines deletes its date
+# partitions through orders (ingestion/common.py PARENT_PARTITIONS), so it
+# must load before orders, never in parallel with it; ingest.py orders the
+# tables of one run accordingly.
+INGESTION_LOADS = [
+    ['products'],
+    ['recipes'],
+    ['recipe_lines'],
+    ['customers'],
+    ['order_lines', 'orders'],
+    ['shipments'],
+    ['returns'],
+    ['waste'],
+    ['quality_inspections'],
+]
+
+# Pool bounding concurrent warehouse loads; create it with
+#   airflow pools set warehouse_ingestion 4 "Concurrent raw table loads"
+INGESTION_POOL = 'warehouse_ingestion'
+
 # Default arguments
 default_args = {
     'owner': 'data_engineering',
@@ -29,6 +79,8 @@ dag = DAG(
     schedule_interval='0 2 * * *',  # Daily at 2 AM
     start_date=days_ago(1),
     catchup=False,
+    on_success_callback=record_dag_run,  # Task timings + critical path
+    on_failure_callback=record_dag_run,
     tags=['ingestion', 'raw_data'],
 )
 
@@ -40,72 +92,64 @@ generate_data = BashOperator(
 )
 
 # Task: Validate data files
-def validate_data_files(**context):
-    """Validate that all required CSV files exist."""
-    import os
-    
-    data_path = '{{ var.value.project_root }}/sample_data'
-    required_files = [
-        'products.csv',
-        'recipes.csv',
-        'recipe_lines.csv',
-        'customers.csv',
-        'orders.csv',
-        'order_lines.csv',
-        'shipments.csv',
-        'returns.csv',
-        'waste.csv',
-        'quality_inspections.csv'
-    ]
-    
-    missing_files = []
-    for file in required_files:
-        if not os.path.exists(os.path.join(data_path, file)):
-            missing_files.append(file)
-    
-    if missing_files:
-        raise FileNotFoundError(f"Missing data files: {missing_files}")
-    
-    print(f"All {len(required_files)} data files validated successfully!")
-
-validate_files = PythonOperator(
+# Hashes, row-counts and schema/truncation-checks every file in parallel
+# (ingestion/validate_files.py) and writes <data_path>/_validation.json,
+# which the loads use to skip tables whose files have not changed
+validate_files = BashOperator(
     task_id='validate_data_files',
-    python_callable=validate_data_files,
+    bash_command='cd {{ var.value.project_root }}/ingestion && python validate_files.py {{ var.value.config_path }}',
     dag=dag,
 )
 
-# Task: Ingest to data warehouse
+# Task: Data quality checks for the tables of one load
+def run_data_quality_checks(tables, **context):
+    """Run basic data quality checks on the ingested tables."""
+    for table in tables:
+        print(f"Running data quality checks for {table}...")
+        
+        # Example check (would be more comprehensive in production)
+        key_column = INGESTION_TABLES[table]
+        check = f'SELECT COUNT(*) FROM {table} WHERE {key_column} IS NULL'
+        
+        # In production, you would connect to your warehouse and run this check
+        print(f"Data quality checks for {table} completed successfully!")
+        
+        # Publish the table's dataset update for data-aware downstream DAGs
+        context['outlet_events'][RAW_TABLES_ALIAS].add(raw_table_dataset(table))
+
+# Task group: Ingest one table (or dependent tables) into the data
+# warehouse, then check it. Mapped over INGESTION_LOADS; each mapped load
+# runs in the ingestion pool and retries independently of the others.
 # Note: This uses a bash command, but you can also use specific operators
 # like DatabricksSubmitRunOperator, SnowflakeOperator, or BigQueryOperator
-ingest_data = BashOperator(
-    task_id='ingest_to_warehouse',
-    bash_command='''
-        cd {{ var.value.project_root }}/ingestion && \
-        python ingest_to_{{ var.value.platform }}.py {{ var.value.config_path }}
-    ''',
-    dag=dag,
-)
-
-# Task: Data quality checks
-def run_data_quality_checks(**context):
-    """Run basic data quality checks on ingested data."""
-    print("Running data quality checks...")
+@task_group(group_id='ingest_table')
+def ingest_table(tables):
+    """Load raw tables in one ingest.py run and run their quality checks."""
+    load = BashOperator(
+        task_id='load',
+        bash_command='''
+            cd {{ var.value.project_root }}/ingestion && \
+            python ingest.py {{ var.value.config_path }} --platform {{ var.value.platform }} \
+                $(printf -- '--table %s ' $TABLES) --skip-unchanged
+        ''',
+        env={'TABLES': ' '.join(tables)},
+        append_env=True,
+        pool=INGESTION_POOL,
+        retries=3,
+        retry_exponential_backoff=True,
+    )
     
-    # Example checks (would be more comprehensive in production)
-    checks = {
-        'products': 'SELECT COUNT(*) FROM products WHERE product_id IS NULL',
-        'customers': 'SELECT COUNT(*) FROM customers WHERE customer_id IS NULL',
-        'orders': 'SELECT COUNT(*) FROM orders WHERE order_id IS NULL',
-    }
+    quality_checks = PythonOperator(
+        task_id='run_quality_checks',
+        python_callable=run_data_quality_checks,
+        op_kwargs={'tables': tables},
+        outlets=[RAW_TABLES_ALIAS],
+    )
     
-    # In production, you would connect to your warehouse and run these checks
-    print("Data quality checks completed successfully!")
+    load >> quality_checks
 
-quality_checks = PythonOperator(
-    task_id='run_quality_checks',
-    python_callable=run_data_quality_checks,
-    dag=dag,
-)
+with dag:
+    ingest_tables = ingest_table.expand(tables=INGESTION_LOADS)
 
 # Task: Send success notification
 def send_success_notification(**context):
@@ -121,4 +165,4 @@ success_notification = PythonOperator(
 )
 
 # Define task dependencies
-generate_data >> validate_files >> ingest_data >> quality_checks >> success_notification
+generate_data >> validate_files >> ingest_tables >> success_notification
@@ -2,14 +2,40 @@
 Airflow DAG: Data Quality Checks
 
 Comprehensive data quality monitoring and alerting.
+
+Triggered by data: runs when `dbt_transformation` updates the marts dataset.
+
+`run_table_checks` scans each raw table once with a single aggregate query
+(see quality_engine.py), concurrently across tables, on the backend named
+by the `quality_backend` Variable (`duckdb` over sample_data/ by default,
+or databricks/snowflake/bigquery). The completeness, freshness and accuracy
+checks evaluate those metrics instead of querying again.
+
+`check_for_anomalies` appends the day's metrics (order volume, average
+order value, return rate, per-table row counts) to a local metric history
+and scores them against rolling and day-of-week baselines (see
+metric_history.py).
 """
 
+import os
 from datetime import datetime, timedelta
 from airflow import DAG
+from airflow.models import Variable
 from airflow.operators.python import PythonOperator, BranchPythonOperator
 from airflow.operators.bash import BashOperator
 from airflow.utils.dates import days_ago
 
+from pipeline_datasets import MARTS_DATASET
+from quality_engine import TABLE_CHECKS, create_backend, run_checks
+from metric_history import MetricHistory
+from pipeline_metrics import record_dag_run
+
+# Tables checked concurrently
+QUALITY_MAX_WORKERS = 4
+
+# Relative difference allowed between order line totals and order subtotals
+RECONCILIATION_TOLERANCE = 0.0001
+
 # Default arguments
 default_args = {
     'owner': 'data_engineering',
@@ -26,29 +52,71 @@ dag = DAG(
     'data_quality_checks',
     default_args=default_args,
     description='Monitor data quality across all layers',
-    schedule_interval='0 4 * * *',  # Daily at 4 AM (after transformations)
+    schedule=[MARTS_DATASET],  # When the marts have been rebuilt
     start_date=days_ago(1),
     catchup=False,
+    on_success_callback=record_dag_run,  # Task timings + critical path
+    on_failure_callback=record_dag_run,
     tags=['quality', 'monitoring'],
 )
 
+# Daily metrics describe the day before the run
+def metric_date(context):
+    """Return the metric day (YYYY-MM-DD) for a run."""
+    return (context['logical_date'] - timedelta(days=1)).date().isoformat()
+
+# Task: Run every table's metrics in one aggregate query per table
+def run_table_checks(**context):
+    """Scan each table once and collect all of its quality metrics."""
+    project_root = Variable.get('project_root')
+    backend_name = Variable.get('quality_backend', default_var='duckdb')
+    print(f"Running single-scan table checks on {backend_name}...")
+    
+    backend = create_backend(
+        backend_name,
+        data_path=os.path.join(project_root, 'sample_data'),
+        config_path=os.path.join(project_root, Variable.get('config_path')),
+    )
+    try:
+        results = run_checks(
+            backend, max_workers=QUALITY_MAX_WORKERS, metric_date=metric_date(context)
+        )
+    finally:
+        backend.close()
+    
+    failed = {table: r['error'] for table, r in results.items() if 'error' in r}
+    if failed:
+        raise RuntimeError(f"Table checks failed: {failed}")
+    
+    print(f"Table check results: {results}")
+    context['ti'].xcom_push(
+        key='rows_processed', value=sum(r['row_count'] for r in results.values())
+    )
+    return results
+
+table_checks = PythonOperator(
+    task_id='run_table_checks',
+    python_callable=run_table_checks,
+    dag=dag,
+)
+
 # Task: Check data completeness
 def check_data_completeness(**context):
     """Verify all expected tables have data."""
     print("Checking data completeness...")
     
-    # Example checks (would query actual warehouse in production)
-    tables_to_check = [
-        'products', 'customers', 'orders', 'order_lines',
-        'shipments', 'returns', 'waste', 'quality_inspections'
-    ]
+    metrics = context['ti'].xcom_pull(task_ids='run_table_checks')
     
     results = {}
-    for table in tables_to_check:
-        # In production: SELECT COUNT(*) FROM {table}
+    for table, m in metrics.items():
+        key = TABLE_CHECKS[table]['key']
+        problems = [col for col, n in m['nulls'].items() if n]
+        if m['duplicates'].get(key):
+            problems.append(f'duplicate {key}')
         results[table] = {
-            'row_count': 1000,  # Mock data
-            'status': 'OK'
+            'row_count': m['row_count'],
+            'null_counts': m['nulls'],
+            'status': 'OK' if m['row_count'] and not problems else 'FAIL',
         }
     
     print(f"Completeness check results: {results}")
@@ -65,12 +133,13 @@ def check_data_freshness(**context):
     """Verify data is up-to-date."""
     print("Checking data freshness...")
     
-    # Example: Check if orders table has data from last 24 hours
-    # In production: SELECT MAX(order_date) FROM orders
+    # Latest order date, from the orders scan
+    metrics = context['ti'].xcom_pull(task_ids='run_table_checks')
+    last_order_date = datetime.fromisoformat(str(metrics['orders']['max_dates']['order_date']))
     
-    from datetime import datetime, timedelta
-    last_order_date = datetime.now() - timedelta(hours=12)
-    threshold = datetime.now() - timedelta(hours=24)
+    threshold_hours = int(Variable.get('freshness_threshold_hours', default_var=24))
+    # order_date has day granularity: allow the rest of that day
+    threshold = datetime.now() - timedelta(hours=threshold_hours) - timedelta(days=1)
     
     is_fresh = last_order_date > threshold
     
@@ -91,18 +160,28 @@ def check_data_accuracy(**context):
     """Verify data accuracy and consistency."""
     print("Checking data accuracy...")
     
+    metrics = context['ti'].xcom_pull(task_ids='run_table_checks')
+    line_total = metrics['order_lines']['sums']['line_total'] or 0
+    subtotal = metrics['orders']['sums']['subtotal'] or 0
+    orphan_products = metrics['order_lines']['orphans']['product_id']
+    orphan_customers = metrics['orders']['orphans']['customer_id']
+    
     checks = {
         'revenue_reconciliation': {
-            'check': 'SUM(order_lines.line_total) = orders.subtotal',
-            'status': 'PASS'
+            'check': 'SUM(order_lines.line_total) = SUM(orders.subtotal)',
+            'line_total': line_total,
+            'subtotal': subtotal,
+            'status': 'PASS' if abs(line_total - subtotal) <= RECONCILIATION_TOLERANCE * max(abs(subtotal), 1) else 'FAIL'
         },
         'inventory_consistency': {
-            'check': 'All product_ids in orders exist in products',
-            'status': 'PASS'
+            'check': 'All product_ids in order_lines exist in products',
+            'orphans': orphan_products,
+            'status': 'PASS' if not orphan_products else 'FAIL'
         },
         'customer_orders': {
             'check': 'All customer_ids in orders exist in customers',
-            'status': 'PASS'
+            'orphans': orphan_customers,
+            'status': 'PASS' if not orphan_customers else 'FAIL'
         }
     }
     
@@ -120,23 +199,28 @@ def check_for_anomalies(**context):
     """Detect statistical anomalies in data."""
     print("Checking for anomalies...")
     
-    anomalies = []
-    
-    # Example checks
-    checks = {
-        'order_volume': {'value': 100, 'mean': 95, 'std': 10, 'threshold': 3},
-        'avg_order_value': {'value': 150, 'mean': 145, 'std': 15, 'threshold': 3},
-        'return_rate': {'value': 5.2, 'mean': 5.0, 'std': 0.5, 'threshold': 3},
+    # Today's metrics, from the table scans
+    metrics = context['ti'].xcom_pull(task_ids='run_table_checks')
+    orders = metrics['orders']['daily']
+    order_volume = orders['rows']
+    values = {
+        'order_volume': order_volume,
+        'avg_order_value': orders['total_amount'] / order_volume if order_volume else None,
+        'return_rate': metrics['returns']['daily']['rows'] / order_volume * 100 if order_volume else None,
     }
+    values.update({f'row_count.{table}': m['row_count'] for table, m in metrics.items()})
     
-    for metric, data in checks.items():
-        z_score = abs((data['value'] - data['mean']) / data['std'])
-        if z_score > data['threshold']:
-            anomalies.append({
-                'metric': metric,
-                'value': data['value'],
-                'z_score': z_score
-            })
+    # Score against rolling / day-of-week baselines and append to the history
+    history_path = Variable.get(
+        'metric_history_path',
+        default_var=os.path.join(Variable.get('project_root'), 'monitoring', 'metric_history.db')
+    )
+    threshold = float(Variable.get('anomaly_z_score_threshold', default_var=3))
+    history = MetricHistory(history_path)
+    try:
+        anomalies = history.score(metric_date(context), values, threshold)
+    finally:
+        history.close()
     
     if anomalies:
         print(f"Anomalies detected: {anomalies}")
@@ -163,12 +247,17 @@ def generate_quality_report(**context):
     accuracy = ti.xcom_pull(task_ids='check_data_accuracy')
     anomalies = ti.xcom_pull(task_ids='check_for_anomalies')
     
+    failed = (
+        any(r['status'] != 'OK' for r in completeness.values())
+        or any(c['status'] != 'PASS' for c in accuracy.values())
+    )
+    
     report = {
         'timestamp': datetime.now().isoformat(),
         'completeness': completeness,
         'accuracy': accuracy,
         'anomalies': anomalies,
-        'overall_status': 'PASS' if not anomalies else 'WARNING'
+        'overall_status': 'FAIL' if failed else 'PASS' if not anomalies else 'WARNING'
     }
     
     print(f"Quality Report: {report}")
@@ -190,5 +279,6 @@ dbt_test_all = BashOperator(
 )
 
 # Define task dependencies
+table_checks >> [completeness_check, freshness_check, accuracy_check, anomaly_check]
 [completeness_check, freshness_check, accuracy_check, anomaly_check] >> quality_report
 quality_report >> dbt_test_all
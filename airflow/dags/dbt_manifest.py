@@ -0,0 +1,100 @@
+"""
+dbt Manifest Graph
+
+Reads the model/snapshot/test graph from a dbt project's
+`target/manifest.json` for `dag_dbt_transform`, which builds one Airflow
+task per model, snapshot and test.
+
+The manifest can be tens of MB and the scheduler re-parses DAG files every
+few seconds, so the reduced graph is cached next to the manifest in
+`target/airflow_dbt_graph.json`, keyed by the manifest's size and mtime,
+and memoized in-process. The full manifest is only parsed again after
+`dbt parse`/`dbt compile` rewrites it.
+"""
+
+import os
+import json
+
+CACHE_FILE = 'airflow_dbt_graph.json'
+CACHE_VERSION = 2
+
+_memo = {}
+
+
+def _manifest_key(manifest_path):
+    stat = os.stat(manifest_path)
+    return [CACHE_VERSION, stat.st_size, stat.st_mtime_ns]
+
+
+def _project_name(manifest, project_dir):
+    name = manifest.get('metadata', {}).get('project_name')
+    if name:
+        return name
+
+    import yaml
+    with open(os.path.join(project_dir, 'dbt_project.yml'), 'r') as f:
+        return yaml.safe_load(f)['name']
+
+
+def build_graph(manifest, project_name):
+    """Reduce a parsed manifest to this project's models, snapshots and tests.
+
+    Returns `{'models': {name: [upstream model/snapshot names]},
+              'snapshots': {name: [upstream model/snapshot names]},
+              'tests': {name: [tested model/snapshot names]}}`; tests that
+    only touch sources map to an empty list.
+    """
+    nodes = manifest['nodes']
+    node_names = {
+        unique_id: node['name']
+        for unique_id, node in nodes.items()
+        if node['resource_type'] in ('model', 'snapshot') and node['package_name'] == project_name
+    }
+
+    graph = {'models': {}, 'snapshots': {}, 'tests': {}}
+    for unique_id, node in nodes.items():
+        if node['package_name'] != project_name:
+            continue
+        upstream = sorted({
+            node_names[dep]
+            for dep in node.get('depends_on', {}).get('nodes', [])
+            if dep in node_names
+        })
+        if node['resource_type'] in ('model', 'snapshot', 'test'):
+            graph[node['resource_type'] + 's'][node['name']] = upstream
+
+    return graph
+
+
+def load_dbt_graph(project_dir):
+    """Return the cached model/snapshot/test graph, or None if there is no manifest."""
+    target_dir = os.path.join(project_dir, 'target')
+    manifest_path = os.path.join(target_dir, 'manifest.json')
+    if not os.path.exists(manifest_path):
+        return None
+
+    key = _manifest_key(manifest_path)
+    memo = _memo.get(manifest_path)
+    if memo and memo[0] == key:
+        return memo[1]
+
+    cache_path = os.path.join(target_dir, CACHE_FILE)
+    graph = None
+    if os.path.exists(cache_path):
+        with open(cache_path, 'r') as f:
+            cached = json.load(f)
+        if cached.get('key') == key:
+            graph = cached['graph']
+
+    if graph is None:
+        with open(manifest_path, 'r') as f:
+            manifest = json.load(f)
+        graph = build_graph(manifest, _project_name(manifest, project_dir))
+
+        tmp_path = cache_path + '.tmp'
+        with open(tmp_path, 'w') as f:
+            json.dump({'key': key, 'graph': graph}, f)
+        os.replace(tmp_path, cache_path)
+
+    _memo[manifest_path] = (key, graph)
+    return graph
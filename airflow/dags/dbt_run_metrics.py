@@ -0,0 +1,354 @@
+"""
+dbt Run Metrics
+
+Per-node history of dbt runs, read from the artifacts every `dbt run`,
+`dbt test`, `dbt snapshot` or `dbt build` writes, and stored in a local
+SQLite time series (`node_runs`):
+
+- `run_results.json`: status, execution time and, where the adapter
+  reports them, rows affected (Snowflake, BigQuery) and bytes processed
+  (BigQuery)
+- `manifest.json`: the ref() dependencies between models and snapshots
+
+Each recorded invocation gets a report:
+
+- regressions: nodes whose execution time exceeds the median of their
+  recent successful runs by more than the threshold (see run_history.py)
+- critical path: the chain of dependencies with the largest total
+  execution time through the model graph, i.e. the models that bound
+  how fast a full build can finish however many threads it has. Nodes
+  not run in the invocation count with their latest recorded time, so a
+  selective run still reports the path of the whole graph.
+
+`dag_dbt_transform` records every node task's results after each run
+(each task writes its own `target/airflow/<task_id>/run_results.json`);
+after running dbt by hand, record `target/` with the CLI.
+
+Usage:
+    python dbt_run_metrics.py record --project-dir dbt_project
+    python dbt_run_metrics.py report --db monitoring/dbt_run_metrics.db [--invocation-id ID]
+"""
+
+import os
+import glob
+import json
+import argparse
+from datetime import datetime
+
+from run_history import DEFAULT_THRESHOLD_PCT, RunHistory, format_regressions
+
+# Node types on the critical path (tests hang off the graph, they do not
+# hold up other nodes)
+PATH_RESOURCE_TYPES = ('model', 'snapshot', 'seed')
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS node_runs (
+    invocation_id TEXT NOT NULL,
+    unique_id TEXT NOT NULL,
+    name TEXT NOT NULL,
+    resource_type TEXT NOT NULL,
+    command TEXT,
+    status TEXT,
+    generated_at TEXT,
+    started_at TEXT,
+    completed_at TEXT,
+    execution_seconds REAL,
+    rows_affected INTEGER,
+    bytes_processed INTEGER,
+    PRIMARY KEY (invocation_id, unique_id)
+);
+CREATE INDEX IF NOT EXISTS node_runs_history ON node_runs (unique_id, generated_at);
+CREATE TABLE IF NOT EXISTS run_reports (
+    invocation_id TEXT PRIMARY KEY,
+    recorded_at TEXT NOT NULL,
+    report TEXT NOT NULL
+);
+"""
+
+
+def _execute_timing(result):
+    """Return the (started_at, completed_at) of a result's execute step."""
+    for step in result.get('timing', []):
+        if step.get('name') == 'execute':
+            return step.get('started_at'), step.get('completed_at')
+    return None, None
+
+
+def load_run_results(path):
+    """Return one record per node in a run_results.json."""
+    with open(path, 'r') as f:
+        run_results = json.load(f)
+
+    metadata = run_results.get('metadata', {})
+    invocation_id = metadata.get('invocation_id') or os.path.abspath(path)
+    generated_at = metadata.get('generated_at')
+    command = run_results.get('args', {}).get('which')
+
+    records = []
+    for result in run_results.get('results', []):
+        unique_id = result['unique_id']
+        adapter_response = result.get('adapter_response') or {}
+        started_at, completed_at = _execute_timing(result)
+        records.append({
+            'invocation_id': invocation_id,
+            'unique_id': unique_id,
+            'name': unique_id.split('.')[2] if unique_id.count('.') >= 2 else unique_id,
+            'resource_type': unique_id.split('.')[0],
+            'command': command,
+            'status': result.get('status'),
+            'generated_at': generated_at,
+            'started_at': started_at,
+            'completed_at': completed_at,
+            'execution_seconds': round(result.get('execution_time') or 0.0, 3),
+            'rows_affected': adapter_response.get('rows_affected'),
+            'bytes_processed': adapter_response.get('bytes_processed'),
+        })
+    return records
+
+
+def _timestamp(value):
+    return datetime.fromisoformat(value.replace('Z', '+00:00'))
+
+
+def collect_run_results(target_dir, since=None):
+    """Return the records of every run_results.json under a dbt target path.
+
+    Reads `target/run_results.json` and the per-task
+    `target/airflow/*/run_results.json`. With `since` (timezone-aware
+    datetime), files generated earlier are ignored, e.g. those left by node tasks
+    that were skipped this run.
+    """
+    paths = [os.path.join(target_dir, 'run_results.json')]
+    paths += sorted(glob.glob(os.path.join(target_dir, 'airflow', '*', 'run_results.json')))
+
+    records = []
+    for path in paths:
+        if not os.path.exists(path):
+            continue
+        file_records = load_run_results(path)
+        generated_at = file_records[0]['generated_at'] if file_records else None
+        if since and (not generated_at or _timestamp(generated_at) < since):
+            continue
+        records.extend(file_records)
+    return records
+
+
+def load_dependencies(manifest_path):
+    """Return {unique_id: [upstream unique_ids]} for the models, snapshots and seeds."""
+    with open(manifest_path, 'r') as f:
+        manifest = json.load(f)
+
+    nodes = {
+        unique_id: node for unique_id, node in manifest['nodes'].items()
+        if node['resource_type'] in PATH_RESOURCE_TYPES
+    }
+    return {
+        unique_id: sorted(
+            dep for dep in node.get('depends_on', {}).get('nodes', []) if dep in nodes
+        )
+        for unique_id, node in nodes.items()
+    }
+
+
+def critical_path(dependencies, durations):
+    """Return the dependency chain with the largest total duration, first node first.
+
+    `dependencies` maps each node to its upstream nodes and `durations`
+    maps nodes to seconds (missing nodes count as 0). Each step carries
+    the node's seconds and the running total along the path.
+    """
+    finish = {}
+    previous = {}
+
+    def longest_to(node):
+        # Iterative DFS: the model graph can be deeper than the recursion limit
+        stack = [node]
+        while stack:
+            current = stack[-1]
+            pending = [u for u in dependencies.get(current, []) if u not in finish]
+            if pending:
+                stack.extend(pending)
+                continue
+            stack.pop()
+            if current in finish:
+                continue
+            best = max(dependencies.get(current, []), key=lambda u: finish[u], default=None)
+            previous[current] = best
+            finish[current] = (finish[best] if best else 0.0) + durations.get(current, 0.0)
+
+    for node in dependencies:
+        longest_to(node)
+    if not finish:
+        return []
+
+    path = []
+    node = max(finish, key=finish.get)
+    while node is not None:
+        path.append(node)
+        node = previous[node]
+    path.reverse()
+
+    steps = []
+    for node in path:
+        steps.append({
+            'unique_id': node,
+            'name': node.split('.')[-1],
+            'seconds': round(durations.get(node, 0.0), 3),
+            'cumulative_seconds': round(finish[node], 3),
+        })
+    return steps
+
+
+class DbtRunMetrics(RunHistory):
+    """Local time series of dbt node timings plus per-invocation reports."""
+
+    SCHEMA = SCHEMA
+    TABLE = 'node_runs'
+    RUN_COLUMN = 'invocation_id'
+    UNIT_KEY = ('unique_id',)
+    SECONDS_COLUMN = 'execution_seconds'
+    STATUS_COLUMN = 'status'
+    SUCCESS_STATUSES = ('success', 'pass')
+    TIME_COLUMN = 'generated_at'
+    REPORT_KEY = ('invocation_id',)
+
+    def label(self, record):
+        return record['name']
+
+    def latest_durations(self):
+        """Return {unique_id: execution seconds} of each node's latest successful run."""
+        return dict(self.connection.execute(
+            "SELECT unique_id, execution_seconds FROM node_runs n "
+            "WHERE status IN ('success', 'pass') AND generated_at = ("
+            "    SELECT max(generated_at) FROM node_runs "
+            "    WHERE unique_id = n.unique_id AND status IN ('success', 'pass'))"
+        ).fetchall())
+
+
+def build_report(invocation_id, records, path, regressions, top=10):
+    """Summarize recorded nodes: totals, slowest nodes, critical path and regressions."""
+    statuses = {}
+    for r in records:
+        statuses[r['status']] = statuses.get(r['status'], 0) + 1
+    slowest = sorted(records, key=lambda r: r['execution_seconds'] or 0, reverse=True)[:top]
+    return {
+        'invocation_id': invocation_id,
+        'commands': sorted({r['command'] for r in records if r['command']}),
+        'nodes': len(records),
+        'statuses': statuses,
+        'execution_seconds': round(sum(r['execution_seconds'] or 0 for r in records), 3),
+        'rows_affected': sum(r['rows_affected'] or 0 for r in records),
+        'bytes_processed': sum(r['bytes_processed'] or 0 for r in records),
+        'slowest': [
+            {'name': r['name'], 'resource_type': r['resource_type'], 'status': r['status'],
+             'execution_seconds': r['execution_seconds'], 'rows_affected': r['rows_affected'],
+             'bytes_processed': r['bytes_processed']}
+            for r in slowest
+        ],
+        'critical_path': path,
+        'regressions': regressions,
+    }
+
+
+def _label(name, width=48):
+    return name if len(name) <= width else name[:width - 3] + '...'
+
+
+def format_report(report):
+    """Render a run report as text."""
+    statuses = ', '.join(f"{count} {status}" for status, count in sorted(report['statuses'].items()))
+    lines = [
+        "=" * 80,
+        f"DBT RUN REPORT: {report['invocation_id']} ({', '.join(report['commands']) or 'unknown command'})",
+        "=" * 80,
+        f"Nodes: {report['nodes']} ({statuses})   Execution time: {report['execution_seconds']}s",
+        f"Rows affected: {report['rows_affected']}   Bytes processed: {report['bytes_processed']}",
+        "",
+        "Slowest nodes:",
+        f"  {'Node':<48} {'Time':>9} {'Rows':>12} {'Bytes':>14}",
+    ]
+    for node in report['slowest']:
+        rows = node['rows_affected'] if node['rows_affected'] is not None else '-'
+        size = node['bytes_processed'] if node['bytes_processed'] is not None else '-'
+        lines.append(f"  {_label(node['name']):<48} {node['execution_seconds']:>8.1f}s {rows:>12} {size:>14}")
+
+    lines += ["", "Critical path (longest chain of model execution time):",
+              f"  {'Node':<48} {'Time':>9} {'Cumulative':>11}"]
+    for step in report['critical_path']:
+        lines.append(f"  {_label(step['name']):<48} {step['seconds']:>8.1f}s {step['cumulative_seconds']:>10.1f}s")
+    lines.append("")
+    lines += format_regressions(report['regressions'], 'node')
+    return '\n'.join(lines)
+
+
+def record_dbt_run(project_dir, path, threshold_pct=DEFAULT_THRESHOLD_PCT, since=None,
+                   invocation_id=None, target_path='target'):
+    """Record the run results under a project's target path and return the report.
+
+    All results collected together (e.g. every node task of a DAG run) are
+    reported as one invocation: `invocation_id`, or dbt's when there is
+    a single one.
+    """
+    target_dir = os.path.join(project_dir, target_path)
+    records = collect_run_results(target_dir, since=since)
+    if not records:
+        return None
+
+    invocation_ids = sorted({r['invocation_id'] for r in records})
+    invocation_id = invocation_id or (invocation_ids[0] if len(invocation_ids) == 1 else ','.join(invocation_ids))
+
+    manifest_path = os.path.join(target_dir, 'manifest.json')
+    dependencies = load_dependencies(manifest_path) if os.path.exists(manifest_path) else {}
+
+    store = DbtRunMetrics(path)
+    try:
+        regressions = store.regressions(records, threshold_pct)
+        store.record(records)
+        durations = store.latest_durations()
+        durations.update({
+            r['unique_id']: r['execution_seconds'] for r in records if r['status'] in ('success', 'pass')
+        })
+        report = build_report(invocation_id, records, critical_path(dependencies, durations), regressions)
+        store.save_report(report)
+    finally:
+        store.close()
+    return report
+
+
+def main():
+    """Record the latest dbt run results, or print a stored report."""
+    parser = argparse.ArgumentParser(description='Record and report dbt model execution times.')
+    parser.add_argument('command', choices=['record', 'report'])
+    parser.add_argument('--project-dir', default='dbt_project')
+    parser.add_argument('--target-path', default='target',
+                        help='dbt target path, relative to the project (default: target)')
+    parser.add_argument('--db', default='monitoring/dbt_run_metrics.db')
+    parser.add_argument('--threshold-pct', type=float, default=DEFAULT_THRESHOLD_PCT,
+                        help='Flag nodes this much slower than their baseline (default: 50)')
+    parser.add_argument('--invocation-id', help='report: default is the latest recorded run')
+    parser.add_argument('--fail-on-regression', action='store_true',
+                        help='record: exit with status 1 if any node regressed')
+    args = parser.parse_args()
+
+    if args.command == 'record':
+        report = record_dbt_run(args.project_dir, args.db, args.threshold_pct, target_path=args.target_path)
+        if report is None:
+            print(f"No run_results.json under {os.path.join(args.project_dir, args.target_path)}")
+            return
+        print(format_report(report))
+        if args.fail_on_regression and report['regressions']:
+            raise SystemExit(1)
+    else:
+        store = DbtRunMetrics(args.db)
+        try:
+            report = store.load_report(invocation_id=args.invocation_id)
+        finally:
+            store.close()
+        if report is None:
+            print("No recorded dbt runs")
+        else:
+            print(format_report(report))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,227 @@
+"""
+dbt Runtime Helpers
+
+Cuts the fixed overhead `dbt_transformation` pays on every run before and
+around the model tasks:
+
+- `ensure_packages`: content-addressed cache of `dbt_packages/`, keyed by a
+  hash of packages.yml (plus package-lock.yml and the dbt version). A hit
+  copies the cached packages in instead of running `dbt deps`, which
+  resolves and downloads every package; an unchanged install is a no-op.
+- `NODE_PARTIAL_PARSE`: model/test tasks use their own target path, so
+  they never found a `partial_parse.msgpack` and parsed the whole project
+  from scratch. The shell snippet seeds their target path with the
+  project's `target/partial_parse.msgpack` (persisted across runs) first.
+- `DbtSession`: runs several dbt commands in one long-lived process with
+  dbtRunner, parsing the project once and reusing the manifest, instead of
+  one process (interpreter + adapter import + parse) per command.
+
+`python dbt_runtime.py --project-dir ../../dbt_project` measures each saving
+against the previous per-process commands.
+"""
+
+import os
+import json
+import time
+import shutil
+import hashlib
+import argparse
+import subprocess
+from contextlib import contextmanager
+
+PACKAGES_DIR = 'dbt_packages'
+CACHE_MARKER = '.packages_cache_key'
+DEFAULT_CACHE_ROOT = os.environ.get(
+    'DBT_PACKAGES_CACHE', os.path.join(os.path.expanduser('~'), '.cache', 'dbt_packages')
+)
+
+# Shell snippet (run inside the dbt project, after `cd`) that seeds a node
+# task's target path with the project's partial parse state
+NODE_PARTIAL_PARSE = (
+    'mkdir -p target/airflow/{{ ti.task_id }} && '
+    '{ cp -p target/partial_parse.msgpack target/airflow/{{ ti.task_id }}/ 2>/dev/null || true; } && '
+)
+
+
+def dbt_version():
+    try:
+        from importlib.metadata import version
+        return version('dbt-core')
+    except Exception:
+        return 'unknown'
+
+
+def packages_cache_key(project_dir):
+    """Hash everything that determines the installed packages."""
+    digest = hashlib.sha256(dbt_version().encode())
+    for name in ('packages.yml', 'dependencies.yml', 'package-lock.yml'):
+        path = os.path.join(project_dir, name)
+        if os.path.exists(path):
+            digest.update(name.encode())
+            with open(path, 'rb') as f:
+                digest.update(f.read())
+    return digest.hexdigest()[:16]
+
+
+def _read_marker(install_dir):
+    try:
+        with open(os.path.join(install_dir, CACHE_MARKER), 'r') as f:
+            return f.read().strip()
+    except OSError:
+        return None
+
+
+def _replace_dir(source, target):
+    """Copy `source` over `target` (copy next to it, then swap)."""
+    tmp = f'{target}.tmp-{os.getpid()}'
+    shutil.rmtree(tmp, ignore_errors=True)
+    shutil.copytree(source, tmp, symlinks=True)
+    shutil.rmtree(target, ignore_errors=True)
+    os.replace(tmp, target)
+
+
+def ensure_packages(project_dir, cache_root=DEFAULT_CACHE_ROOT):
+    """Install the project's dbt packages from the cache, or cache a fresh install.
+
+    Returns 'current' (already installed), 'cached' (copied from the cache)
+    or 'installed' (ran `dbt deps` and added the result to the cache).
+    """
+    key = packages_cache_key(project_dir)
+    install_dir = os.path.join(project_dir, PACKAGES_DIR)
+    if _read_marker(install_dir) == key:
+        return 'current'
+
+    cached = os.path.join(cache_root, key)
+    if os.path.isdir(cached):
+        _replace_dir(cached, install_dir)
+        return 'cached'
+
+    subprocess.run(['dbt', 'deps'], cwd=project_dir, check=True)
+    with open(os.path.join(install_dir, CACHE_MARKER), 'w') as f:
+        f.write(key)
+
+    # Publish atomically, so concurrent runs never see a partial entry
+    os.makedirs(cache_root, exist_ok=True)
+    tmp = f'{cached}.tmp-{os.getpid()}'
+    shutil.rmtree(tmp, ignore_errors=True)
+    shutil.copytree(install_dir, tmp, symlinks=True)
+    try:
+        os.rename(tmp, cached)
+    except OSError:
+        shutil.rmtree(tmp, ignore_errors=True)  # Another run published it first
+    return 'installed'
+
+
+@contextmanager
+def _working_dir(path):
+    previous = os.getcwd()
+    os.chdir(path)
+    try:
+        yield
+    finally:
+        os.chdir(previous)
+
+
+class DbtSession:
+    """Runs dbt commands in this process, parsing the project only once.
+
+    Commands run from the project directory, as the BashOperator tasks do,
+    so profiles.yml and relative paths resolve the same way.
+    """
+
+    def __init__(self, project_dir):
+        from dbt.cli.main import dbtRunner
+
+        self.project_dir = project_dir
+        self.manifest = None
+        self._runner = dbtRunner
+
+    def invoke(self, args):
+        """Run one dbt command; raises if it fails. Returns its result."""
+        with _working_dir(self.project_dir):
+            result = self._runner(manifest=self.manifest).invoke(list(args))
+        if result.exception is not None:
+            raise result.exception
+        if not result.success:
+            raise RuntimeError(f"dbt {' '.join(args)} failed")
+        return result.result
+
+    def parse(self):
+        """Parse the project (writes target/manifest.json and partial_parse.msgpack)."""
+        self.manifest = self.invoke(['parse'])
+        return self.manifest
+
+
+def _timed(fn):
+    start = time.perf_counter()
+    fn()
+    return time.perf_counter() - start
+
+
+def _dbt(project_dir, *args):
+    subprocess.run(['dbt', *args], cwd=project_dir, check=True, capture_output=True)
+
+
+def benchmark(project_dir, cache_root, offline=False):
+    """Time the previous per-process commands against the cached/in-process ones."""
+    results = {}
+    install_dir = os.path.join(project_dir, PACKAGES_DIR)
+
+    # Packages: `dbt deps` from scratch vs. a cache hit
+    shutil.rmtree(install_dir, ignore_errors=True)
+    results['deps: dbt deps'] = _timed(lambda: _dbt(project_dir, 'deps'))
+    ensure_packages(project_dir, cache_root)  # Make sure the cache is populated
+    shutil.rmtree(install_dir, ignore_errors=True)
+    results['deps: cache hit'] = _timed(lambda: ensure_packages(project_dir, cache_root))
+    results['deps: already current'] = _timed(lambda: ensure_packages(project_dir, cache_root))
+
+    # Parsing one node task: full parse vs. seeded partial parse
+    results['parse: full'] = _timed(lambda: _dbt(project_dir, 'parse', '--no-partial-parse'))
+    results['parse: partial'] = _timed(lambda: _dbt(project_dir, 'parse'))
+
+    # Preamble: one process per command vs. one session
+    commands = [] if offline else [['debug', '--connection'], ['source', 'freshness']]
+    commands += [['parse'], ['ls', '--resource-type', 'model', '--output', 'name']]
+    results['preamble: one process per command'] = _timed(
+        lambda: [_dbt(project_dir, *command) for command in commands]
+    )
+
+    def in_session():
+        session = DbtSession(project_dir)
+        session.parse()
+        for command in commands:
+            if command != ['parse']:
+                session.invoke(command)
+    results['preamble: one session'] = _timed(in_session)
+
+    print("=" * 80)
+    print(f"DBT OVERHEAD BENCHMARK ({project_dir}, dbt {dbt_version()})")
+    print("=" * 80)
+    for name, seconds in results.items():
+        print(f"  {name:<40} {seconds:>8.2f}s")
+    print()
+    print(f"  deps saved per run:        {results['deps: dbt deps'] - results['deps: cache hit']:>8.2f}s")
+    print(f"  parse saved per node task: {results['parse: full'] - results['parse: partial']:>8.2f}s")
+    print(f"  preamble saved per run:    "
+          f"{results['preamble: one process per command'] - results['preamble: one session']:>8.2f}s")
+    return results
+
+
+def main():
+    """Benchmark the dbt overhead reductions."""
+    parser = argparse.ArgumentParser(description='Measure fixed dbt overhead, before and after caching.')
+    parser.add_argument('--project-dir', default='dbt_project')
+    parser.add_argument('--cache-root', default=DEFAULT_CACHE_ROOT)
+    parser.add_argument('--offline', action='store_true',
+                        help='Skip commands that need a warehouse connection (debug, source freshness)')
+    parser.add_argument('--output', help='Also write the timings as JSON')
+    args = parser.parse_args()
+
+    results = benchmark(os.path.abspath(args.project_dir), args.cache_root, args.offline)
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,138 @@
+"""
+dbt State Selection
+
+Works out which dbt nodes a `dbt_transformation` run actually needs, so the
+parts of the project untouched by new data or code changes are skipped:
+
+- sources with new data: `max_loaded_at` from `dbt source freshness`
+  (target/sources.json) compared with the values saved after the last
+  successful run; selected as `source:raw.<table>+`
+- code changes: `state:modified+` against the manifest saved after the
+  last successful run
+
+Saved state lives in `dbt_project/state/`, together with
+`selection_log.jsonl`, which records what each run selected and skipped.
+Without saved state (first run) everything is selected.
+"""
+
+import os
+import json
+import shutil
+import subprocess
+from datetime import datetime
+
+STATE_DIR = 'state'
+SOURCE_NAME = 'raw'
+
+# Sources without a loaded_at_field change together with their header table
+LINKED_SOURCES = {
+    'order_lines': 'orders',
+    'recipe_lines': 'recipes',
+}
+
+
+def load_freshness(sources_path):
+    """Return `{table: max_loaded_at}` from a dbt sources.json, or None."""
+    if not os.path.exists(sources_path):
+        return None
+    with open(sources_path, 'r') as f:
+        results = json.load(f).get('results', [])
+    return {
+        r['unique_id'].rsplit('.', 1)[-1]: r.get('max_loaded_at')
+        for r in results
+        if r['unique_id'].startswith('source.') and r.get('max_loaded_at')
+    }
+
+
+def changed_sources(current, previous, all_sources):
+    """Return the sorted source tables whose data changed since `previous`."""
+    if current is None or previous is None:
+        return sorted(all_sources)
+
+    changed = {
+        table for table, loaded_at in current.items()
+        if previous.get(table) != loaded_at
+    }
+    # Sources freshness knows nothing about (no loaded_at_field, or their
+    # freshness query failed) are always rebuilt
+    changed |= {
+        table for table in all_sources
+        if table not in current and table not in LINKED_SOURCES
+    }
+    changed |= {table for table, parent in LINKED_SOURCES.items() if parent in changed}
+    return sorted(changed & set(all_sources))
+
+
+def list_selected(project_dir, selectors, state_path, session=None):
+    """Return the model, snapshot and test names matched by `selectors` (`dbt ls`).
+
+    With a `session` (dbt_runtime.DbtSession) the listing reuses its parsed
+    manifest instead of starting a dbt process.
+    """
+    args = [
+        'ls',
+        '--resource-type', 'model', '--resource-type', 'snapshot', '--resource-type', 'test',
+        '--output', 'name',
+        '--target-path', 'target/airflow/dbt_select',
+        '--select', *selectors,
+    ]
+    if any(s.startswith('state:') for s in selectors):
+        args += ['--state', state_path]
+    if session is not None:
+        return {name.strip() for name in session.invoke(args) if name.strip()}
+
+    result = subprocess.run(
+        ['dbt', '--quiet', *args], cwd=project_dir, capture_output=True, text=True, check=True
+    )
+    return {line.strip() for line in result.stdout.splitlines() if line.strip()}
+
+
+def select_nodes(project_dir, graph, all_sources, session=None, full_refresh=False):
+    """Work out the nodes to run and return the selection record.
+
+    The record has `changed_sources`, `code_changes` (whether a prior
+    manifest was compared), `selected` and `skipped` (model, snapshot and
+    test names).
+    `session` is passed on to list_selected. A full refresh selects every
+    node.
+    """
+    state_path = os.path.join(project_dir, STATE_DIR)
+    all_nodes = set(graph['models']) | set(graph['snapshots']) | set(graph['tests'])
+
+    current = load_freshness(os.path.join(project_dir, 'target', 'sources.json'))
+    previous = load_freshness(os.path.join(state_path, 'sources.json'))
+    has_prior_manifest = os.path.exists(os.path.join(state_path, 'manifest.json'))
+
+    changed = changed_sources(current, previous, all_sources)
+    if full_refresh or not has_prior_manifest:
+        selected = all_nodes
+    else:
+        selectors = [f'source:{SOURCE_NAME}.{table}+' for table in changed]
+        selectors.append('state:modified+')
+        selected = list_selected(project_dir, selectors, state_path, session) & all_nodes
+
+    return {
+        'changed_sources': changed,
+        'code_changes': has_prior_manifest,
+        'selected': sorted(selected),
+        'skipped': sorted(all_nodes - selected),
+    }
+
+
+def record_selection(project_dir, run_id, selection):
+    """Append a run's selection to state/selection_log.jsonl."""
+    state_path = os.path.join(project_dir, STATE_DIR)
+    os.makedirs(state_path, exist_ok=True)
+    entry = {'run_id': run_id, 'recorded_at': datetime.now().isoformat(), **selection}
+    with open(os.path.join(state_path, 'selection_log.jsonl'), 'a') as f:
+        f.write(json.dumps(entry) + '\n')
+
+
+def save_state(project_dir):
+    """Save the current manifest and source freshness as the next baseline."""
+    state_path = os.path.join(project_dir, STATE_DIR)
+    os.makedirs(state_path, exist_ok=True)
+    for name in ('manifest.json', 'sources.json'):
+        source = os.path.join(project_dir, 'target', name)
+        if os.path.exists(source):
+            shutil.copyfile(source, os.path.join(state_path, name))
@@ -0,0 +1,42 @@
+"""
+Pipeline Datasets
+
+Datasets shared by the pipeline DAGs for data-aware scheduling, so each
+stage starts as soon as its inputs are ready instead of on a cron offset:
+
+- `data_ingestion` updates one raw table dataset per table once that table
+  is loaded and checked (through `RAW_TABLES_ALIAS`, since the load tasks
+  are dynamically mapped)
+- `dbt_transformation` runs once every raw table dataset has been updated,
+  and updates `MARTS_DATASET` when the marts are built and tested
+- `data_quality_checks` runs when `MARTS_DATASET` is updated
+"""
+
+from airflow.datasets import Dataset, DatasetAlias
+
+# Raw tables that dbt reads as sources
+RAW_TABLES = [
+    'products',
+    'recipes',
+    'recipe_lines',
+    'customers',
+    'orders',
+    'order_lines',
+    'shipments',
+    'returns',
+    'waste',
+    'quality_inspections',
+]
+
+
+def raw_table_dataset(table):
+    """Return the dataset for a raw warehouse table."""
+    return Dataset(f'warehouse://raw/{table}')
+
+
+RAW_TABLE_DATASETS = [raw_table_dataset(table) for table in RAW_TABLES]
+
+# Mapped ingestion tasks attach their table's dataset to this alias at runtime
+RAW_TABLES_ALIAS = DatasetAlias('raw_tables')
+
+MARTS_DATASET = Dataset('warehouse://marts')
@@ -0,0 +1,297 @@
+"""
+Pipeline Run Instrumentation
+
+DAG-level success/failure callback shared by the pipeline DAGs. When a run
+finishes, every task instance of the run is recorded in a local SQLite
+time series (`task_runs`):
+
+- queue time (queued -> started), run time (started -> ended) and retries
+- rows and bytes processed, when the task reported them: either XComs
+  `rows_processed` / `bytes_processed`, or a final stdout line with those
+  keys as JSON (BashOperator return value)
+
+The callback then builds the run's critical path: starting from the task
+that finished last, it repeatedly steps to the upstream task instance that
+finished last, so the path is the chain of waits that set the run's
+duration. Each step is split into scheduling gap, queue time and run time.
+Tasks whose run time exceeds the median of their recent successful runs by
+more than the regression threshold are flagged (see run_history.py). The
+report is printed, stored (`run_reports`) and can be shown again with the
+CLI.
+
+Usage (latest report of a DAG):
+    python pipeline_metrics.py --db monitoring/pipeline_metrics.db --dag-id data_ingestion
+"""
+
+import os
+import json
+import argparse
+from datetime import datetime
+
+from run_history import DEFAULT_THRESHOLD_PCT, RunHistory, format_regressions
+
+XCOM_ROWS_KEY = 'rows_processed'
+XCOM_BYTES_KEY = 'bytes_processed'
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS task_runs (
+    dag_id TEXT NOT NULL,
+    run_id TEXT NOT NULL,
+    task_id TEXT NOT NULL,
+    map_index INTEGER NOT NULL,
+    state TEXT,
+    try_number INTEGER,
+    retries INTEGER,
+    queued_at TEXT,
+    started_at TEXT,
+    ended_at TEXT,
+    queue_seconds REAL,
+    run_seconds REAL,
+    rows INTEGER,
+    bytes INTEGER,
+    PRIMARY KEY (dag_id, run_id, task_id, map_index)
+);
+CREATE INDEX IF NOT EXISTS task_runs_history ON task_runs (dag_id, task_id, map_index, ended_at);
+CREATE TABLE IF NOT EXISTS run_reports (
+    dag_id TEXT NOT NULL,
+    run_id TEXT NOT NULL,
+    recorded_at TEXT NOT NULL,
+    report TEXT NOT NULL,
+    PRIMARY KEY (dag_id, run_id)
+);
+"""
+
+
+def _seconds(start, end):
+    if start is None or end is None:
+        return None
+    return round((end - start).total_seconds(), 3)
+
+
+def _iso(value):
+    return value.isoformat() if value else None
+
+
+def _task_label(task_id, map_index):
+    return task_id + (f"[{map_index}]" if map_index >= 0 else '')
+
+
+def task_volume(ti):
+    """Return (rows, bytes) a task instance reported via XCom, or Nones."""
+    def pull(key):
+        return ti.xcom_pull(task_ids=ti.task_id, key=key, map_indexes=ti.map_index)
+
+    rows, size = pull(XCOM_ROWS_KEY), pull(XCOM_BYTES_KEY)
+    if rows is None and size is None:
+        value = pull('return_value')
+        if isinstance(value, str) and value.startswith('{'):
+            try:
+                value = json.loads(value)
+            except ValueError:
+                value = None
+        if isinstance(value, dict):
+            rows, size = value.get(XCOM_ROWS_KEY), value.get(XCOM_BYTES_KEY)
+    return rows, size
+
+
+def task_records(dag_run):
+    """Return one record per task instance of a finished DAG run."""
+    records = []
+    for ti in dag_run.get_task_instances():
+        rows, size = task_volume(ti) if ti.state == 'success' else (None, None)
+        records.append({
+            'dag_id': ti.dag_id,
+            'run_id': ti.run_id,
+            'task_id': ti.task_id,
+            'map_index': ti.map_index,
+            'state': ti.state,
+            'try_number': ti.try_number,
+            'retries': max(0, (ti.try_number or 1) - 1),
+            'queued_at': _iso(ti.queued_dttm),
+            'started_at': _iso(ti.start_date),
+            'ended_at': _iso(ti.end_date),
+            'queue_seconds': _seconds(ti.queued_dttm, ti.start_date),
+            'run_seconds': _seconds(ti.start_date, ti.end_date),
+            'rows': rows,
+            'bytes': size,
+        })
+    return records
+
+
+def critical_path(records, upstream_task_ids):
+    """Return the run's critical path as a list of steps, first task first.
+
+    `upstream_task_ids(task_id)` returns a task's direct upstream task IDs.
+    Within a mapped task group, a mapped instance's upstream is the
+    instance with the same map index when there is one.
+    """
+    finished = [r for r in records if r['started_at'] and r['ended_at']]
+    if not finished:
+        return []
+
+    by_task = {}
+    for r in finished:
+        by_task.setdefault(r['task_id'], []).append(r)
+
+    path = []
+    current = max(finished, key=lambda r: r['ended_at'])
+    while current is not None:
+        candidates = [
+            r for task_id in upstream_task_ids(current['task_id'])
+            for r in by_task.get(task_id, [])
+        ]
+        same_index = [r for r in candidates if r['map_index'] >= 0 and r['map_index'] == current['map_index']]
+        previous = max(same_index or candidates, key=lambda r: r['ended_at'], default=None)
+
+        ready_at = previous['ended_at'] if previous else None
+        queued_at = current['queued_at'] or current['started_at']
+        path.append({
+            'task_id': current['task_id'],
+            'map_index': current['map_index'],
+            'state': current['state'],
+            'gap_seconds': max(0.0, _seconds(
+                datetime.fromisoformat(ready_at), datetime.fromisoformat(queued_at)
+            )) if ready_at else 0.0,
+            'queue_seconds': current['queue_seconds'] or 0.0,
+            'run_seconds': current['run_seconds'] or 0.0,
+            'retries': current['retries'],
+        })
+        current = previous
+
+    path.reverse()
+    return path
+
+
+class PipelineMetrics(RunHistory):
+    """Local time series of task instance timings plus per-run reports."""
+
+    SCHEMA = SCHEMA
+    TABLE = 'task_runs'
+    RUN_COLUMN = 'run_id'
+    UNIT_KEY = ('dag_id', 'task_id', 'map_index')
+    SECONDS_COLUMN = 'run_seconds'
+    TIME_COLUMN = 'ended_at'
+    REPORT_KEY = ('dag_id', 'run_id')
+
+    def label(self, record):
+        return _task_label(record['task_id'], record['map_index'])
+
+
+def build_report(dag_id, run_id, state, records, path, regressions):
+    """Summarize a run: wall time, totals, critical path and regressions."""
+    starts = [r['queued_at'] or r['started_at'] for r in records if r['started_at']]
+    ends = [r['ended_at'] for r in records if r['ended_at']]
+    wall = _seconds(
+        datetime.fromisoformat(min(starts)), datetime.fromisoformat(max(ends))
+    ) if starts and ends else None
+    return {
+        'dag_id': dag_id,
+        'run_id': run_id,
+        'state': state,
+        'wall_seconds': wall,
+        'tasks': len(records),
+        'retries': sum(r['retries'] for r in records),
+        'run_seconds': round(sum(r['run_seconds'] or 0 for r in records), 3),
+        'queue_seconds': round(sum(r['queue_seconds'] or 0 for r in records), 3),
+        'rows': sum(r['rows'] or 0 for r in records),
+        'bytes': sum(r['bytes'] or 0 for r in records),
+        'critical_path': path,
+        'regressions': regressions,
+    }
+
+
+def format_report(report):
+    """Render a run report as text."""
+    lines = [
+        "=" * 80,
+        f"PIPELINE RUN REPORT: {report['dag_id']} / {report['run_id']} ({report['state']})",
+        "=" * 80,
+        f"Wall time: {report['wall_seconds']}s   Tasks: {report['tasks']}   "
+        f"Retries: {report['retries']}   Rows: {report['rows']}   Bytes: {report['bytes']}",
+        f"Task time: {report['run_seconds']}s running, {report['queue_seconds']}s queued",
+        "",
+        "Critical path:",
+        f"  {'Task':<48} {'Gap':>8} {'Queued':>8} {'Run':>9}",
+    ]
+    for step in report['critical_path']:
+        name = _task_label(step['task_id'], step['map_index'])
+        retries = f"  ({step['retries']} retries)" if step['retries'] else ''
+        lines.append(
+            f"  {name:<48} {step['gap_seconds']:>7.1f}s {step['queue_seconds']:>7.1f}s "
+            f"{step['run_seconds']:>8.1f}s{retries}"
+        )
+    path_total = sum(s['gap_seconds'] + s['queue_seconds'] + s['run_seconds'] for s in report['critical_path'])
+    lines.append(f"  {'Total':<48} {path_total:>26.1f}s")
+    lines.append("")
+    lines += format_regressions(report['regressions'], 'task')
+    return '\n'.join(lines)
+
+
+def record_dag_run(context):
+    """DAG on_success/on_failure callback: record the run and report on it."""
+    from airflow.models import Variable
+
+    dag, dag_run = context['dag'], context['dag_run']
+    project_root = Variable.get('project_root')
+    path = Variable.get(
+        'pipeline_metrics_path',
+        default_var=os.path.join(project_root, 'monitoring', 'pipeline_metrics.db')
+    )
+    threshold_pct = float(Variable.get('task_regression_threshold_pct', default_var=DEFAULT_THRESHOLD_PCT))
+
+    records = task_records(dag_run)
+    path_steps = critical_path(records, lambda task_id: dag.get_task(task_id).upstream_task_ids)
+
+    store = PipelineMetrics(path)
+    try:
+        regressions = store.regressions(records, threshold_pct)
+        store.record(records)
+        report = build_report(dag.dag_id, dag_run.run_id, dag_run.state, records, path_steps, regressions)
+        store.save_report(report)
+    finally:
+        store.close()
+
+    print(format_report(report))
+    if regressions:
+        _alert_regressions(report)
+
+
+def _alert_regressions(report):
+    """Email the regressions to `email_recipients`, if configured."""
+    from airflow.models import Variable
+    from airflow.utils.email import send_email
+
+    recipients = Variable.get('email_recipients', default_var=None)
+    if not recipients:
+        return
+    try:
+        send_email(
+            to=recipients,
+            subject=f"[pipeline] {len(report['regressions'])} slow task(s) in {report['dag_id']}",
+            html_content=f"<pre>{format_report(report)}</pre>",
+        )
+    except Exception as e:
+        print(f"Note: Could not send regression alert: {e}")
+
+
+def main():
+    """Print a stored run report."""
+    parser = argparse.ArgumentParser(description='Show a pipeline run report.')
+    parser.add_argument('--db', default='monitoring/pipeline_metrics.db')
+    parser.add_argument('--dag-id', required=True)
+    parser.add_argument('--run-id', help='Default: the latest recorded run')
+    args = parser.parse_args()
+
+    store = PipelineMetrics(args.db)
+    try:
+        report = store.load_report(dag_id=args.dag_id, run_id=args.run_id)
+    finally:
+        store.close()
+    if report is None:
+        print(f"No recorded runs for {args.dag_id}")
+    else:
+        print(format_report(report))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,335 @@
+"""
+Single-Scan Quality Check Engine
+
+Compiles every quality metric for a table (row count, null counts,
+duplicate keys, max dates, reconciliation sums, orphaned foreign keys and
+the metric day's row count/sums) into one aggregate query, so each table is
+scanned once per run instead of once per check. The per-table queries run
+concurrently through a pluggable backend:
+
+- `duckdb`: local embedded engine over the generated files in sample_data/
+  (flat CSVs or the Hive-partitioned layout), no warehouse needed
+- `databricks`, `snowflake`, `bigquery`: the raw tables in the warehouse,
+  using the connection settings of the ingestion config
+
+Warehouse SDKs and duckdb are imported only by the backend that uses them.
+"""
+
+import os
+import datetime
+import threading
+from decimal import Decimal
+from concurrent.futures import ThreadPoolExecutor
+
+# Metrics compiled per table:
+#   key         - must be unique and not null (duplicate count)
+#   not_null    - null counts
+#   max_dates   - latest value, for freshness
+#   sums        - totals, for cross-table reconciliation
+#   references  - column -> (parent table, parent column), orphan count
+#   date_column - with `daily_sums`, row count and sums for the metric day
+TABLE_CHECKS = {
+    'products': {
+        'key': 'product_id',
+        'not_null': ['product_id', 'sku'],
+        'max_dates': ['updated_date'],
+    },
+    'customers': {
+        'key': 'customer_id',
+        'not_null': ['customer_id'],
+        'max_dates': ['updated_date'],
+    },
+    'orders': {
+        'key': 'order_id',
+        'not_null': ['order_id', 'customer_id', 'order_date'],
+        'max_dates': ['order_date', 'updated_date'],
+        'sums': ['subtotal', 'total_amount'],
+        'references': {'customer_id': ('customers', 'customer_id')},
+        'date_column': 'order_date',
+        'daily_sums': ['total_amount'],
+    },
+    'order_lines': {
+        'key': 'order_line_id',
+        'not_null': ['order_line_id', 'order_id', 'product_id'],
+        'sums': ['line_total', 'quantity'],
+        'references': {
+            'order_id': ('orders', 'order_id'),
+            'product_id': ('products', 'product_id'),
+        },
+    },
+    'shipments': {
+        'key': 'shipment_id',
+        'not_null': ['shipment_id', 'order_id'],
+        'max_dates': ['shipment_date'],
+        'references': {'order_id': ('orders', 'order_id')},
+    },
+    'returns': {
+        'key': 'return_id',
+        'not_null': ['return_id', 'order_id'],
+        'max_dates': ['return_request_date'],
+        'sums': ['refund_amount'],
+        'references': {'order_id': ('orders', 'order_id')},
+        'date_column': 'return_request_date',
+    },
+    'waste': {
+        'key': 'waste_id',
+        'not_null': ['waste_id', 'waste_date'],
+        'max_dates': ['waste_date'],
+        'sums': ['total_material_cost'],
+    },
+    'quality_inspections': {
+        'key': 'inspection_id',
+        'not_null': ['inspection_id', 'product_id'],
+        'max_dates': ['inspection_date'],
+        'references': {'product_id': ('products', 'product_id')},
+    },
+}
+
+
+def compile_table_query(table, spec, table_ref, metric_date=None):
+    """Compile all metrics of one table into a single aggregate query.
+
+    `table_ref(name)` returns the fully qualified name of a table. With a
+    `metric_date` (YYYY-MM-DD), tables with a `date_column` also count the
+    rows and `daily_sums` of that day.
+    """
+    columns = ['COUNT(*) AS row_count']
+    for col in spec.get('not_null', []):
+        columns.append(f'SUM(CASE WHEN t.{col} IS NULL THEN 1 ELSE 0 END) AS null__{col}')
+    if spec.get('key'):
+        key = spec['key']
+        columns.append(f'COUNT(t.{key}) - COUNT(DISTINCT t.{key}) AS dup__{key}')
+    for col in spec.get('max_dates', []):
+        columns.append(f'MAX(t.{col}) AS max__{col}')
+    for col in spec.get('sums', []):
+        columns.append(f'SUM(t.{col}) AS sum__{col}')
+    if metric_date and spec.get('date_column'):
+        on_day = f"t.{spec['date_column']} = DATE '{metric_date}'"
+        columns.append(f'SUM(CASE WHEN {on_day} THEN 1 ELSE 0 END) AS day__rows')
+        for col in spec.get('daily_sums', []):
+            columns.append(f'SUM(CASE WHEN {on_day} THEN t.{col} ELSE 0 END) AS day__{col}')
+
+    # Orphan checks join each parent's distinct keys, so the table itself
+    # is still scanned once
+    joins = []
+    for i, (col, (parent, parent_col)) in enumerate(spec.get('references', {}).items()):
+        alias = f'r{i}'
+        joins.append(
+            f'LEFT JOIN (SELECT DISTINCT {parent_col} FROM {table_ref(parent)}) {alias} '
+            f'ON t.{col} = {alias}.{parent_col}'
+        )
+        columns.append(
+            f'SUM(CASE WHEN t.{col} IS NOT NULL AND {alias}.{parent_col} IS NULL '
+            f'THEN 1 ELSE 0 END) AS orphan__{col}'
+        )
+
+    sql = 'SELECT\n    ' + ',\n    '.join(columns) + f'\nFROM {table_ref(table)} t'
+    if joins:
+        sql += '\n' + '\n'.join(joins)
+    return sql
+
+
+def _plain(value):
+    """Convert a driver value to something JSON (XCom) serializable."""
+    if isinstance(value, Decimal):
+        return float(value)
+    if isinstance(value, (datetime.date, datetime.datetime)):
+        return value.isoformat()
+    if hasattr(value, 'item'):  # numpy scalars
+        return value.item()
+    return value
+
+
+def parse_result(row):
+    """Group a result row (`{alias: value}`) into a metrics dict."""
+    metrics = {'row_count': 0, 'nulls': {}, 'duplicates': {}, 'max_dates': {},
+               'sums': {}, 'orphans': {}, 'daily': {}}
+    groups = {'null': 'nulls', 'dup': 'duplicates', 'max': 'max_dates',
+              'sum': 'sums', 'orphan': 'orphans', 'day': 'daily'}
+    for alias, value in row.items():
+        alias = alias.lower()
+        value = _plain(value)
+        if alias == 'row_count':
+            metrics['row_count'] = value or 0
+        else:
+            prefix, col = alias.split('__', 1)
+            metrics[groups[prefix]][col] = value
+    return metrics
+
+
+class QualityBackend:
+    """Runs single-row aggregate queries; one connection per worker thread."""
+
+    def __init__(self):
+        self._local = threading.local()
+        self._connections = []
+        self._lock = threading.Lock()
+
+    def connect(self):
+        raise NotImplementedError
+
+    def table_ref(self, table):
+        return table
+
+    def _connection(self):
+        connection = getattr(self._local, 'connection', None)
+        if connection is None:
+            connection = self.connect()
+            self._local.connection = connection
+            with self._lock:
+                self._connections.append(connection)
+        return connection
+
+    def query(self, sql):
+        """Run `sql` and return its single result row as a dict."""
+        cursor = self._connection().cursor()
+        try:
+            cursor.execute(sql)
+            names = [d[0] for d in cursor.description]
+            return dict(zip(names, cursor.fetchone()))
+        finally:
+            cursor.close()
+
+    def close(self):
+        for connection in self._connections:
+            connection.close()
+        self._connections = []
+
+
+class DuckDBBackend(QualityBackend):
+    """Local embedded backend over the generated data files."""
+
+    def __init__(self, data_path):
+        super().__init__()
+        import duckdb
+
+        self.data_path = data_path
+        self.database = duckdb.connect()
+        for table in TABLE_CHECKS:
+            self.database.execute(
+                f"CREATE VIEW {table} AS SELECT * FROM {self._scan(table)}"
+            )
+
+    def _scan(self, table):
+        table_dir = os.path.join(self.data_path, table)
+        if not os.path.isdir(table_dir):
+            return f"read_csv_auto('{os.path.join(self.data_path, table)}.csv')"
+
+        # Hive-partitioned layout from generate_all.py --partitioned
+        if any(f.endswith('.parquet') for _, _, files in os.walk(table_dir) for f in files):
+            return f"read_parquet('{table_dir}/*/*.parquet', hive_partitioning = true)"
+        return f"read_csv_auto('{table_dir}/*/*.csv', hive_partitioning = true)"
+
+    def connect(self):
+        # DuckDB cursors are independent connections to the same database
+        return self.database.cursor()
+
+    def close(self):
+        super().close()
+        self.database.close()
+
+
+class DatabricksBackend(QualityBackend):
+    def __init__(self, config):
+        super().__init__()
+        self.db_config = config['databricks']
+
+    def connect(self):
+        from databricks import sql
+        return sql.connect(
+            server_hostname=self.db_config['server_hostname'],
+            http_path=self.db_config['http_path'],
+            access_token=self.db_config['access_token']
+        )
+
+    def table_ref(self, table):
+        return f"{self.db_config['catalog']}.{table}"
+
+
+class SnowflakeBackend(QualityBackend):
+    def __init__(self, config):
+        super().__init__()
+        self.db_config = config['snowflake']
+
+    def connect(self):
+        import snowflake.connector
+        return snowflake.connector.connect(
+            account=self.db_config['account'],
+            user=self.db_config['user'],
+            password=self.db_config['password'],
+            warehouse=self.db_config['warehouse'],
+            database=self.db_config['database'],
+            schema=self.db_config['schema'],
+            role=self.db_config['role']
+        )
+
+
+class BigQueryBackend(QualityBackend):
+    def __init__(self, config):
+        super().__init__()
+        self.bq_config = config['bigquery']
+        self.client = None
+
+    def _connection(self):
+        # The BigQuery client is thread-safe; share one
+        if self.client is None:
+            from google.cloud import bigquery
+            from google.oauth2 import service_account
+            credentials = service_account.Credentials.from_service_account_file(
+                self.bq_config['credentials_path']
+            )
+            self.client = bigquery.Client(
+                credentials=credentials,
+                project=self.bq_config['project_id'],
+                location=self.bq_config['location']
+            )
+        return self.client
+
+    def query(self, sql):
+        row = next(iter(self._connection().query(sql).result()))
+        return dict(row.items())
+
+    def table_ref(self, table):
+        return f"`{self.bq_config['project_id']}.{self.bq_config['dataset_id']}.{table}`"
+
+    def close(self):
+        if self.client:
+            self.client.close()
+
+
+def create_backend(name, data_path=None, config_path=None):
+    """Create a quality backend: 'duckdb' or a warehouse platform."""
+    if name == 'duckdb':
+        return DuckDBBackend(data_path)
+
+    import yaml
+    with open(config_path, 'r') as f:
+        config = yaml.safe_load(f)
+
+    backends = {
+        'databricks': DatabricksBackend,
+        'snowflake': SnowflakeBackend,
+        'bigquery': BigQueryBackend,
+    }
+    if name not in backends:
+        raise ValueError(f"Unsupported quality backend: {name}")
+    return backends[name](config)
+
+
+def run_checks(backend, tables=None, max_workers=4, metric_date=None):
+    """Run one aggregate query per table concurrently.
+
+    Returns `{table: metrics}`; a table whose query fails gets
+    `{'error': message}` instead of metrics.
+    """
+    tables = tables or list(TABLE_CHECKS)
+
+    def check(table):
+        sql = compile_table_query(table, TABLE_CHECKS[table], backend.table_ref, metric_date)
+        try:
+            return table, parse_result(backend.query(sql))
+        except Exception as e:
+            return table, {'error': str(e)}
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        return dict(executor.map(check, tables))
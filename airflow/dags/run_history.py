@@ -0,0 +1,150 @@
+"""
+Run Timing History
+
+SQLite time series of timed units (Airflow task instances, dbt nodes), one
+row per unit per run, plus a JSON report per run. Shared by
+pipeline_metrics.py and dbt_run_metrics.py, which define what a unit and a
+run are and parse their records; this module stores them and flags
+regressions:
+
+- baseline: the median duration of a unit's last `REGRESSION_HISTORY`
+  successful runs, once it has `MIN_REGRESSION_HISTORY` of them
+- regression: a successful run more than the threshold percentage slower
+  than its baseline, and at least `REGRESSION_MIN_SECONDS` slower
+"""
+
+import os
+import json
+import sqlite3
+import statistics
+from datetime import datetime
+
+# Successful runs a unit's baseline is taken over, and the minimum needed
+REGRESSION_HISTORY = 10
+MIN_REGRESSION_HISTORY = 5
+
+# Slowdowns shorter than this are never flagged, whatever the percentage
+REGRESSION_MIN_SECONDS = 30
+
+DEFAULT_THRESHOLD_PCT = 50
+
+
+class RunHistory:
+    """Time series of unit durations plus per-run reports.
+
+    Subclasses describe their table:
+
+    - `SCHEMA`: the unit table plus `run_reports`, whose key columns are
+      `REPORT_KEY` followed by `recorded_at` and `report`
+    - `TABLE`: the unit table; `RUN_COLUMN` identifies a run, `UNIT_KEY`
+      a unit across runs, `SECONDS_COLUMN` its duration, `STATUS_COLUMN`
+      and `SUCCESS_STATUSES` a successful run, `TIME_COLUMN` orders runs
+    - `label(record)`: how a unit is named in reports
+    """
+
+    SCHEMA = None
+    TABLE = None
+    RUN_COLUMN = None
+    UNIT_KEY = ()
+    SECONDS_COLUMN = None
+    STATUS_COLUMN = 'state'
+    SUCCESS_STATUSES = ('success',)
+    TIME_COLUMN = None
+    REPORT_KEY = ()
+
+    def __init__(self, path):
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self.connection = sqlite3.connect(path)
+        self.connection.executescript(self.SCHEMA)
+
+    def label(self, record):
+        raise NotImplementedError
+
+    def _succeeded(self):
+        return f"{self.STATUS_COLUMN} IN ({', '.join('?' for _ in self.SUCCESS_STATUSES)})"
+
+    def record(self, records):
+        """Store a run's records (re-recording a run replaces them)."""
+        columns = list(records[0]) if records else []
+        with self.connection:
+            self.connection.executemany(
+                f"INSERT OR REPLACE INTO {self.TABLE} ({', '.join(columns)}) "
+                f"VALUES ({', '.join('?' for _ in columns)})",
+                [tuple(r[c] for c in columns) for r in records]
+            )
+
+    def baseline(self, record):
+        """Return the median duration of the unit's recent successful runs, or None.
+
+        The record's own run is excluded, so it can be scored before or
+        after it is recorded.
+        """
+        unit = ' AND '.join(f"{column} = ?" for column in self.UNIT_KEY)
+        durations = [
+            seconds for (seconds,) in self.connection.execute(
+                f"SELECT {self.SECONDS_COLUMN} FROM {self.TABLE} "
+                f"WHERE {unit} AND {self.RUN_COLUMN} != ? "
+                f"AND {self._succeeded()} AND {self.SECONDS_COLUMN} IS NOT NULL "
+                f"ORDER BY {self.TIME_COLUMN} DESC LIMIT ?",
+                (*(record[c] for c in self.UNIT_KEY), record[self.RUN_COLUMN],
+                 *self.SUCCESS_STATUSES, REGRESSION_HISTORY)
+            )
+        ]
+        if len(durations) < MIN_REGRESSION_HISTORY:
+            return None
+        return statistics.median(durations)
+
+    def regressions(self, records, threshold_pct):
+        """Return the successful units that ran `threshold_pct`% slower than baseline, worst first."""
+        flagged = []
+        for r in records:
+            seconds = r[self.SECONDS_COLUMN]
+            if r[self.STATUS_COLUMN] not in self.SUCCESS_STATUSES or seconds is None:
+                continue
+            baseline = self.baseline(r)
+            if baseline is None:
+                continue
+            slowdown = seconds - baseline
+            if slowdown > REGRESSION_MIN_SECONDS and seconds > baseline * (1 + threshold_pct / 100):
+                flagged.append({
+                    **{column: r[column] for column in self.UNIT_KEY},
+                    'label': self.label(r),
+                    'seconds': seconds,
+                    'baseline_seconds': round(baseline, 3),
+                    'slowdown_pct': round(100 * slowdown / baseline, 1) if baseline else None,
+                })
+        return sorted(flagged, key=lambda f: f['seconds'] - f['baseline_seconds'], reverse=True)
+
+    def save_report(self, report):
+        columns = [*self.REPORT_KEY, 'recorded_at', 'report']
+        with self.connection:
+            self.connection.execute(
+                f"INSERT OR REPLACE INTO run_reports ({', '.join(columns)}) "
+                f"VALUES ({', '.join('?' for _ in columns)})",
+                (*(report[k] for k in self.REPORT_KEY), datetime.now().isoformat(), json.dumps(report))
+            )
+
+    def load_report(self, **keys):
+        """Return the latest stored report matching the given report keys, or None."""
+        keys = {k: v for k, v in keys.items() if v is not None}
+        where = ' AND '.join(f"{k} = ?" for k in keys) or '1 = 1'
+        row = self.connection.execute(
+            f"SELECT report FROM run_reports WHERE {where} ORDER BY recorded_at DESC LIMIT 1",
+            tuple(keys.values())
+        ).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def close(self):
+        self.connection.close()
+
+
+def format_regressions(regressions, units):
+    """Render a report's regressions as text lines."""
+    if not regressions:
+        return [f"✓ No {units} regressions"]
+    lines = ["⚠ Regressions (slower than the median of recent runs):"]
+    for r in regressions:
+        lines.append(
+            f"  {r['label']}: {r['seconds']:.1f}s vs {r['baseline_seconds']:.1f}s (+{r['slowdown_pct']}%)"
+        )
+    return lines
@@ -0,0 +1,212 @@
+"""
+Backfill Generation
+
+Generates the date-keyed datasets (orders and their lines, shipments,
+returns, waste, quality inspections) for an explicit date window, one date
+partition at a time, in the Hive-partitioned layout that ingestion reads
+(`<output_dir>/<table>/<date column>=<day>/part-*`).
+
+A partition depends only on its date, so days can be generated in any
+order and concurrently, and regenerating a day rewrites exactly the same
+files:
+
+- the random seeds are derived from the table and the day
+- IDs are numbered from `day number * ID_BLOCK + 1`, unique across days
+- `updated_date` is the end of the day
+- shipments, returns and inspections reference the orders of the
+  preceding days, which are computed rather than read
+
+Customers, products and recipes are not date-keyed; generate them once
+with generate_all.py.
+
+Usage:
+    python backfill.py --start-date 2024-01-01 --end-date 2024-12-31 --workers 8
+    python backfill.py --date 2024-03-01 --output-dir ../sample_data --format csv
+"""
+
+import os
+import sys
+import json
+import time
+import zlib
+import random
+import argparse
+import numpy as np
+from faker import Faker
+from datetime import date, timedelta
+from concurrent.futures import ProcessPoolExecutor
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from generate_orders import generate_orders
+from generate_shipments import generate_shipments
+from generate_returns import generate_returns
+from generate_waste import generate_waste
+from generate_quality import generate_quality
+from partitioning import with_parent_partition, write_partitioned
+
+# Day numbers (for ID ranges) count from here
+EPOCH = date(2000, 1, 1)
+
+# IDs reserved per table and day; keeps 8-digit IDs unique until ~2270
+ID_BLOCK = 1000
+
+# Rows per day, matching generate_all.py's volumes spread over their windows
+DAILY_VOLUMES = {
+    'orders': 14,               # 10000 over 730 days
+    'shipments': 11,            # 8000 over 730 days
+    'returns': 2,               # 1500 over 730 days
+    'waste': 8,                 # 3000 over 365 days
+    'quality_inspections': 14,  # 5000 over 365 days
+}
+
+# Days before the partition date whose orders each table references (inclusive)
+ORDER_REFERENCE_DAYS = {
+    'shipments': (0, 14),
+    'returns': (1, 90),
+    'quality_inspections': (0, 30),
+}
+
+
+def day_number(day):
+    return (day - EPOCH).days
+
+
+def id_start(day):
+    """First ID of `day`'s block."""
+    return day_number(day) * ID_BLOCK + 1
+
+
+def daily_volumes(scale=1.0):
+    """Return rows per day per table at `scale`; at least one row each."""
+    volumes = {table: max(1, round(rows * scale)) for table, rows in DAILY_VOLUMES.items()}
+    if max(volumes.values()) >= ID_BLOCK:
+        raise ValueError(f"At most {ID_BLOCK - 1} rows per table and day; lower --scale")
+    return volumes
+
+
+def referenced_order_ids(day, table, orders_per_day):
+    """Return the IDs of the orders a table's rows on `day` may reference."""
+    first, last = ORDER_REFERENCE_DAYS[table]
+    return [
+        f'ORD{id_start(day - timedelta(days=offset)) + i:08d}'
+        for offset in range(first, last + 1)
+        for i in range(orders_per_day)
+    ]
+
+
+def seed_for(table, day):
+    """Seed every generator RNG from the table and day."""
+    seed = zlib.crc32(f'{table}:{day.isoformat()}'.encode())
+    random.seed(seed)
+    np.random.seed(seed)
+    Faker.seed(seed)
+
+
+def generate_partition(day, output_dir, file_format='parquet', scale=1.0):
+    """Generate and write every date-keyed table's partition for `day`.
+
+    Each partition written replaces the files already there. Returns
+    `{table: rows}`.
+    """
+    volumes = daily_volumes(scale)
+    start = id_start(day)
+
+    seed_for('orders', day)
+    orders_df, order_lines_df = generate_orders(volumes['orders'], day, day, start)
+
+    seed_for('shipments', day)
+    shipments_df = generate_shipments(
+        volumes['shipments'], day, day, start,
+        referenced_order_ids(day, 'shipments', volumes['orders'])
+    )
+
+    seed_for('returns', day)
+    returns_df = generate_returns(
+        volumes['returns'], day, day, start,
+        referenced_order_ids(day, 'returns', volumes['orders'])
+    )
+
+    seed_for('waste', day)
+    waste_df = generate_waste(volumes['waste'], day, day, start)
+
+    seed_for('quality_inspections', day)
+    quality_df = generate_quality(
+        volumes['quality_inspections'], day, day, start,
+        referenced_order_ids(day, 'quality_inspections', volumes['orders'])
+    )
+
+    datasets = {
+        'orders': orders_df,
+        'order_lines': with_parent_partition(order_lines_df, orders_df, 'order_lines'),
+        'shipments': shipments_df,
+        'returns': returns_df,
+        'waste': waste_df,
+        'quality_inspections': quality_df,
+    }
+    for table_name, df in datasets.items():
+        write_partitioned(df, output_dir, table_name, file_format)
+
+    return {table_name: len(df) for table_name, df in datasets.items()}
+
+
+def date_range(start_date, end_date):
+    """Return the days from `start_date` to `end_date`, inclusive."""
+    return [start_date + timedelta(days=d) for d in range((end_date - start_date).days + 1)]
+
+
+def parse_args(argv=None):
+    """Parse command line arguments."""
+    parser = argparse.ArgumentParser(description='Generate date partitions for a backfill window.')
+    parser.add_argument('--start-date', type=date.fromisoformat, help='First day (YYYY-MM-DD)')
+    parser.add_argument('--end-date', type=date.fromisoformat, help='Last day, inclusive (default: start date)')
+    parser.add_argument('--date', action='append', dest='dates', type=date.fromisoformat,
+                        help='Generate only this day; may be repeated')
+    parser.add_argument('--output-dir', default='sample_data',
+                        help='Directory to write datasets to (default: sample_data)')
+    parser.add_argument('--format', choices=['parquet', 'csv'], default='parquet',
+                        help='File format for the partitions (default: parquet)')
+    parser.add_argument('--scale', type=float, default=1.0, help='Multiply the daily volumes')
+    parser.add_argument('--workers', type=int, default=4, help='Days generated concurrently')
+    args = parser.parse_args(argv)
+    if not args.dates and not args.start_date:
+        parser.error('one of --start-date or --date is required')
+    return args
+
+
+def main(argv=None):
+    """Generate the requested days, `--workers` at a time."""
+    args = parse_args(argv)
+    days = sorted(set(args.dates or date_range(args.start_date, args.end_date or args.start_date)))
+
+    print("=" * 80)
+    print(f"BACKFILL GENERATION: {days[0]} to {days[-1]} ({len(days)} days, {args.workers} workers)")
+    print("=" * 80)
+
+    start = time.perf_counter()
+    totals = {}
+    with ProcessPoolExecutor(max_workers=args.workers) as executor:
+        futures = [
+            executor.submit(generate_partition, day, args.output_dir, args.format, args.scale)
+            for day in days
+        ]
+        for day, future in zip(days, futures):
+            counts = future.result()
+            for table_name, rows in counts.items():
+                totals[table_name] = totals.get(table_name, 0) + rows
+            print(f"   ✓ {day}: " + ', '.join(f"{t} {n}" for t, n in counts.items()))
+
+    elapsed = time.perf_counter() - start
+    print()
+    print(f"Generated {len(days)} partitions in {elapsed:.1f}s "
+          f"({elapsed / len(days):.2f}s per day at {args.workers} workers)")
+    for table_name, rows in totals.items():
+        print(f"  - {table_name}: {rows}")
+    print(f"All partitions saved to '{args.output_dir}/'")
+
+    # Last line: picked up as XCom by the Airflow run instrumentation
+    print(json.dumps({'rows_processed': sum(totals.values())}))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,39 @@
+"""
+Date Windows
+
+Helpers for generators that either spread records over the last N days
+(relative to now) or, for backfills, over an explicit inclusive date window.
+"""
+
+import random
+from datetime import date, datetime, time, timedelta
+
+
+def as_of(end_date=None):
+    """Return the generation timestamp: now, or the end of `end_date`.
+
+    A backfilled partition uses the end of its window, so regenerating it
+    produces the same `updated_date` values.
+    """
+    if end_date is None:
+        return datetime.now()
+    return datetime.combine(to_date(end_date), time(23, 59, 59))
+
+
+def to_date(value):
+    """Accept a date, datetime or YYYY-MM-DD string."""
+    if isinstance(value, datetime):
+        return value.date()
+    if isinstance(value, date):
+        return value
+    return date.fromisoformat(value)
+
+
+def random_datetime(start_date=None, end_date=None, min_days_ago=1, max_days_ago=730):
+    """Return a random datetime in the window, or `min..max_days_ago` before now."""
+    if start_date is None:
+        return datetime.now() - timedelta(days=random.randint(min_days_ago, max_days_ago))
+
+    start_date, end_date = to_date(start_date), to_date(end_date or start_date)
+    day = start_date + timedelta(days=random.randint(0, (end_date - start_date).days))
+    return datetime.combine(day, time()) + timedelta(seconds=random.randint(0, 86399))
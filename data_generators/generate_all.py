@@ -6,6 +6,7 @@ Master script to generate all sample data for the analytics engineering project.
 
 import sys
 import os
+import argparse
 
 # Add the current directory to the path
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
@@ -18,66 +19,96 @@ from generate_shipments import generate_shipments
 from generate_returns import generate_returns
 from generate_waste import generate_waste
 from generate_quality import generate_quality
+from partitioning import PARTITION_COLUMNS, PARENT_PARTITIONS, with_parent_partition, write_partitioned
 
 
-def main():
+def save_dataset(df, table_name, args, parent_df=None):
+    """Save a dataset as a flat CSV, or date-partitioned if requested.
+
+    Tables partitioned by a parent's date (order lines) need `parent_df`.
+    """
+    if args.partitioned and table_name in PARTITION_COLUMNS:
+        if table_name in PARENT_PARTITIONS:
+            df = with_parent_partition(df, parent_df, table_name)
+        num_partitions = write_partitioned(df, args.output_dir, table_name, args.format)
+        print(f"   Wrote {num_partitions} {PARTITION_COLUMNS[table_name]} partitions "
+              f"to {args.output_dir}/{table_name}/")
+    else:
+        df.to_csv(os.path.join(args.output_dir, f'{table_name}.csv'), index=False)
+
+
+def parse_args(argv=None):
+    """Parse command line arguments."""
+    parser = argparse.ArgumentParser(description='Generate all sample data.')
+    parser.add_argument('--output-dir', default='sample_data',
+                        help='Directory to write datasets to (default: sample_data)')
+    parser.add_argument('--partitioned', action='store_true',
+                        help='Write date-keyed datasets as Hive-style date partitions')
+    parser.add_argument('--format', choices=['parquet', 'csv'], default='parquet',
+                        help='File format for partitioned datasets (default: parquet)')
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
     """Generate all sample data."""
+    args = parse_args(argv)
+    
     print("=" * 80)
     print("GENERATING ALL SAMPLE DATA FOR ANALYTICS ENGINEERING PROJECT")
     print("=" * 80)
     print()
     
     # Create output directory
-    os.makedirs('sample_data', exist_ok=True)
+    os.makedirs(args.output_dir, exist_ok=True)
     
     # Generate all datasets
     print("1. Generating Products...")
     products_df = generate_products(1000)
-    products_df.to_csv('sample_data/products.csv', index=False)
+    save_dataset(products_df, 'products', args)
     print(f"   ✓ Generated {len(products_df)} products")
     print()
     
     print("2. Generating Recipes...")
     recipes_df, recipe_lines_df = generate_recipes(500)
-    recipes_df.to_csv('sample_data/recipes.csv', index=False)
-    recipe_lines_df.to_csv('sample_data/recipe_lines.csv', index=False)
+    save_dataset(recipes_df, 'recipes', args)
+    save_dataset(recipe_lines_df, 'recipe_lines', args)
     print(f"   ✓ Generated {len(recipes_df)} recipes with {len(recipe_lines_df)} recipe lines")
     print()
     
     print("3. Generating Customers...")
     customers_df = generate_customers(5000)
-    customers_df.to_csv('sample_data/customers.csv', index=False)
+    save_dataset(customers_df, 'customers', args)
     print(f"   ✓ Generated {len(customers_df)} customers")
     print()
     
     print("4. Generating Orders...")
     orders_df, order_lines_df = generate_orders(10000)
-    orders_df.to_csv('sample_data/orders.csv', index=False)
-    order_lines_df.to_csv('sample_data/order_lines.csv', index=False)
+    save_dataset(orders_df, 'orders', args)
+    save_dataset(order_lines_df, 'order_lines', args, parent_df=orders_df)
     print(f"   ✓ Generated {len(orders_df)} orders with {len(order_lines_df)} order lines")
     print()
     
     print("5. Generating Shipments...")
     shipments_df = generate_shipments(8000)
-    shipments_df.to_csv('sample_data/shipments.csv', index=False)
+    save_dataset(shipments_df, 'shipments', args)
     print(f"   ✓ Generated {len(shipments_df)} shipments")
     print()
     
     print("6. Generating Returns...")
     returns_df = generate_returns(1500)
-    returns_df.to_csv('sample_data/returns.csv', index=False)
+    save_dataset(returns_df, 'returns', args)
     print(f"   ✓ Generated {len(returns_df)} returns")
     print()
     
     print("7. Generating Waste Tracking...")
     waste_df = generate_waste(3000)
-    waste_df.to_csv('sample_data/waste.csv', index=False)
+    save_dataset(waste_df, 'waste', args)
     print(f"   ✓ Generated {len(waste_df)} waste records")
     print()
     
     print("8. Generating Quality Inspections...")
     quality_df = generate_quality(5000)
-    quality_df.to_csv('sample_data/quality_inspections.csv', index=False)
+    save_dataset(quality_df, 'quality_inspections', args)
     print(f"   ✓ Generated {len(quality_df)} quality inspection records")
     print()
     
@@ -95,7 +126,7 @@ def main():
     print(f"  - Waste Records: {len(waste_df)}")
     print(f"  - Quality Inspections: {len(quality_df)}")
     print()
-    print("All data saved to 'sample_data/' directory")
+    print(f"All data saved to '{args.output_dir}/' directory")
     print()
 
 
@@ -7,30 +7,37 @@ Generates synthetic sales order data including order headers and line items.
 import pandas as pd
 import numpy as np
 from faker import Faker
-from datetime import datetime, timedelta
 import random
 
+from date_window import as_of, random_datetime
+
 fake = Faker()
 Faker.seed(42)
 np.random.seed(42)
 random.seed(42)
 
 
-def generate_orders(num_orders=10000):
-    """Generate order data."""
+def generate_orders(num_orders=10000, start_date=None, end_date=None, id_start=1):
+    """Generate order data.
+
+    Orders fall in the last 2 years, or in the inclusive `start_date` to
+    `end_date` window when one is given (backfills). Order IDs are numbered
+    from `id_start`.
+    """
     
     order_statuses = ['Pending', 'Confirmed', 'Processing', 'Shipped', 'Delivered', 'Cancelled']
     payment_methods = ['Credit Card', 'Debit Card', 'PayPal', 'Bank Transfer', 'Cash on Delivery']
     
+    updated = as_of(end_date)
     orders = []
     order_lines = []
     
     for i in range(num_orders):
-        order_id = f'ORD{i+1:08d}'
+        order_id = f'ORD{id_start + i:08d}'
         customer_id = f'CUS{random.randint(1, 5000):07d}'
         
-        # Generate order date within last 2 years
-        order_date = datetime.now() - timedelta(days=random.randint(1, 730))
+        # Generate order date within last 2 years (or the window)
+        order_date = random_datetime(start_date, end_date, 1, 730)
         
         status = random.choice(order_statuses)
         
@@ -56,7 +63,7 @@ def generate_orders(num_orders=10000):
             'total_amount': 0,  # Will calculate
             'notes': fake.sentence() if random.random() > 0.8 else '',
             'created_date': order_date.strftime('%Y-%m-%d %H:%M:%S'),
-            'updated_date': datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+            'updated_date': updated.strftime('%Y-%m-%d %H:%M:%S')
         }
         orders.append(order)
         
@@ -7,17 +7,25 @@ Generates synthetic quality control and inspection data.
 import pandas as pd
 import numpy as np
 from faker import Faker
-from datetime import datetime, timedelta
+from datetime import timedelta
 import random
 
+from date_window import as_of, random_datetime
+
 fake = Faker()
 Faker.seed(42)
 np.random.seed(42)
 random.seed(42)
 
 
-def generate_quality(num_inspections=5000):
-    """Generate quality inspection data."""
+def generate_quality(num_inspections=5000, start_date=None, end_date=None, id_start=1, order_ids=None):
+    """Generate quality inspection data.
+
+    Inspections fall in the last year, or in the inclusive `start_date` to
+    `end_date` window. `order_ids` restricts the orders referenced by final
+    product / customer return inspections (default ORD00000001-ORD00010000);
+    inspection IDs are numbered from `id_start`.
+    """
     
     inspection_types = [
         'Incoming Material', 'In-Process', 'Final Product',
@@ -35,10 +43,11 @@ def generate_quality(num_inspections=5000):
     
     severity_levels = ['Critical', 'Major', 'Minor', 'Observation']
     
+    updated = as_of(end_date)
     quality_records = []
     
     for i in range(num_inspections):
-        inspection_date = datetime.now() - timedelta(days=random.randint(1, 365))
+        inspection_date = random_datetime(start_date, end_date, 1, 365)
         
         inspection_type = random.choice(inspection_types)
         status = random.choices(
@@ -51,14 +60,14 @@ def generate_quality(num_inspections=5000):
         num_defects = random.randint(1, 5) if has_defects else 0
         
         quality_record = {
-            'inspection_id': f'QC{i+1:08d}',
+            'inspection_id': f'QC{id_start + i:08d}',
             'inspection_date': inspection_date.strftime('%Y-%m-%d'),
             'inspection_time': inspection_date.strftime('%H:%M:%S'),
             'inspection_type': inspection_type,
             'inspection_status': status,
             'product_id': f'PRD{random.randint(1, 1000):06d}',
             'batch_id': f'BATCH{random.randint(1000, 9999)}',
-            'order_id': f'ORD{random.randint(1, 10000):08d}' if inspection_type in ['Final Product', 'Customer Return'] else None,
+            'order_id': (random.choice(order_ids) if order_ids else f'ORD{random.randint(1, 10000):08d}') if inspection_type in ['Final Product', 'Customer Return'] else None,
             'facility_location': random.choice(['Plant-A', 'Plant-B', 'Plant-C']),
             'inspector_name': fake.name(),
             'inspector_id': f'EMP{random.randint(1, 100):04d}',
@@ -83,7 +92,7 @@ def generate_quality(num_inspections=5000):
             'disposition': random.choice(['Accept', 'Reject', 'Rework', 'Use As Is', 'Scrap']) if has_defects else 'Accept',
             'notes': fake.sentence() if random.random() > 0.7 else '',
             'created_date': inspection_date.strftime('%Y-%m-%d %H:%M:%S'),
-            'updated_date': datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+            'updated_date': updated.strftime('%Y-%m-%d %H:%M:%S')
         }
         
         quality_records.append(quality_record)
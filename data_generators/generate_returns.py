@@ -7,17 +7,25 @@ Generates synthetic product return and refund data.
 import pandas as pd
 import numpy as np
 from faker import Faker
-from datetime import datetime, timedelta
+from datetime import timedelta
 import random
 
+from date_window import as_of, random_datetime
+
 fake = Faker()
 Faker.seed(42)
 np.random.seed(42)
 random.seed(42)
 
 
-def generate_returns(num_returns=1500):
-    """Generate returns data."""
+def generate_returns(num_returns=1500, start_date=None, end_date=None, id_start=1, order_ids=None):
+    """Generate returns data.
+
+    Return requests fall within 90 days of an order from the last 2 years,
+    or in the inclusive `start_date` to `end_date` window. `order_ids`
+    restricts the orders returned (default ORD00000001-ORD00010000); return
+    IDs are numbered from `id_start`.
+    """
     
     return_reasons = [
         'Defective Product', 'Wrong Item Received', 'Not as Described',
@@ -28,16 +36,21 @@ def generate_returns(num_returns=1500):
     return_statuses = ['Requested', 'Approved', 'In Transit', 'Received', 'Inspected', 'Refunded', 'Rejected']
     refund_methods = ['Original Payment Method', 'Store Credit', 'Exchange', 'Bank Transfer']
     
+    updated = as_of(end_date)
     returns = []
     
     for i in range(num_returns):
-        order_id = f'ORD{random.randint(1, 10000):08d}'
+        order_id = random.choice(order_ids) if order_ids else f'ORD{random.randint(1, 10000):08d}'
         order_line_id = f'{order_id}-{random.randint(1, 8):03d}'
         product_id = f'PRD{random.randint(1, 1000):06d}'
         
         # Generate return request date (within 90 days of order)
-        order_date = datetime.now() - timedelta(days=random.randint(90, 730))
-        return_request_date = order_date + timedelta(days=random.randint(1, 90))
+        if start_date:
+            return_request_date = random_datetime(start_date, end_date)
+            order_date = return_request_date - timedelta(days=random.randint(1, 90))
+        else:
+            order_date = random_datetime(None, None, 90, 730)
+            return_request_date = order_date + timedelta(days=random.randint(1, 90))
         
         status = random.choice(return_statuses)
         reason = random.choice(return_reasons)
@@ -69,7 +82,7 @@ def generate_returns(num_returns=1500):
                 restocking_fee = round(refund_amount * 0.15, 2)  # 15% restocking fee
         
         return_record = {
-            'return_id': f'RET{i+1:08d}',
+            'return_id': f'RET{id_start + i:08d}',
             'order_id': order_id,
             'order_line_id': order_line_id,
             'product_id': product_id,
@@ -90,7 +103,7 @@ def generate_returns(num_returns=1500):
             'inspector_notes': fake.sentence() if status in ['Inspected', 'Refunded'] else '',
             'customer_comments': fake.sentence(),
             'created_date': return_request_date.strftime('%Y-%m-%d %H:%M:%S'),
-            'updated_date': datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+            'updated_date': updated.strftime('%Y-%m-%d %H:%M:%S')
         }
         
         returns.append(return_record)
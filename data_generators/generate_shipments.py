@@ -7,29 +7,37 @@ Generates synthetic shipment and delivery tracking data.
 import pandas as pd
 import numpy as np
 from faker import Faker
-from datetime import datetime, timedelta
+from datetime import timedelta
 import random
 
+from date_window import as_of, random_datetime
+
 fake = Faker()
 Faker.seed(42)
 np.random.seed(42)
 random.seed(42)
 
 
-def generate_shipments(num_shipments=8000):
-    """Generate shipment data."""
+def generate_shipments(num_shipments=8000, start_date=None, end_date=None, id_start=1, order_ids=None):
+    """Generate shipment data.
+
+    Shipments fall in the last 2 years, or in the inclusive `start_date` to
+    `end_date` window. `order_ids` restricts the orders shipped (default
+    ORD00000001-ORD00010000); shipment IDs are numbered from `id_start`.
+    """
     
     carriers = ['FedEx', 'UPS', 'DHL', 'USPS', 'Amazon Logistics']
     shipment_statuses = ['Pending', 'In Transit', 'Out for Delivery', 'Delivered', 'Failed Delivery', 'Returned']
     service_levels = ['Standard', 'Express', '2-Day', 'Overnight', 'Economy']
     
+    updated = as_of(end_date)
     shipments = []
     
     for i in range(num_shipments):
-        order_id = f'ORD{random.randint(1, 10000):08d}'
+        order_id = random.choice(order_ids) if order_ids else f'ORD{random.randint(1, 10000):08d}'
         
         # Generate shipment date
-        shipment_date = datetime.now() - timedelta(days=random.randint(1, 730))
+        shipment_date = random_datetime(start_date, end_date, 1, 730)
         
         status = random.choice(shipment_statuses)
         carrier = random.choice(carriers)
@@ -53,7 +61,7 @@ def generate_shipments(num_shipments=8000):
             actual_delivery = None
         
         shipment = {
-            'shipment_id': f'SHP{i+1:08d}',
+            'shipment_id': f'SHP{id_start + i:08d}',
             'order_id': order_id,
             'tracking_number': f'{carrier[:3].upper()}{random.randint(100000000, 999999999)}',
             'carrier': carrier,
@@ -75,7 +83,7 @@ def generate_shipments(num_shipments=8000):
             'insurance_value': round(random.uniform(100, 5000), 2) if random.random() > 0.7 else 0,
             'delivery_notes': fake.sentence() if random.random() > 0.8 else '',
             'created_date': shipment_date.strftime('%Y-%m-%d %H:%M:%S'),
-            'updated_date': datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+            'updated_date': updated.strftime('%Y-%m-%d %H:%M:%S')
         }
         
         shipments.append(shipment)
@@ -7,17 +7,23 @@ Generates synthetic manufacturing waste and scrap tracking data.
 import pandas as pd
 import numpy as np
 from faker import Faker
-from datetime import datetime, timedelta
+from datetime import timedelta
 import random
 
+from date_window import as_of, random_datetime
+
 fake = Faker()
 Faker.seed(42)
 np.random.seed(42)
 random.seed(42)
 
 
-def generate_waste(num_records=3000):
-    """Generate waste tracking data."""
+def generate_waste(num_records=3000, start_date=None, end_date=None, id_start=1):
+    """Generate waste tracking data.
+
+    Records fall in the last year, or in the inclusive `start_date` to
+    `end_date` window. Waste IDs are numbered from `id_start`.
+    """
     
     waste_types = [
         'Material Scrap', 'Packaging Waste', 'Defective Product',
@@ -32,10 +38,11 @@ def generate_waste(num_records=3000):
     
     waste_categories = ['Recyclable', 'Non-Recyclable', 'Hazardous', 'Organic']
     
+    updated = as_of(end_date)
     waste_records = []
     
     for i in range(num_records):
-        waste_date = datetime.now() - timedelta(days=random.randint(1, 365))
+        waste_date = random_datetime(start_date, end_date, 1, 365)
         
         waste_type = random.choice(waste_types)
         disposal_method = random.choice(disposal_methods)
@@ -68,7 +75,7 @@ def generate_waste(num_records=3000):
         disposal_cost = round(quantity * disposal_cost_per_unit.get(disposal_method, 5), 2)
         
         waste_record = {
-            'waste_id': f'WST{i+1:08d}',
+            'waste_id': f'WST{id_start + i:08d}',
             'waste_date': waste_date.strftime('%Y-%m-%d'),
             'waste_type': waste_type,
             'waste_category': category,
@@ -96,7 +103,7 @@ def generate_waste(num_records=3000):
             'carbon_footprint_kg': round(quantity * random.uniform(0.5, 5), 2),
             'recorded_by': fake.name(),
             'created_date': waste_date.strftime('%Y-%m-%d %H:%M:%S'),
-            'updated_date': datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+            'updated_date': updated.strftime('%Y-%m-%d %H:%M:%S')
         }
         
         waste_records.append(waste_record)
@@ -0,0 +1,91 @@
+"""
+Partitioned Dataset I/O
+
+Writes date-keyed datasets as Hive-style partition directories, e.g.
+`sample_data/orders/order_date=2024-01-15/part-00000.parquet`, so daily
+reloads only touch the partitions that changed, and reads either layout back.
+
+Order lines have no date of their own; they are partitioned by their
+order's date, so a date partition holds the orders and the lines of those
+orders and can be regenerated and reloaded as a unit.
+"""
+
+import os
+import sys
+import glob
+import pandas as pd
+
+# The partition layout is defined once, next to the loaders that read it
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'ingestion'))
+
+from common import PARTITION_COLUMNS, PARENT_PARTITIONS
+
+
+def with_parent_partition(df, parent_df, table_name):
+    """Add the parent's partition column to a child table, for write_partitioned."""
+    key, parent = PARENT_PARTITIONS[table_name]
+    partition_col = PARTITION_COLUMNS[parent]
+    return df.merge(parent_df[[key, partition_col]], on=key, how='left')
+
+
+def write_partitioned(df, output_dir, table_name, file_format='parquet', rows_per_file=100000):
+    """Write a DataFrame as `<output_dir>/<table>/<col>=<value>/part-NNNNN.<ext>`.
+
+    The partition column is encoded in the directory name and dropped from
+    the files, as in a Hive layout. Each partition that is written replaces
+    any part files already present, so re-running is idempotent; partitions
+    not present in `df` are left untouched.
+
+    Returns the number of partitions written.
+    """
+    if file_format not in ('parquet', 'csv'):
+        raise ValueError(f"Unsupported file format: {file_format}")
+
+    partition_col = PARTITION_COLUMNS[table_name]
+    table_dir = os.path.join(output_dir, table_name)
+
+    num_partitions = 0
+    for value, partition_df in df.groupby(partition_col, sort=True):
+        partition_dir = os.path.join(table_dir, f'{partition_col}={value}')
+        os.makedirs(partition_dir, exist_ok=True)
+
+        for stale_file in glob.glob(os.path.join(partition_dir, 'part-*')):
+            os.remove(stale_file)
+
+        partition_df = partition_df.drop(columns=[partition_col])
+        for part, start in enumerate(range(0, len(partition_df), rows_per_file)):
+            part_df = partition_df.iloc[start:start + rows_per_file]
+            part_path = os.path.join(partition_dir, f'part-{part:05d}.{file_format}')
+            if file_format == 'parquet':
+                part_df.to_parquet(part_path, index=False)
+            else:
+                part_df.to_csv(part_path, index=False)
+
+        num_partitions += 1
+
+    return num_partitions
+
+
+def read_dataset(data_dir, table_name):
+    """Read a dataset written by generate_all.py, flat CSV or partitioned.
+
+    Partitioned datasets get their partition column back as a plain
+    YYYY-MM-DD string column, matching the flat CSV layout (except tables
+    partitioned by a parent's date, which never had that column).
+    """
+    table_dir = os.path.join(data_dir, table_name)
+    if not os.path.isdir(table_dir):
+        return pd.read_csv(os.path.join(data_dir, f'{table_name}.csv'))
+
+    frames = []
+    for partition_dir in sorted(glob.glob(os.path.join(table_dir, '*=*'))):
+        column, value = os.path.basename(partition_dir).split('=', 1)
+        for path in sorted(glob.glob(os.path.join(partition_dir, 'part-*'))):
+            if path.endswith('.parquet'):
+                df = pd.read_parquet(path)
+            else:
+                df = pd.read_csv(path)
+            if table_name not in PARENT_PARTITIONS:
+                df[column] = value
+            frames.append(df)
+    return pd.concat(frames, ignore_index=True)
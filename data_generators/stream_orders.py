@@ -0,0 +1,266 @@
+"""
+Streaming Order Event Producer
+
+Emits a continuous stream of order and order-line events at a target rate,
+either to rotating newline-delimited JSON files (a local append-only log) or
+to a local TCP socket standing in for a message broker. Pair it with
+ingestion/stream_consumer.py for micro-batch loading.
+
+Each line is one event:
+    {"event_type": "order" | "order_line", "event_ts": <unix seconds>, "payload": {...}}
+
+The payloads have the same columns as generate_orders.py, so they load into
+the raw `orders` and `order_lines` tables unchanged.
+"""
+
+import os
+import re
+import json
+import time
+import socket
+import argparse
+import numpy as np
+from faker import Faker
+from datetime import datetime
+
+Faker.seed(42)
+
+ORDER_STATUSES = ['Pending', 'Confirmed', 'Processing', 'Shipped', 'Delivered', 'Cancelled']
+PAYMENT_METHODS = ['Credit Card', 'Debit Card', 'PayPal', 'Bank Transfer', 'Cash on Delivery']
+
+# Average events per order: one order event plus 1-8 line events
+AVG_EVENTS_PER_ORDER = 5.5
+
+
+class OrderEventGenerator:
+    """Generates blocks of order/order-line events with numpy.
+
+    Faker is only used up front to build small value pools, since calling
+    it per event would cap the achievable rate.
+    """
+
+    def __init__(self, start_order_id=50000001, num_customers=5000, num_products=1000,
+                 pool_size=1000, seed=42):
+        fake = Faker()
+        self.rng = np.random.default_rng(seed)
+        self.next_order_id = start_order_id
+        self.num_customers = num_customers
+        self.num_products = num_products
+
+        self.addresses = np.array([fake.street_address() for _ in range(pool_size)], dtype=object)
+        self.cities = np.array([fake.city() for _ in range(pool_size)], dtype=object)
+        self.states = np.array([fake.state_abbr() for _ in range(pool_size)], dtype=object)
+        self.zipcodes = np.array([fake.zipcode() for _ in range(pool_size)], dtype=object)
+
+    def _pick(self, pool, count):
+        return pool[self.rng.integers(0, len(pool), count)]
+
+    def block(self, num_orders):
+        """Return a list of JSON event lines for `num_orders` new orders."""
+        rng = self.rng
+        now = datetime.now()
+        event_ts = time.time()
+        order_date = now.strftime('%Y-%m-%d')
+        order_time = now.strftime('%H:%M:%S')
+        timestamp = now.strftime('%Y-%m-%d %H:%M:%S')
+
+        order_numbers = np.arange(self.next_order_id, self.next_order_id + num_orders)
+        self.next_order_id += num_orders
+        order_ids = [f'ORD{n:08d}' for n in order_numbers]
+
+        # Order lines, vectorized across the whole block
+        num_lines = rng.integers(1, 9, num_orders)
+        line_order = np.repeat(np.arange(num_orders), num_lines)
+        line_seq = np.arange(len(line_order)) - np.repeat(np.cumsum(num_lines) - num_lines, num_lines) + 1
+        quantities = rng.integers(1, 21, len(line_order))
+        unit_prices = np.round(rng.uniform(10, 500, len(line_order)), 2)
+        line_totals = np.round(quantities * unit_prices, 2)
+        discounts = np.where(rng.random(len(line_order)) > 0.8,
+                             np.round(rng.uniform(0, 20, len(line_order)), 2), 0.0)
+        products = rng.integers(1, self.num_products + 1, len(line_order))
+
+        subtotals = np.round(np.bincount(line_order, weights=line_totals, minlength=num_orders), 2)
+        taxes = np.round(subtotals * 0.08, 2)
+        shipping = np.round(rng.uniform(0, 50, num_orders), 2)
+        order_discounts = np.where(rng.random(num_orders) > 0.7,
+                                   np.round(rng.uniform(0, 100, num_orders), 2), 0.0)
+        totals = np.round(subtotals + taxes + shipping - order_discounts, 2)
+        statuses = self._pick(np.array(ORDER_STATUSES[:2], dtype=object), num_orders)
+        payments = self._pick(np.array(PAYMENT_METHODS, dtype=object), num_orders)
+        customers = rng.integers(1, self.num_customers + 1, num_orders)
+        ship_addr = self._pick(self.addresses, num_orders)
+        ship_city = self._pick(self.cities, num_orders)
+        ship_state = self._pick(self.states, num_orders)
+        ship_zip = self._pick(self.zipcodes, num_orders)
+
+        events = []
+        for i in range(num_orders):
+            events.append(json.dumps({
+                'event_type': 'order',
+                'event_ts': event_ts,
+                'payload': {
+                    'order_id': order_ids[i],
+                    'customer_id': f'CUS{customers[i]:07d}',
+                    'order_date': order_date,
+                    'order_time': order_time,
+                    'order_status': statuses[i],
+                    'payment_method': payments[i],
+                    'shipping_address': ship_addr[i],
+                    'shipping_city': ship_city[i],
+                    'shipping_state': ship_state[i],
+                    'shipping_postal_code': ship_zip[i],
+                    'billing_address': ship_addr[i],
+                    'billing_city': ship_city[i],
+                    'billing_state': ship_state[i],
+                    'billing_postal_code': ship_zip[i],
+                    'subtotal': float(subtotals[i]),
+                    'tax_amount': float(taxes[i]),
+                    'shipping_cost': float(shipping[i]),
+                    'discount_amount': float(order_discounts[i]),
+                    'total_amount': float(totals[i]),
+                    'notes': '',
+                    'created_date': timestamp,
+                    'updated_date': timestamp,
+                },
+            }))
+
+        for j in range(len(line_order)):
+            i = line_order[j]
+            events.append(json.dumps({
+                'event_type': 'order_line',
+                'event_ts': event_ts,
+                'payload': {
+                    'order_line_id': f'{order_ids[i]}-{line_seq[j]:03d}',
+                    'order_id': order_ids[i],
+                    'product_id': f'PRD{products[j]:06d}',
+                    'quantity': int(quantities[j]),
+                    'unit_price': float(unit_prices[j]),
+                    'discount_percent': float(discounts[j]),
+                    'line_total': float(line_totals[j]),
+                    'line_status': statuses[i],
+                    'notes': '',
+                },
+            }))
+
+        return events
+
+
+class RotatingFileSink:
+    """Append-only log of newline-delimited JSON files, rotated by size or age."""
+
+    FILE_PATTERN = re.compile(r'^events-(\d{8})\.ndjson$')
+
+    def __init__(self, directory, rotate_bytes=64 * 1024 * 1024, rotate_seconds=300):
+        self.directory = directory
+        self.rotate_bytes = rotate_bytes
+        self.rotate_seconds = rotate_seconds
+        os.makedirs(directory, exist_ok=True)
+
+        existing = [int(m.group(1)) for m in map(self.FILE_PATTERN.match, os.listdir(directory)) if m]
+        self.sequence = max(existing, default=0)
+        self.file = None
+        self._rotate()
+
+    def _rotate(self):
+        if self.file:
+            self.file.close()
+        self.sequence += 1
+        self.path = os.path.join(self.directory, f'events-{self.sequence:08d}.ndjson')
+        self.file = open(self.path, 'a')
+        self.opened_at = time.monotonic()
+        self.size = 0
+
+    def write(self, lines):
+        data = '\n'.join(lines) + '\n'
+        self.file.write(data)
+        self.file.flush()
+        self.size += len(data)
+        if self.size >= self.rotate_bytes or time.monotonic() - self.opened_at >= self.rotate_seconds:
+            self._rotate()
+
+    def close(self):
+        if self.file:
+            self.file.close()
+
+
+class SocketSink:
+    """Local TCP stand-in for a broker: serves the stream to one consumer."""
+
+    def __init__(self, host='127.0.0.1', port=9099):
+        self.server = socket.create_server((host, port))
+        print(f"Waiting for a consumer on {host}:{port}...")
+        self.connection, address = self.server.accept()
+        print(f"Consumer connected from {address[0]}:{address[1]}")
+
+    def write(self, lines):
+        self.connection.sendall(('\n'.join(lines) + '\n').encode('utf-8'))
+
+    def close(self):
+        self.connection.close()
+        self.server.close()
+
+
+def produce(generator, sink, events_per_second, duration_seconds=None, max_events=None):
+    """Emit events at the target rate until the duration or event limit is hit."""
+    start = time.monotonic()
+    last_report = start
+    emitted = 0
+
+    while True:
+        elapsed = time.monotonic() - start
+        if duration_seconds is not None and elapsed >= duration_seconds:
+            break
+        if max_events is not None and emitted >= max_events:
+            break
+
+        due = events_per_second * elapsed - emitted
+        if due < AVG_EVENTS_PER_ORDER:
+            time.sleep(min(0.01, AVG_EVENTS_PER_ORDER / events_per_second))
+            continue
+
+        lines = generator.block(max(1, int(due / AVG_EVENTS_PER_ORDER)))
+        sink.write(lines)
+        emitted += len(lines)
+
+        if time.monotonic() - last_report >= 5:
+            last_report = time.monotonic()
+            print(f"  {emitted} events, {emitted / (last_report - start):.0f} events/sec")
+
+    return emitted, time.monotonic() - start
+
+
+def main():
+    """Main execution function."""
+    parser = argparse.ArgumentParser(description='Stream order events to a local log or socket.')
+    parser.add_argument('--rate', type=float, default=1000, help='Target events per second')
+    parser.add_argument('--duration', type=float, help='Stop after this many seconds')
+    parser.add_argument('--max-events', type=int, help='Stop after this many events')
+    parser.add_argument('--sink', choices=['file', 'socket'], default='file')
+    parser.add_argument('--log-dir', default='sample_data/stream',
+                        help='Directory for rotating NDJSON files (file sink)')
+    parser.add_argument('--rotate-mb', type=float, default=64, help='Rotate files at this size')
+    parser.add_argument('--rotate-seconds', type=float, default=300, help='Rotate files at this age')
+    parser.add_argument('--host', default='127.0.0.1', help='Bind address (socket sink)')
+    parser.add_argument('--port', type=int, default=9099, help='Port (socket sink)')
+    parser.add_argument('--start-order-id', type=int, default=50000001,
+                        help='First order number, kept clear of the batch generator IDs')
+    args = parser.parse_args()
+
+    generator = OrderEventGenerator(start_order_id=args.start_order_id)
+    if args.sink == 'file':
+        sink = RotatingFileSink(args.log_dir, int(args.rotate_mb * 1024 * 1024), args.rotate_seconds)
+    else:
+        sink = SocketSink(args.host, args.port)
+
+    print(f"Streaming order events at {args.rate:.0f} events/sec (Ctrl-C to stop)...")
+    try:
+        emitted, elapsed = produce(generator, sink, args.rate, args.duration, args.max_events)
+        print(f"Emitted {emitted} events in {elapsed:.1f}s ({emitted / elapsed:.0f} events/sec)")
+    except KeyboardInterrupt:
+        print("Stopped.")
+    finally:
+        sink.close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,191 @@
+"""
+Product Performance Fan-out Benchmark
+
+Compares the two shapes of `metrics_product_performance` on synthetic
+facts in DuckDB, at generate_all.py's volumes times `--scale` (the
+product catalog stays at 1000 products):
+
+  - join first: every fact left-joined to the products on product_id,
+    then grouped. Each product contributes sales x returns x inspections
+    x waste rows, and the sums are inflated by the other facts' counts.
+  - aggregate first (the model): each fact grouped to product grain,
+    then joined 1:1.
+
+Reports the rows each shape feeds into its join output, the query time
+and whether the totals match the facts. The join-first query is only run
+while its join output stays under `--max-join-rows`.
+
+Usage:
+    python benchmark_product_performance.py --scale 1 2 5
+"""
+
+import time
+import argparse
+import numpy as np
+import pandas as pd
+import duckdb
+
+NUM_PRODUCTS = 1000
+
+# Fact rows at scale 1, as generated by generate_all.py
+FACT_VOLUMES = {
+    'fact_sales': 30000,
+    'fact_returns': 1500,
+    'fact_quality': 5000,
+    'fact_waste': 3000,
+}
+
+JOIN_FIRST = """
+    select
+        p.product_id,
+        count(distinct s.order_id) as total_orders,
+        sum(s.net_line_total) as total_revenue,
+        coalesce(sum(r.refund_amount), 0) as total_refund_amount,
+        coalesce(count(distinct q.inspection_id), 0) as total_inspections,
+        coalesce(sum(w.total_waste_cost), 0) as total_waste_cost
+    from dim_products p
+    left join fact_sales s on p.product_id = s.product_id
+    left join fact_returns r on p.product_id = r.product_id
+    left join fact_quality q on p.product_id = q.product_id
+    left join fact_waste w on p.product_id = w.product_id
+    group by 1
+"""
+
+AGGREGATE_FIRST = """
+    with sales as (
+        select product_id, count(distinct order_id) as total_orders, sum(net_line_total) as total_revenue
+        from fact_sales group by product_id
+    ),
+    returns as (
+        select product_id, sum(refund_amount) as total_refund_amount
+        from fact_returns group by product_id
+    ),
+    quality as (
+        select product_id, count(*) as total_inspections
+        from fact_quality group by product_id
+    ),
+    waste as (
+        select product_id, sum(total_waste_cost) as total_waste_cost
+        from fact_waste group by product_id
+    )
+    select
+        p.product_id,
+        coalesce(s.total_orders, 0) as total_orders,
+        s.total_revenue,
+        coalesce(r.total_refund_amount, 0) as total_refund_amount,
+        coalesce(q.total_inspections, 0) as total_inspections,
+        coalesce(w.total_waste_cost, 0) as total_waste_cost
+    from dim_products p
+    left join sales s on p.product_id = s.product_id
+    left join returns r on p.product_id = r.product_id
+    left join quality q on p.product_id = q.product_id
+    left join waste w on p.product_id = w.product_id
+"""
+
+
+def generate_facts(scale, seed=42):
+    """Return synthetic fact DataFrames with the columns the metrics read."""
+    rng = np.random.default_rng(seed)
+    product_ids = np.array([f'PRD{i:06d}' for i in range(1, NUM_PRODUCTS + 1)])
+
+    def products(n):
+        # Uniform over the catalog, like the data generators
+        return rng.choice(product_ids, size=n)
+
+    volumes = {name: max(1, int(rows * scale)) for name, rows in FACT_VOLUMES.items()}
+    n = volumes['fact_sales']
+    return {
+        'dim_products': pd.DataFrame({'product_id': product_ids}),
+        'fact_sales': pd.DataFrame({
+            'product_id': products(n),
+            'order_id': rng.integers(0, max(1, n // 3), n),
+            'net_line_total': rng.uniform(5, 500, n).round(2),
+        }),
+        'fact_returns': pd.DataFrame({
+            'product_id': products(volumes['fact_returns']),
+            'refund_amount': rng.uniform(5, 300, volumes['fact_returns']).round(2),
+        }),
+        'fact_quality': pd.DataFrame({
+            'product_id': products(volumes['fact_quality']),
+            'inspection_id': np.arange(volumes['fact_quality']),
+        }),
+        'fact_waste': pd.DataFrame({
+            'product_id': products(volumes['fact_waste']),
+            'total_waste_cost': rng.uniform(1, 200, volumes['fact_waste']).round(2),
+        }),
+    }
+
+
+def join_rows(con):
+    """Return the row counts each shape's joins produce."""
+    counts = {}
+    for table in FACT_VOLUMES:
+        counts[table] = dict(con.execute(
+            f"select product_id, count(*) from {table} group by product_id"
+        ).fetchall())
+
+    join_first = 0
+    for product_id in con.execute("select product_id from dim_products").fetchnumpy()['product_id']:
+        rows = 1
+        for table in FACT_VOLUMES:
+            rows *= max(1, counts[table].get(product_id, 0))  # Left join keeps one null row
+        join_first += rows
+
+    # Each fact is scanned once into its aggregate; the joins are 1:1 per product
+    aggregate_first = NUM_PRODUCTS * len(FACT_VOLUMES)
+    return join_first, aggregate_first
+
+
+def timed_query(con, sql):
+    start = time.perf_counter()
+    result = con.execute(sql).fetchdf()
+    return result, time.perf_counter() - start
+
+
+def benchmark(scale, max_join_rows):
+    con = duckdb.connect()
+    facts = generate_facts(scale)
+    for table, df in facts.items():
+        con.register(table, df)
+
+    join_first_rows, aggregate_first_rows = join_rows(con)
+    expected_revenue = facts['fact_sales']['net_line_total'].sum()
+
+    print(f"\nScale {scale}: " + ', '.join(f"{t} {len(df)}" for t, df in facts.items() if t != 'dim_products'))
+    print(f"  {'':<18} {'join rows':>16} {'time':>10} {'revenue total':>20}")
+
+    aggregate_result, aggregate_seconds = timed_query(con, AGGREGATE_FIRST)
+    aggregate_revenue = aggregate_result['total_revenue'].sum()
+
+    if join_first_rows <= max_join_rows:
+        join_result, join_seconds = timed_query(con, JOIN_FIRST)
+        print(f"  {'join first':<18} {join_first_rows:>16,} {join_seconds:>9.2f}s "
+              f"{join_result['total_revenue'].sum():>20,.2f}")
+    else:
+        print(f"  {'join first':<18} {join_first_rows:>16,} {'skipped':>10} {'(over --max-join-rows)':>20}")
+
+    print(f"  {'aggregate first':<18} {aggregate_first_rows:>16,} {aggregate_seconds:>9.2f}s "
+          f"{aggregate_revenue:>20,.2f}")
+    print(f"  {'facts':<18} {'':>16} {'':>10} {expected_revenue:>20,.2f}")
+    print(f"  Join rows reduced {join_first_rows / aggregate_first_rows:,.0f}x; "
+          f"aggregate-first totals {'match' if np.isclose(aggregate_revenue, expected_revenue) else 'DO NOT match'} the facts")
+
+
+def main():
+    """Run the benchmark at each requested scale."""
+    parser = argparse.ArgumentParser(description='Benchmark metrics_product_performance join fan-out.')
+    parser.add_argument('--scale', type=float, nargs='+', default=[1, 2, 5],
+                        help='Multiply the fact volumes (default: 1 2 5)')
+    parser.add_argument('--max-join-rows', type=int, default=200_000_000,
+                        help='Skip the join-first query above this many join rows')
+    args = parser.parse_args()
+
+    print("=" * 80)
+    print(f"PRODUCT PERFORMANCE FAN-OUT BENCHMARK ({NUM_PRODUCTS} products)")
+    print("=" * 80)
+    for scale in args.scale:
+        benchmark(scale, args.max_join_rows)
+
+
+if __name__ == '__main__':
+    main()
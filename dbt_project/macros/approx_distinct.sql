@@ -0,0 +1,74 @@
+{#
+    Distinct counts
+
+    count_distinct() switches between exact count(distinct) and the
+    adapter's HyperLogLog estimate (approx_count_distinct, ~1-2% error)
+    with the approx_distinct var.
+
+    The hll_* macros build and merge HyperLogLog sketches, so daily
+    aggregates can store a sketch per row and roll distinct counts up to
+    months or quarters without rescanning the facts:
+
+        hll_sketch(col)              aggregate: sketch of col's values
+        hll_merge_estimate(sketch)   aggregate: distinct count of the union
+                                     of the sketches being grouped
+#}
+
+{% macro count_distinct(expr) %}
+    {%- if var('approx_distinct') -%}
+        approx_count_distinct({{ expr }})
+    {%- else -%}
+        count(distinct {{ expr }})
+    {%- endif -%}
+{% endmacro %}
+
+
+{% macro hll_sketch(expr) %}
+    {{- return(adapter.dispatch('hll_sketch')(expr)) -}}
+{% endmacro %}
+
+{% macro default__hll_sketch(expr) %}
+    {{ exceptions.raise_compiler_error('HyperLogLog sketches are not supported on ' ~ target.type) }}
+{% endmacro %}
+
+{% macro databricks__hll_sketch(expr) %}
+    hll_sketch_agg({{ expr }})
+{% endmacro %}
+
+{% macro snowflake__hll_sketch(expr) %}
+    hll_export(hll_accumulate({{ expr }}))
+{% endmacro %}
+
+{% macro bigquery__hll_sketch(expr) %}
+    hll_count.init({{ expr }})
+{% endmacro %}
+
+{#- DuckDB has no sketch type; locally the exact set stands in for it -#}
+{% macro duckdb__hll_sketch(expr) %}
+    list(distinct {{ expr }})
+{% endmacro %}
+
+
+{% macro hll_merge_estimate(sketch) %}
+    {{- return(adapter.dispatch('hll_merge_estimate')(sketch)) -}}
+{% endmacro %}
+
+{% macro default__hll_merge_estimate(sketch) %}
+    {{ exceptions.raise_compiler_error('HyperLogLog sketches are not supported on ' ~ target.type) }}
+{% endmacro %}
+
+{% macro databricks__hll_merge_estimate(sketch) %}
+    hll_sketch_estimate(hll_union_agg({{ sketch }}))
+{% endmacro %}
+
+{% macro snowflake__hll_merge_estimate(sketch) %}
+    hll_estimate(hll_combine(hll_import({{ sketch }})))
+{% endmacro %}
+
+{% macro bigquery__hll_merge_estimate(sketch) %}
+    hll_count.merge({{ sketch }})
+{% endmacro %}
+
+{% macro duckdb__hll_merge_estimate(sketch) %}
+    len(list_distinct(flatten(list({{ sketch }}))))
+{% endmacro %}
@@ -0,0 +1,35 @@
+{#
+    Cross-adapter date helpers
+
+    Models use dbt's cross-database macros where one exists
+    (dbt.datediff, dbt.last_day, dbt.current_timestamp) and these where
+    none does, so the project builds on Databricks, Snowflake, BigQuery
+    and the local DuckDB target alike.
+#}
+
+{#
+    Day of week, 0 = Sunday ... 6 = Saturday on every adapter
+#}
+{% macro day_of_week(date_expr) %}
+    {{- return(adapter.dispatch('day_of_week')(date_expr)) -}}
+{% endmacro %}
+
+{% macro default__day_of_week(date_expr) %}
+    extract(dayofweek from {{ date_expr }})
+{% endmacro %}
+
+{% macro databricks__day_of_week(date_expr) %}
+    (dayofweek({{ date_expr }}) - 1)
+{% endmacro %}
+
+{% macro bigquery__day_of_week(date_expr) %}
+    (extract(dayofweek from {{ date_expr }}) - 1)
+{% endmacro %}
+
+{% macro snowflake__day_of_week(date_expr) %}
+    dayofweek({{ date_expr }})
+{% endmacro %}
+
+{% macro duckdb__day_of_week(date_expr) %}
+    dayofweek({{ date_expr }})
+{% endmacro %}
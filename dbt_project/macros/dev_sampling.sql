@@ -0,0 +1,86 @@
+{#
+    Dev sampling
+
+    Opt-in: with var dev_sample set, or on a target listed in var
+    dev_targets, staging models read a deterministic, hash-based sample of
+    the raw data sized by var test_data_limit, so dev builds of the marts
+    finish in seconds. Every other target, including any not listed,
+    reads the full data.
+
+    Customers are the sampling unit: about test_data_limit customers are
+    kept (those whose key hashes into bucket 0 of
+    count(customers) / test_data_limit buckets). Orders follow their
+    customer, and order lines, shipments and returns follow their order,
+    so every join between them still matches. Products are kept whole,
+    since every sampled order line needs its product. Waste and quality
+    inspections only join products, and are sampled on their own keys at
+    the same rate.
+
+    The same keys are sampled on every run. Set test_data_limit to none
+    (`--vars '{test_data_limit: null}'`) for a full build on a dev target.
+
+        dbt build --vars '{dev_sample: true}'
+
+        where {{ dev_sample('customer_id') }}
+        where {{ dev_sample_orders('order_id') }}
+#}
+
+{% macro dev_sampling_enabled() %}
+    {{- return(var('test_data_limit') and (var('dev_sample') or target.name in var('dev_targets'))) -}}
+{% endmacro %}
+
+
+{#- Buckets to hash keys into so that bucket 0 holds ~test_data_limit customers -#}
+{% macro dev_sample_buckets() %}
+    {%- if not execute or not dev_sampling_enabled() -%}
+        {{- return(1) -}}
+    {%- endif -%}
+    {%- set customers = run_query('select count(*) from ' ~ source('raw', 'customers')).columns[0].values()[0] -%}
+    {{- return([(customers / var('test_data_limit')) | round(0, 'ceil') | int, 1] | max) -}}
+{% endmacro %}
+
+
+{#- Predicate keeping the sampled values of a key (true when not sampling) -#}
+{% macro dev_sample(key) %}
+    {%- set buckets = dev_sample_buckets() -%}
+    {%- if buckets > 1 -%}
+        {{ hash_bucket(key, buckets) | trim }} = 0
+    {%- else -%}
+        1 = 1
+    {%- endif -%}
+{% endmacro %}
+
+
+{#- Predicate keeping the rows of the sampled customers' orders -#}
+{% macro dev_sample_orders(order_key) %}
+    {%- if dev_sample_buckets() > 1 -%}
+        {{ order_key }} in (
+            select order_id from {{ source('raw', 'orders') }}
+            where {{ dev_sample('customer_id') }}
+        )
+    {%- else -%}
+        1 = 1
+    {%- endif -%}
+{% endmacro %}
+
+
+{#- Stable bucket in [0, buckets) for a key, the same on every run -#}
+{% macro hash_bucket(expr, buckets) %}
+    {{- return(adapter.dispatch('hash_bucket')(expr, buckets)) -}}
+{% endmacro %}
+
+{% macro default__hash_bucket(expr, buckets) %}
+    mod(abs(hash({{ expr }})), {{ buckets }})
+{% endmacro %}
+
+{% macro databricks__hash_bucket(expr, buckets) %}
+    pmod(hash({{ expr }}), {{ buckets }})
+{% endmacro %}
+
+{% macro bigquery__hash_bucket(expr, buckets) %}
+    mod(abs(farm_fingerprint(cast({{ expr }} as string))), {{ buckets }})
+{% endmacro %}
+
+{% macro duckdb__hash_bucket(expr, buckets) %}
+    hash({{ expr }}) % {{ buckets }}
+{% endmacro %}
@@ -0,0 +1,120 @@
+{#
+    Incremental model helpers
+
+    Strategy per adapter: Databricks (Delta) and Snowflake merge on the
+    model's unique_key; BigQuery replaces whole date partitions
+    (insert_overwrite), which avoids a full-table merge scan.
+
+    Models that rebuild whole days (replace_partitions=true, e.g. daily
+    aggregates) replace them on every adapter: insert_overwrite of date
+    partitions on BigQuery, delete+insert on the model's unique_key (the
+    date) on Snowflake. A Databricks SQL warehouse cannot overwrite
+    partitions dynamically, so there the model's pre_hook deletes the days
+    and the model appends them (see replaced_partitions_filter).
+
+    The local DuckDB target uses delete+insert on the unique_key throughout.
+#}
+
+{% macro incremental_strategy(replace_partitions=false) %}
+    {%- if target.type == 'bigquery' -%}
+        {{- return('insert_overwrite') -}}
+    {%- elif replace_partitions -%}
+        {{- return('append' if target.type == 'databricks' else 'delete+insert') -}}
+    {%- else -%}
+        {{- return(merge_strategy()) -}}
+    {%- endif -%}
+{% endmacro %}
+
+
+{#
+    Row-level upsert on the unique_key, for models that are not
+    partitioned by date (e.g. per-customer aggregates)
+#}
+{% macro merge_strategy() %}
+    {{- return('delete+insert' if target.type == 'duckdb' else 'merge') -}}
+{% endmacro %}
+
+
+{#
+    partition_by for an incremental model: always partitioned on `field`
+    where the strategy replaces partitions (BigQuery), otherwise as the
+    physical layout vars select (see physical_layout.sql)
+#}
+{% macro incremental_partition_by(field, data_type='date') %}
+    {{- return(layout_partition_by(field, data_type, target.type == 'bigquery')) -}}
+{% endmacro %}
+
+
+{#
+    The `field` values (days) of `relation` with rows whose `updated_column`
+    is newer than the model's newest, minus `lookback_days`: the days a
+    replace_partitions model rebuilds
+#}
+{% macro changed_partitions(relation, field, updated_column, lookback_days) %}
+    select distinct {{ field }}
+    from {{ relation }}
+    where {{ updated_column }} > {{ incremental_cutoff(updated_column, lookback_days) }}
+{% endmacro %}
+
+
+{#
+    Filter for the rows a replace_partitions model rebuilds on an
+    incremental run, given the `changed` days (changed_partitions).
+
+    On Databricks the model's pre_hook has already deleted those days
+    (delete_replaced_partitions), so it selects every day missing from the
+    model instead: re-running `changed` after the delete would compare
+    against a high-water mark that may have been deleted with them.
+#}
+{% macro replaced_partitions_filter(field, changed) %}
+    {%- if target.type == 'databricks' -%}
+        {{ field }} not in (select distinct {{ field }} from {{ this }})
+    {%- else -%}
+        {{ field }} in ({{ changed }})
+    {%- endif -%}
+{% endmacro %}
+
+
+{#
+    pre_hook of a replace_partitions model: on Databricks, delete the
+    `changed` days the model is about to append again (delete+insert)
+#}
+{% macro delete_replaced_partitions(field, changed) %}
+    {%- if target.type == 'databricks' and is_incremental() -%}
+        delete from {{ this }} where {{ field }} in ({{ changed }})
+    {%- endif -%}
+{% endmacro %}
+
+
+{#
+    Cutoff for the rows an incremental run reprocesses: the newest
+    `column` already in the model, minus `lookback_days` to pick up
+    late-arriving updates. Only valid inside `is_incremental()`.
+#}
+{% macro incremental_cutoff(column, lookback_days) %}
+    cast({{ dbt.dateadd('day', -1 * lookback_days, '(select max(' ~ column ~ ') from ' ~ this ~ ')') }} as {{ dbt.type_timestamp() }})
+{% endmacro %}
+
+
+{#
+    Staging models over the large event tables are views by default. With
+    var incremental_staging they are incremental tables, merged on their
+    key, so casts and derived columns are computed once per new or changed
+    raw row instead of on every downstream rebuild.
+#}
+{% macro staging_materialization() %}
+    {{- return('incremental' if var('incremental_staging') else 'view') -}}
+{% endmacro %}
+
+
+{#
+    Condition appended to a staging model's source filter: on incremental
+    runs, only raw rows whose `source_column` is newer than the newest
+    `model_column` (default: the same name) already loaded, minus
+    var staging_lookback_days
+#}
+{% macro staging_incremental_filter(source_column, model_column=none) %}
+    {%- if is_incremental() -%}
+        and {{ source_column }} > {{ incremental_cutoff(model_column or source_column, var('staging_lookback_days')) }}
+    {%- endif -%}
+{% endmacro %}
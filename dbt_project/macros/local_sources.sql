@@ -0,0 +1,72 @@
+{#
+    Local DuckDB sources
+
+    On the duckdb target the raw sources are views over the generated
+    files in var local_data_path (relative to dbt_project/; default
+    ../sample_data), in whichever layout generate_all.py / backfill.py
+    wrote each table:
+
+        <table>/<date column>=<day>/*.parquet   (partitioned, Parquet)
+        <table>/<date column>=<day>/*.csv       (partitioned, CSV)
+        <table>.csv                             (flat CSV)
+
+    The generators write dates and times as text, so those columns are
+    cast to their raw DDL types (schemas/*/create_raw_tables.sql).
+
+    Registered by the on-run-start hook on every duckdb run, so they pick
+    up regenerated files; `dbt run-operation register_local_sources`
+    registers them for `dbt source freshness` and ad-hoc queries.
+#}
+
+{% macro register_local_sources(data_path=none) %}
+    {%- if not execute or target.type != 'duckdb' -%}
+        {{ return('') }}
+    {%- endif -%}
+    {%- set data_path = data_path or var('local_data_path') -%}
+    {%- set local_source_casts = {
+        'products': {'created_date': 'date', 'updated_date': 'date'},
+        'recipes': {'created_date': 'date', 'updated_date': 'date'},
+        'customers': {'account_created_date': 'date', 'last_order_date': 'date', 'updated_date': 'date'},
+        'orders': {'order_date': 'date', 'order_time': 'time', 'created_date': 'timestamp', 'updated_date': 'timestamp'},
+        'shipments': {'shipment_date': 'date', 'expected_delivery_date': 'date', 'actual_delivery_date': 'date',
+                      'created_date': 'timestamp', 'updated_date': 'timestamp'},
+        'returns': {'return_request_date': 'date', 'approved_date': 'date', 'received_date': 'date',
+                    'refund_date': 'date', 'created_date': 'timestamp', 'updated_date': 'timestamp'},
+        'waste': {'waste_date': 'date', 'disposal_date': 'date', 'created_date': 'timestamp', 'updated_date': 'timestamp'},
+        'quality_inspections': {'inspection_date': 'date', 'inspection_time': 'time', 'follow_up_date': 'date',
+                                'created_date': 'timestamp', 'updated_date': 'timestamp'}
+    } -%}
+
+    {%- for source_node in graph.sources.values() if source_node.source_name == 'raw' -%}
+        {%- set relation = source('raw', source_node.name) -%}
+        {%- if loop.first -%}
+            {% do run_query('create schema if not exists ' ~ relation.include(identifier=false)) %}
+        {%- endif -%}
+        {%- set scan = _local_source_scan(data_path ~ '/' ~ source_node.name) -%}
+        {%- if scan is none -%}
+            {{ log('No local data for raw.' ~ source_node.name ~ ' under ' ~ data_path, info=true) }}
+        {%- else -%}
+            {%- set casts = [] -%}
+            {%- for column, data_type in local_source_casts.get(source_node.name, {}).items() -%}
+                {%- do casts.append('cast(' ~ column ~ ' as ' ~ data_type ~ ') as ' ~ column) -%}
+            {%- endfor -%}
+            {%- set projection = 'select * replace (' ~ casts | join(', ') ~ ')' if casts else 'select *' -%}
+            {% do run_query('create or replace view ' ~ relation ~ ' as ' ~ projection ~ ' from ' ~ scan) %}
+        {%- endif -%}
+    {%- endfor -%}
+    {{ return('') }}
+{% endmacro %}
+
+
+{% macro _local_source_scan(table_path) %}
+    {%- for extension, reader in [('parquet', 'read_parquet'), ('csv', 'read_csv_auto')] -%}
+        {%- set pattern = table_path ~ '/*/*.' ~ extension -%}
+        {%- if run_query("select count(*) from glob('" ~ pattern ~ "')").columns[0].values()[0] > 0 -%}
+            {{ return(reader ~ "('" ~ pattern ~ "', hive_partitioning = true, union_by_name = true)") }}
+        {%- endif -%}
+    {%- endfor -%}
+    {%- if run_query("select count(*) from glob('" ~ table_path ~ ".csv')").columns[0].values()[0] > 0 -%}
+        {{ return("read_csv_auto('" ~ table_path ~ ".csv')") }}
+    {%- endif -%}
+    {{ return(none) }}
+{% endmacro %}
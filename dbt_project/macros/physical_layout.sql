@@ -0,0 +1,109 @@
+{#
+    Physical layout helpers
+
+    Per-adapter partitioning and clustering, selected through project vars
+    (see dbt_project.yml):
+
+    - fact_partitioning: partition facts on their date key
+      (BigQuery partition_by; Databricks PARTITIONED BY in the
+      'partitioned' layout)
+    - fact_clustering: cluster facts on the date key and the keys
+      dashboards filter on (BigQuery cluster_by, Snowflake cluster_by,
+      Databricks liquid clustering or ZORDER)
+    - databricks_layout: 'liquid' (CLUSTER BY; DBR 13.3+) or
+      'partitioned' (PARTITIONED BY the date + OPTIMIZE ZORDER BY)
+    - raw_table_clustering: clustering keys for the raw tables, applied
+      with `dbt run-operation apply_raw_table_layout`
+
+    Each macro returns none where it does not apply, which dbt treats as
+    unset.
+#}
+
+{% macro layout_partition_by(field, data_type='date', required=false) %}
+    {%- set wanted = required or var('fact_partitioning') -%}
+    {%- if wanted and target.type == 'bigquery' -%}
+        {{- return({'field': field, 'data_type': data_type, 'granularity': 'day'}) -}}
+    {%- elif wanted and target.type == 'databricks' and (required or var('databricks_layout') == 'partitioned') -%}
+        {{- return([field]) -}}
+    {%- else -%}
+        {{- return(none) -}}
+    {%- endif -%}
+{% endmacro %}
+
+
+{#
+    cluster_by for BigQuery (up to four columns, within each date
+    partition) and Snowflake (clustering key led by the date, since
+    Snowflake has no partitions)
+#}
+{% macro layout_cluster_by(date_field, columns) %}
+    {%- if not var('fact_clustering') -%}
+        {{- return(none) -}}
+    {%- elif target.type == 'bigquery' -%}
+        {{- return(columns[:4]) -}}
+    {%- elif target.type == 'snowflake' -%}
+        {{- return([date_field] + columns) -}}
+    {%- else -%}
+        {{- return(none) -}}
+    {%- endif -%}
+{% endmacro %}
+
+
+{#
+    liquid_clustered_by for Databricks in the 'liquid' layout. Liquid
+    clustering cannot be combined with partitioning, so models whose
+    strategy requires date partitions do not use it.
+#}
+{% macro layout_liquid_clustered_by(date_field, columns) %}
+    {%- if var('fact_clustering') and target.type == 'databricks' and var('databricks_layout') == 'liquid' -%}
+        {{- return([date_field] + columns) -}}
+    {%- else -%}
+        {{- return(none) -}}
+    {%- endif -%}
+{% endmacro %}
+
+
+{#
+    zorder for Databricks in the 'partitioned' layout: dbt-databricks runs
+    OPTIMIZE ... ZORDER BY after each build
+#}
+{% macro layout_zorder(columns) %}
+    {%- if var('fact_clustering') and target.type == 'databricks' and var('databricks_layout') == 'partitioned' -%}
+        {{- return(columns) -}}
+    {%- else -%}
+        {{- return(none) -}}
+    {%- endif -%}
+{% endmacro %}
+
+
+{#
+    Apply raw_table_clustering to the existing raw tables:
+
+        dbt run-operation apply_raw_table_layout
+
+    Snowflake sets the clustering key and Databricks sets liquid clustering
+    (or, in the 'partitioned' layout, Z-orders the files). BigQuery cannot
+    change partitioning or clustering with DDL; its layout is declared in
+    schemas/bigquery/create_raw_tables.sql.
+#}
+{% macro apply_raw_table_layout(dry_run=false) %}
+    {%- set clustering = var('raw_table_clustering') -%}
+    {%- for table_name, columns in clustering.items() -%}
+        {%- set relation = source('raw', table_name) -%}
+        {%- if target.type == 'snowflake' -%}
+            {%- set sql = 'alter table ' ~ relation ~ ' cluster by (' ~ columns | join(', ') ~ ')' -%}
+        {%- elif target.type == 'databricks' and var('databricks_layout') == 'liquid' -%}
+            {%- set sql = 'alter table ' ~ relation ~ ' cluster by (' ~ columns | join(', ') ~ ')' -%}
+        {%- elif target.type == 'databricks' -%}
+            {#- The date is the partition column; Z-order on the rest -#}
+            {%- set sql = 'optimize ' ~ relation ~ ' zorder by (' ~ columns[1:] | join(', ') ~ ')' -%}
+        {%- else -%}
+            {{ log('Raw table layout is declared in the DDL on ' ~ target.type ~ '; nothing to apply', info=true) }}
+            {{ return(none) }}
+        {%- endif -%}
+        {{ log(sql, info=true) }}
+        {%- if not dry_run -%}
+            {% do run_query(sql) %}
+        {%- endif -%}
+    {%- endfor -%}
+{% endmacro %}
@@ -0,0 +1,56 @@
+{{
+    config(
+        materialized='incremental',
+        schema='marts',
+        unique_key='customer_id',
+        incremental_strategy=merge_strategy(),
+        on_schema_change='append_new_columns'
+    )
+}}
+
+-- Aggregate: Customer Orders
+-- Grain: One row per customer with orders
+--
+-- Running RFM components. Incremental: customers with fact_sales rows
+-- updated since the newest source_updated_date already aggregated (minus
+-- var fact_sales_lookback_days) are recomputed over their full history
+-- and merged on customer_id; other customers are left untouched.
+-- Recency and the RFM scores depend on the current date and on all
+-- customers, so metrics_customer_analytics computes them at query time.
+
+with sales as (
+    select * from {{ ref('fact_sales') }}
+    {% if is_incremental() %}
+    where customer_id in (
+        select distinct customer_id
+        from {{ ref('fact_sales') }}
+        where source_updated_date > {{ incremental_cutoff('source_updated_date', var('fact_sales_lookback_days')) }}
+    )
+    {% endif %}
+),
+
+final as (
+    select
+        customer_id,
+        
+        -- RFM Components
+        min(date_key) as first_purchase_date,
+        max(date_key) as last_purchase_date,
+        {{ count_distinct('order_id') }} as frequency_orders,
+        sum(net_line_total) as monetary_value,
+        
+        -- Additional components
+        count(*) as line_count,
+        sum(quantity) as total_units_purchased,
+        
+        -- Incremental high-water mark
+        max(source_updated_date) as source_updated_date,
+        
+        {{ dbt.current_timestamp() }} as _dbt_loaded_at
+        
+    from sales
+    where customer_id is not null
+    group by 1
+)
+
+select * from final
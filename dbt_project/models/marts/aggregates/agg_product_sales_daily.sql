@@ -0,0 +1,53 @@
+{{
+    config(
+        materialized='incremental',
+        schema='marts',
+        unique_key='date_key',
+        incremental_strategy=incremental_strategy(replace_partitions=true),
+        partition_by=incremental_partition_by('date_key'),
+        pre_hook="{{ delete_replaced_partitions('date_key', changed_partitions(ref('fact_sales'), 'date_key', 'source_updated_date', var('fact_sales_lookback_days'))) }}",
+        on_schema_change='append_new_columns'
+    )
+}}
+
+-- Aggregate: Daily Product Sales
+-- Grain: One row per day and product
+--
+-- Incremental like agg_sales_daily: days with updated fact_sales rows are
+-- rebuilt whole. Every column adds up across days, including order_count,
+-- since an order has a single date_key; distinct customers roll up by
+-- merging customer_id_sketch.
+
+with sales as (
+    select * from {{ ref('fact_sales') }}
+    {% if is_incremental() %}
+    where {{ replaced_partitions_filter('date_key', changed_partitions(ref('fact_sales'), 'date_key', 'source_updated_date', var('fact_sales_lookback_days'))) }}
+    {% endif %}
+),
+
+final as (
+    select
+        date_key,
+        product_id,
+        
+        -- Metrics
+        {{ count_distinct('order_id') }} as order_count,
+        count(*) as line_count,
+        sum(quantity) as units_sold,
+        sum(net_line_total) as revenue,
+        sum(gross_profit) as gross_profit,
+        sum(unit_price) as total_unit_price,  -- avg selling price = total_unit_price / line_count
+        
+        -- Mergeable HyperLogLog sketch for distinct customers over any period
+        {{ hll_sketch('customer_id') }} as customer_id_sketch,
+        
+        -- Incremental high-water mark
+        max(source_updated_date) as source_updated_date,
+        
+        {{ dbt.current_timestamp() }} as _dbt_loaded_at
+        
+    from sales
+    group by 1, 2
+)
+
+select * from final
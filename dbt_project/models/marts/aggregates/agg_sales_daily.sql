@@ -0,0 +1,65 @@
+{{
+    config(
+        materialized='incremental',
+        schema='marts',
+        unique_key='date_key',
+        incremental_strategy=incremental_strategy(replace_partitions=true),
+        partition_by=incremental_partition_by('date_key'),
+        pre_hook="{{ delete_replaced_partitions('date_key', changed_partitions(ref('fact_sales'), 'date_key', 'source_updated_date', var('fact_sales_lookback_days'))) }}",
+        on_schema_change='append_new_columns'
+    )
+}}
+
+-- Aggregate: Daily Sales
+-- Grain: One row per day, product category/subcategory, customer
+-- segment/type and shipping state
+--
+-- Incremental: each run rebuilds, whole, every day with fact_sales rows
+-- updated since the newest source_updated_date already aggregated (minus
+-- var fact_sales_lookback_days). Other days are left untouched. An order
+-- has a single date_key, so order counts add up across days within a
+-- category/segment/state; customer counts do not, so roll them up by
+-- merging customer_id_sketch (see metrics_sales_monthly).
+-- Distinct counts are exact unless var approx_distinct is set.
+
+with sales as (
+    select * from {{ ref('fact_sales') }}
+    {% if is_incremental() %}
+    where {{ replaced_partitions_filter('date_key', changed_partitions(ref('fact_sales'), 'date_key', 'source_updated_date', var('fact_sales_lookback_days'))) }}
+    {% endif %}
+),
+
+final as (
+    select
+        date_key,
+        order_month,
+        order_quarter,
+        order_year,
+        product_category,
+        product_subcategory,
+        customer_segment,
+        customer_type,
+        shipping_state,
+        
+        -- Metrics
+        {{ count_distinct('order_id') }} as order_count,
+        {{ count_distinct('customer_id') }} as customer_count,
+        count(*) as line_count,
+        sum(quantity) as units_sold,
+        sum(net_line_total) as revenue,
+        sum(gross_profit) as gross_profit,
+        sum(order_discount_amount) as total_discounts,
+        
+        -- Mergeable HyperLogLog sketch for distinct customers over any period
+        {{ hll_sketch('customer_id') }} as customer_id_sketch,
+        
+        -- Incremental high-water mark
+        max(source_updated_date) as source_updated_date,
+        
+        {{ dbt.current_timestamp() }} as _dbt_loaded_at
+        
+    from sales
+    group by 1, 2, 3, 4, 5, 6, 7, 8, 9
+)
+
+select * from final
@@ -6,39 +6,48 @@
 }}
 
 -- Dimension: Customer
--- Slowly Changing Dimension Type 1
+-- Current version of each customer (Type 1 view of the SCD Type 2 history
+-- in dim_customers_history; facts join the history at order time)
 
 with customers as (
     select * from {{ ref('stg_customers') }}
 ),
 
+current_versions as (
+    select * from {{ ref('dim_customers_history') }}
+    where is_current
+),
+
 final as (
     select
-        customer_id,
-        customer_type,
-        customer_name,
-        email,
-        phone,
-        address_line1,
-        address_line2,
-        city,
-        state,
-        postal_code,
-        country,
-        customer_segment,
-        lifetime_value,
-        total_orders,
-        avg_order_value,
-        is_active,
-        credit_limit,
-        payment_terms_days,
-        account_created_date,
-        last_order_date,
-        days_since_first_order,
-        days_since_last_order,
-        updated_date,
-        current_timestamp() as _dbt_loaded_at
-    from customers
+        c.customer_id,
+        v.customer_version_key,
+        v.valid_from as version_valid_from,
+        c.customer_type,
+        c.customer_name,
+        c.email,
+        c.phone,
+        c.address_line1,
+        c.address_line2,
+        c.city,
+        c.state,
+        c.postal_code,
+        c.country,
+        c.customer_segment,
+        c.lifetime_value,
+        c.total_orders,
+        c.avg_order_value,
+        c.is_active,
+        c.credit_limit,
+        c.payment_terms_days,
+        c.account_created_date,
+        c.last_order_date,
+        c.days_since_first_order,
+        c.days_since_last_order,
+        c.updated_date,
+        {{ dbt.current_timestamp() }} as _dbt_loaded_at
+    from customers c
+    left join current_versions v on c.customer_id = v.customer_id
 )
 
 select * from final
@@ -0,0 +1,62 @@
+{{
+    config(
+        materialized='table',
+        schema='marts'
+    )
+}}
+
+-- Dimension: Customer History
+-- Slowly Changing Dimension Type 2
+-- Grain: One row per customer version (snapshots/snap_customers.sql)
+--
+-- valid_from/valid_to are business dates for point-in-time joins: a
+-- version is valid from the updated_date that introduced it until the
+-- next version's. The first version also covers everything before it,
+-- so facts older than the first snapshot still find a version.
+
+with versions as (
+    select
+        *,
+        row_number() over (partition by customer_id order by dbt_valid_from) as version_number
+    from {{ ref('snap_customers') }}
+),
+
+validity as (
+    select
+        *,
+        case
+            when version_number = 1 then cast('1900-01-01' as date)
+            else cast(updated_date as date)
+        end as valid_from
+    from versions
+),
+
+final as (
+    select
+        dbt_scd_id as customer_version_key,
+        customer_id,
+        version_number,
+        customer_type,
+        customer_name,
+        email,
+        phone,
+        address_line1,
+        address_line2,
+        city,
+        state,
+        postal_code,
+        country,
+        customer_segment,
+        is_active,
+        credit_limit,
+        payment_terms_days,
+        row_hash,
+        valid_from,
+        lead(valid_from) over (partition by customer_id order by version_number) as valid_to,
+        dbt_valid_to is null as is_current,
+        updated_date,
+        {{ dbt.current_timestamp() }} as _dbt_loaded_at
+    from validity
+)
+
+select * from final
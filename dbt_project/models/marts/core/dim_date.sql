@@ -24,10 +24,10 @@ final as (
         extract(quarter from date_day) as quarter,
         extract(month from date_day) as month,
         extract(day from date_day) as day,
-        extract(dayofweek from date_day) as day_of_week,
+        {{ day_of_week('date_day') }} as day_of_week,
         extract(dayofyear from date_day) as day_of_year,
         extract(week from date_day) as week_of_year,
-        case extract(dayofweek from date_day)
+        case {{ day_of_week('date_day') }}
             when 0 then 'Sunday'
             when 1 then 'Monday'
             when 2 then 'Tuesday'
@@ -50,9 +50,9 @@ final as (
             when 11 then 'November'
             when 12 then 'December'
         end as month_name,
-        case when extract(dayofweek from date_day) in (0, 6) then true else false end as is_weekend,
+        case when {{ day_of_week('date_day') }} in (0, 6) then true else false end as is_weekend,
         date_trunc('month', date_day) as first_day_of_month,
-        last_day(date_day, 'month') as last_day_of_month,
+        {{ dbt.last_day('date_day', 'month') }} as last_day_of_month,
         date_trunc('quarter', date_day) as first_day_of_quarter,
         date_trunc('year', date_day) as first_day_of_year
     from date_spine
@@ -6,33 +6,42 @@
 }}
 
 -- Dimension: Product
--- Slowly Changing Dimension Type 1
+-- Current version of each product (Type 1 view of the SCD Type 2 history
+-- in dim_products_history; facts join the history at order time)
 
 with products as (
     select * from {{ ref('stg_products') }}
 ),
 
+current_versions as (
+    select * from {{ ref('dim_products_history') }}
+    where is_current
+),
+
 final as (
     select
-        product_id,
-        sku,
-        product_name,
-        category,
-        subcategory,
-        brand,
-        unit_cost,
-        unit_price,
-        profit_margin,
-        profit_margin_pct,
-        weight_kg,
-        dimensions_cm,
-        is_active,
-        reorder_point,
-        lead_time_days,
-        created_date,
-        updated_date,
-        current_timestamp() as _dbt_loaded_at
-    from products
+        p.product_id,
+        v.product_version_key,
+        v.valid_from as version_valid_from,
+        p.sku,
+        p.product_name,
+        p.category,
+        p.subcategory,
+        p.brand,
+        p.unit_cost,
+        p.unit_price,
+        p.profit_margin,
+        p.profit_margin_pct,
+        p.weight_kg,
+        p.dimensions_cm,
+        p.is_active,
+        p.reorder_point,
+        p.lead_time_days,
+        p.created_date,
+        p.updated_date,
+        {{ dbt.current_timestamp() }} as _dbt_loaded_at
+    from products p
+    left join current_versions v on p.product_id = v.product_id
 )
 
 select * from final
@@ -0,0 +1,61 @@
+{{
+    config(
+        materialized='table',
+        schema='marts'
+    )
+}}
+
+-- Dimension: Product History
+-- Slowly Changing Dimension Type 2
+-- Grain: One row per product version (snapshots/snap_products.sql)
+--
+-- valid_from/valid_to are business dates for point-in-time joins, as in
+-- dim_customers_history.
+
+with versions as (
+    select
+        *,
+        row_number() over (partition by product_id order by dbt_valid_from) as version_number
+    from {{ ref('snap_products') }}
+),
+
+validity as (
+    select
+        *,
+        case
+            when version_number = 1 then cast('1900-01-01' as date)
+            else cast(updated_date as date)
+        end as valid_from
+    from versions
+),
+
+final as (
+    select
+        dbt_scd_id as product_version_key,
+        product_id,
+        version_number,
+        sku,
+        product_name,
+        category,
+        subcategory,
+        brand,
+        unit_cost,
+        unit_price,
+        round(unit_price - unit_cost, 2) as profit_margin,
+        round((unit_price - unit_cost) / nullif(unit_cost, 0) * 100, 2) as profit_margin_pct,
+        weight_kg,
+        dimensions_cm,
+        is_active,
+        reorder_point,
+        lead_time_days,
+        row_hash,
+        valid_from,
+        lead(valid_from) over (partition by product_id order by version_number) as valid_to,
+        dbt_valid_to is null as is_current,
+        created_date,
+        updated_date,
+        {{ dbt.current_timestamp() }} as _dbt_loaded_at
+    from validity
+)
+
+select * from final
@@ -1,19 +1,25 @@
 {{
     config(
         materialized='table',
-        schema='marts'
+        schema='marts',
+        partition_by=layout_partition_by('date_key'),
+        cluster_by=layout_cluster_by('date_key', ['product_id']),
+        liquid_clustered_by=layout_liquid_clustered_by('date_key', ['product_id']),
+        zorder=layout_zorder(['product_id'])
     )
 }}
 
 -- Fact: Quality Inspections
 -- Grain: One row per inspection
+-- Product attributes are the version valid on the inspection date
 
 with inspections as (
     select * from {{ ref('stg_quality_inspections') }}
 ),
 
 products as (
-    select * from {{ ref('dim_products') }}
+    -- Product versions, joined as of the fact's date
+    select * from {{ ref('dim_products_history') }}
 ),
 
 final as (
@@ -24,6 +30,7 @@ final as (
         i.batch_id,
         i.order_id,
         i.inspection_date as date_key,
+        p.product_version_key,
         
         -- Attributes
         i.inspection_type,
@@ -64,9 +71,11 @@ final as (
         p.subcategory as product_subcategory,
         p.brand as product_brand,
         
-        current_timestamp() as _dbt_loaded_at
+        {{ dbt.current_timestamp() }} as _dbt_loaded_at
     from inspections i
     left join products p on i.product_id = p.product_id
+        and i.inspection_date >= p.valid_from
+        and (p.valid_to is null or i.inspection_date < p.valid_to)
 )
 
 select * from final
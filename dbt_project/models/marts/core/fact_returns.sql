@@ -1,23 +1,30 @@
 {{
     config(
         materialized='table',
-        schema='marts'
+        schema='marts',
+        partition_by=layout_partition_by('date_key'),
+        cluster_by=layout_cluster_by('date_key', ['product_id', 'customer_id']),
+        liquid_clustered_by=layout_liquid_clustered_by('date_key', ['product_id', 'customer_id']),
+        zorder=layout_zorder(['product_id', 'customer_id'])
     )
 }}
 
 -- Fact: Returns
 -- Grain: One row per return
+-- Product and customer attributes are the versions valid on the request date
 
 with returns as (
     select * from {{ ref('stg_returns') }}
 ),
 
 products as (
-    select * from {{ ref('dim_products') }}
+    -- Product versions, joined as of the fact's date
+    select * from {{ ref('dim_products_history') }}
 ),
 
 customers as (
-    select * from {{ ref('dim_customers') }}
+    -- Customer versions, joined as of the fact's date
+    select * from {{ ref('dim_customers_history') }}
 ),
 
 final as (
@@ -29,6 +36,8 @@ final as (
         r.product_id,
         r.customer_id,
         r.return_request_date as date_key,
+        p.product_version_key,
+        c.customer_version_key,
         
         -- Attributes
         r.return_reason,
@@ -65,10 +74,14 @@ final as (
         c.customer_segment,
         c.customer_type,
         
-        current_timestamp() as _dbt_loaded_at
+        {{ dbt.current_timestamp() }} as _dbt_loaded_at
     from returns r
     left join products p on r.product_id = p.product_id
+        and r.return_request_date >= p.valid_from
+        and (p.valid_to is null or r.return_request_date < p.valid_to)
     left join customers c on r.customer_id = c.customer_id
+        and r.return_request_date >= c.valid_from
+        and (c.valid_to is null or r.return_request_date < c.valid_to)
 )
 
 select * from final
@@ -1,15 +1,44 @@
 {{
     config(
-        materialized='table',
-        schema='marts'
+        materialized='incremental',
+        schema='marts',
+        unique_key='order_line_id',
+        incremental_strategy=incremental_strategy(),
+        partition_by=incremental_partition_by('date_key'),
+        cluster_by=layout_cluster_by('date_key', ['product_id', 'customer_id']),
+        liquid_clustered_by=layout_liquid_clustered_by('date_key', ['product_id', 'customer_id']),
+        zorder=layout_zorder(['product_id', 'customer_id']),
+        on_schema_change='append_new_columns'
     )
 }}
 
 -- Fact: Sales Orders
 -- Grain: One row per order line
+-- Product and customer attributes are the versions valid on the order date
+--
+-- Incremental: each run reprocesses only the orders updated since the
+-- newest source_updated_date already loaded, minus a lookback window
+-- (var fact_sales_lookback_days) for late-arriving updates. Order lines
+-- have no updated_date of their own and change with their order header.
+-- Rows are merged on order_line_id (Databricks/Delta, Snowflake); on
+-- BigQuery every date_key partition containing a changed order is
+-- rebuilt whole (insert_overwrite). Rebuild from scratch with
+--   dbt run --full-refresh --select fact_sales
 
 with orders as (
     select * from {{ ref('stg_orders') }}
+    {% if is_incremental() %}
+    {% if incremental_strategy() == 'insert_overwrite' %}
+    -- Every order on an affected day: the partition is replaced whole
+    where order_date in (
+        select distinct order_date
+        from {{ ref('stg_orders') }}
+        where updated_date > {{ incremental_cutoff('source_updated_date', var('fact_sales_lookback_days')) }}
+    )
+    {% else %}
+    where updated_date > {{ incremental_cutoff('source_updated_date', var('fact_sales_lookback_days')) }}
+    {% endif %}
+    {% endif %}
 ),
 
 order_lines as (
@@ -17,11 +46,13 @@ order_lines as (
 ),
 
 products as (
-    select * from {{ ref('dim_products') }}
+    -- Product versions, joined as of the fact's date
+    select * from {{ ref('dim_products_history') }}
 ),
 
 customers as (
-    select * from {{ ref('dim_customers') }}
+    -- Customer versions, joined as of the fact's date
+    select * from {{ ref('dim_customers_history') }}
 ),
 
 final as (
@@ -32,6 +63,8 @@ final as (
         o.customer_id,
         ol.product_id,
         o.order_date as date_key,
+        p.product_version_key,
+        c.customer_version_key,
         
         -- Degenerate dimensions
         o.order_status,
@@ -79,11 +112,18 @@ final as (
         o.order_day_of_week,
         o.order_hour,
         
-        current_timestamp() as _dbt_loaded_at
+        -- Incremental high-water mark
+        o.updated_date as source_updated_date,
+        
+        {{ dbt.current_timestamp() }} as _dbt_loaded_at
     from order_lines ol
     inner join orders o on ol.order_id = o.order_id
     left join products p on ol.product_id = p.product_id
+        and o.order_date >= p.valid_from
+        and (p.valid_to is null or o.order_date < p.valid_to)
     left join customers c on o.customer_id = c.customer_id
+        and o.order_date >= c.valid_from
+        and (c.valid_to is null or o.order_date < c.valid_to)
 )
 
 select * from final
@@ -1,19 +1,25 @@
 {{
     config(
         materialized='table',
-        schema='marts'
+        schema='marts',
+        partition_by=layout_partition_by('date_key'),
+        cluster_by=layout_cluster_by('date_key', ['product_id']),
+        liquid_clustered_by=layout_liquid_clustered_by('date_key', ['product_id']),
+        zorder=layout_zorder(['product_id'])
     )
 }}
 
 -- Fact: Waste
 -- Grain: One row per waste record
+-- Product attributes are the version valid on the waste date
 
 with waste as (
     select * from {{ ref('stg_waste') }}
 ),
 
 products as (
-    select * from {{ ref('dim_products') }}
+    -- Product versions, joined as of the fact's date
+    select * from {{ ref('dim_products_history') }}
 ),
 
 final as (
@@ -23,6 +29,7 @@ final as (
         w.product_id,
         w.batch_id,
         w.waste_date as date_key,
+        p.product_version_key,
         
         -- Attributes
         w.waste_type,
@@ -62,9 +69,11 @@ final as (
         p.subcategory as product_subcategory,
         p.brand as product_brand,
         
-        current_timestamp() as _dbt_loaded_at
+        {{ dbt.current_timestamp() }} as _dbt_loaded_at
     from waste w
     left join products p on w.product_id = p.product_id
+        and w.waste_date >= p.valid_from
+        and (p.valid_to is null or w.waste_date < p.valid_to)
 )
 
 select * from final
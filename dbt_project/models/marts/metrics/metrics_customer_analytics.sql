@@ -7,8 +7,19 @@
 
 -- Customer Analytics Metrics
 -- Tableau-ready view for customer analytics including RFM
+-- RFM components come from the incrementally maintained agg_customer_orders;
+-- only recency and the scores, which move with the date, are computed here
 
-with customer_summary as (
+with customer_returns as (
+    select
+        customer_id,
+        count(*) as total_returns,  -- One row per return
+        sum(refund_amount) as total_refunds
+    from {{ ref('fact_returns') }}
+    group by customer_id
+),
+
+customer_summary as (
     select
         c.customer_id,
         c.customer_name,
@@ -19,23 +30,22 @@ with customer_summary as (
         c.account_created_date,
         
         -- RFM Components
-        max(s.date_key) as last_purchase_date,
-        datediff('day', max(s.date_key), current_date()) as recency_days,
-        count(distinct s.order_id) as frequency_orders,
-        sum(s.net_line_total) as monetary_value,
+        o.last_purchase_date,
+        {{ dbt.datediff("o.last_purchase_date", "current_date()", 'day') }} as recency_days,
+        coalesce(o.frequency_orders, 0) as frequency_orders,
+        o.monetary_value,
         
         -- Additional metrics
-        avg(s.net_line_total) as avg_order_value,
-        sum(s.quantity) as total_units_purchased,
+        o.monetary_value / nullif(o.line_count, 0) as avg_order_value,
+        o.total_units_purchased,
         
         -- Return metrics
-        coalesce(count(distinct r.return_id), 0) as total_returns,
-        coalesce(sum(r.refund_amount), 0) as total_refunds
+        coalesce(r.total_returns, 0) as total_returns,
+        coalesce(r.total_refunds, 0) as total_refunds
         
     from {{ ref('dim_customers') }} c
-    left join {{ ref('fact_sales') }} s on c.customer_id = s.customer_id
-    left join {{ ref('fact_returns') }} r on c.customer_id = r.customer_id
-    group by 1, 2, 3, 4, 5, 6, 7
+    left join {{ ref('agg_customer_orders') }} o on c.customer_id = o.customer_id
+    left join customer_returns r on c.customer_id = r.customer_id
 ),
 
 rfm_scores as (
@@ -7,8 +7,53 @@
 
 -- Product Performance Metrics
 -- Tableau-ready view for product analytics
+--
+-- Each fact is aggregated to product grain on its own, then joined 1:1 to
+-- the product dimension. Joining the raw facts first would multiply every
+-- product's sales x returns x inspections x waste rows before the group by,
+-- inflating the sums (see benchmark_product_performance.py). Sales come
+-- from the incrementally maintained agg_product_sales_daily.
 
-with product_metrics as (
+with sales as (
+    select
+        product_id,
+        sum(order_count) as total_orders,  -- An order falls on a single day
+        sum(units_sold) as total_units_sold,
+        sum(revenue) as total_revenue,
+        sum(gross_profit) as total_gross_profit,
+        sum(total_unit_price) / nullif(sum(line_count), 0) as avg_selling_price
+    from {{ ref('agg_product_sales_daily') }}
+    group by product_id
+),
+
+returns as (
+    select
+        product_id,
+        sum(quantity_returned) as total_units_returned,
+        sum(refund_amount) as total_refund_amount
+    from {{ ref('fact_returns') }}
+    group by product_id
+),
+
+quality as (
+    select
+        product_id,
+        count(*) as total_inspections,  -- One row per inspection
+        sum(case when is_passed = 1 then 1 else 0 end) as passed_inspections,
+        avg(defect_rate) as avg_defect_rate
+    from {{ ref('fact_quality') }}
+    group by product_id
+),
+
+waste as (
+    select
+        product_id,
+        sum(total_waste_cost) as total_waste_cost
+    from {{ ref('fact_waste') }}
+    group by product_id
+),
+
+product_metrics as (
     select
         p.product_id,
         p.product_name,
@@ -18,30 +63,29 @@ with product_metrics as (
         p.brand,
         
         -- Sales metrics
-        count(distinct s.order_id) as total_orders,
-        sum(s.quantity) as total_units_sold,
-        sum(s.net_line_total) as total_revenue,
-        sum(s.gross_profit) as total_gross_profit,
-        avg(s.unit_price) as avg_selling_price,
+        coalesce(s.total_orders, 0) as total_orders,
+        s.total_units_sold,
+        s.total_revenue,
+        s.total_gross_profit,
+        s.avg_selling_price,
         
         -- Return metrics
-        coalesce(sum(r.quantity_returned), 0) as total_units_returned,
-        coalesce(sum(r.refund_amount), 0) as total_refund_amount,
+        coalesce(r.total_units_returned, 0) as total_units_returned,
+        coalesce(r.total_refund_amount, 0) as total_refund_amount,
         
         -- Quality metrics
-        coalesce(count(distinct q.inspection_id), 0) as total_inspections,
-        coalesce(sum(case when q.is_passed = 1 then 1 else 0 end), 0) as passed_inspections,
-        coalesce(avg(q.defect_rate), 0) as avg_defect_rate,
+        coalesce(q.total_inspections, 0) as total_inspections,
+        coalesce(q.passed_inspections, 0) as passed_inspections,
+        coalesce(q.avg_defect_rate, 0) as avg_defect_rate,
         
         -- Waste metrics
-        coalesce(sum(w.total_waste_cost), 0) as total_waste_cost
+        coalesce(w.total_waste_cost, 0) as total_waste_cost
         
     from {{ ref('dim_products') }} p
-    left join {{ ref('fact_sales') }} s on p.product_id = s.product_id
-    left join {{ ref('fact_returns') }} r on p.product_id = r.product_id
-    left join {{ ref('fact_quality') }} q on p.product_id = q.product_id
-    left join {{ ref('fact_waste') }} w on p.product_id = w.product_id
-    group by 1, 2, 3, 4, 5, 6
+    left join sales s on p.product_id = s.product_id
+    left join returns r on p.product_id = r.product_id
+    left join quality q on p.product_id = q.product_id
+    left join waste w on p.product_id = w.product_id
 )
 
 select 
@@ -0,0 +1,42 @@
+{{
+    config(
+        materialized='view',
+        schema='marts'
+    )
+}}
+
+-- Monthly Sales Metrics
+-- Tableau-ready view for month-level sales analytics
+-- Rolled up from agg_sales_daily: order counts add up across days, and
+-- distinct customers come from merging the daily HyperLogLog sketches,
+-- so no query rescans fact_sales
+
+with monthly_sales as (
+    select
+        order_month,
+        order_quarter,
+        order_year,
+        product_category,
+        product_subcategory,
+        customer_segment,
+        customer_type,
+        shipping_state,
+        
+        -- Metrics
+        sum(order_count) as order_count,
+        {{ hll_merge_estimate('customer_id_sketch') }} as customer_count,
+        sum(units_sold) as units_sold,
+        sum(revenue) as revenue,
+        sum(gross_profit) as gross_profit,
+        sum(revenue) / nullif(sum(line_count), 0) as avg_order_value,
+        sum(total_discounts) as total_discounts
+        
+    from {{ ref('agg_sales_daily') }}
+    group by 1, 2, 3, 4, 5, 6, 7, 8
+)
+
+select 
+    *,
+    round(gross_profit / nullif(revenue, 0) * 100, 2) as gross_margin_pct,
+    round(total_discounts / nullif(revenue + total_discounts, 0) * 100, 2) as discount_pct
+from monthly_sales
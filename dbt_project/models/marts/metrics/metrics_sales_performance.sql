@@ -7,6 +7,7 @@
 
 -- Sales Performance Metrics
 -- Tableau-ready view for sales analytics
+-- Reads the incrementally maintained agg_sales_daily, not fact_sales
 
 with daily_sales as (
     select
@@ -21,16 +22,15 @@ with daily_sales as (
         shipping_state,
         
         -- Metrics
-        count(distinct order_id) as order_count,
-        count(distinct customer_id) as customer_count,
-        sum(quantity) as units_sold,
-        sum(net_line_total) as revenue,
-        sum(gross_profit) as gross_profit,
-        avg(net_line_total) as avg_order_value,
-        sum(order_discount_amount) as total_discounts
+        order_count,
+        customer_count,
+        units_sold,
+        revenue,
+        gross_profit,
+        revenue / nullif(line_count, 0) as avg_order_value,
+        total_discounts
         
-    from {{ ref('fact_sales') }}
-    group by 1, 2, 3, 4, 5, 6, 7, 8, 9
+    from {{ ref('agg_sales_daily') }}
 )
 
 select 
@@ -6,6 +6,7 @@
 
 with source as (
     select * from {{ source('raw', 'customers') }}
+    where {{ dev_sample('customer_id') }}  -- Dev sample (macros/dev_sampling.sql)
 ),
 
 renamed as (
@@ -34,8 +35,8 @@ renamed as (
         account_created_date,
         last_order_date,
         updated_date,
-        datediff('day', account_created_date, current_date()) as days_since_first_order,
-        datediff('day', last_order_date, current_date()) as days_since_last_order
+        {{ dbt.datediff("account_created_date", "current_date()", 'day') }} as days_since_first_order,
+        {{ dbt.datediff("last_order_date", "current_date()", 'day') }} as days_since_last_order
     from source
 )
 
@@ -1,11 +1,25 @@
 {{
     config(
-        materialized='view'
+        materialized=staging_materialization(),
+        unique_key='order_line_id',
+        incremental_strategy=merge_strategy(),
+        on_schema_change='append_new_columns'
     )
 }}
 
 with source as (
-    select * from {{ source('raw', 'order_lines') }}
+    select
+        order_lines.*
+        {%- if staging_materialization() == 'incremental' %},
+        -- No updated_date of its own: a line changes with its order header
+        orders.updated_date as order_updated_date
+        {%- endif %}
+    from {{ source('raw', 'order_lines') }} order_lines
+    {%- if staging_materialization() == 'incremental' %}
+    left join {{ source('raw', 'orders') }} orders on order_lines.order_id = orders.order_id
+    {%- endif %}
+    where {{ dev_sample_orders('order_lines.order_id') }}  -- Dev sample (macros/dev_sampling.sql)
+    {{ staging_incremental_filter('orders.updated_date', 'order_updated_date') }}
 ),
 
 renamed as (
@@ -22,6 +36,9 @@ renamed as (
         round(line_total - (line_total * discount_percent / 100), 2) as net_line_total,
         line_status,
         notes
+        {%- if staging_materialization() == 'incremental' %},
+        order_updated_date
+        {%- endif %}
     from source
 )
 
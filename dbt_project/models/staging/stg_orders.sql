@@ -1,11 +1,16 @@
 {{
     config(
-        materialized='view'
+        materialized=staging_materialization(),
+        unique_key='order_id',
+        incremental_strategy=merge_strategy(),
+        on_schema_change='append_new_columns'
     )
 }}
 
 with source as (
     select * from {{ source('raw', 'orders') }}
+    where {{ dev_sample('customer_id') }}  -- Dev sample (macros/dev_sampling.sql)
+    {{ staging_incremental_filter('updated_date') }}
 ),
 
 renamed as (
@@ -37,7 +42,7 @@ renamed as (
         date_trunc('month', order_date) as order_month,
         date_trunc('quarter', order_date) as order_quarter,
         date_trunc('year', order_date) as order_year,
-        extract(dayofweek from order_date) as order_day_of_week,
+        {{ day_of_week('order_date') }} as order_day_of_week,
         extract(hour from order_time) as order_hour
     from source
 )
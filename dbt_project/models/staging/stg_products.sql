@@ -5,6 +5,7 @@
 }}
 
 with source as (
+    -- Not dev-sampled: every sampled order line needs its product
     select * from {{ source('raw', 'products') }}
 ),
 
@@ -1,11 +1,16 @@
 {{
     config(
-        materialized='view'
+        materialized=staging_materialization(),
+        unique_key='inspection_id',
+        incremental_strategy=merge_strategy(),
+        on_schema_change='append_new_columns'
     )
 }}
 
 with source as (
     select * from {{ source('raw', 'quality_inspections') }}
+    where {{ dev_sample('inspection_id') }}  -- Dev sample (macros/dev_sampling.sql)
+    {{ staging_incremental_filter('updated_date') }}
 ),
 
 renamed as (
@@ -1,11 +1,16 @@
 {{
     config(
-        materialized='view'
+        materialized=staging_materialization(),
+        unique_key='return_id',
+        incremental_strategy=merge_strategy(),
+        on_schema_change='append_new_columns'
     )
 }}
 
 with source as (
     select * from {{ source('raw', 'returns') }}
+    where {{ dev_sample_orders('order_id') }}  -- Dev sample (macros/dev_sampling.sql)
+    {{ staging_incremental_filter('updated_date') }}
 ),
 
 renamed as (
@@ -33,8 +38,8 @@ renamed as (
         created_date,
         updated_date,
         -- Derived metrics
-        datediff('day', return_request_date, approved_date) as days_to_approval,
-        datediff('day', return_request_date, refund_date) as days_to_refund,
+        {{ dbt.datediff("return_request_date", "approved_date", 'day') }} as days_to_approval,
+        {{ dbt.datediff("return_request_date", "refund_date", 'day') }} as days_to_refund,
         round(refund_amount - restocking_fee - shipping_label_cost, 2) as net_refund_amount
     from source
 )
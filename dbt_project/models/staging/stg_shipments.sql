@@ -1,11 +1,16 @@
 {{
     config(
-        materialized='view'
+        materialized=staging_materialization(),
+        unique_key='shipment_id',
+        incremental_strategy=merge_strategy(),
+        on_schema_change='append_new_columns'
     )
 }}
 
 with source as (
     select * from {{ source('raw', 'shipments') }}
+    where {{ dev_sample_orders('order_id') }}  -- Dev sample (macros/dev_sampling.sql)
+    {{ staging_incremental_filter('updated_date') }}
 ),
 
 renamed as (
@@ -34,15 +39,15 @@ renamed as (
         created_date,
         updated_date,
         -- Derived metrics
-        datediff('day', shipment_date, expected_delivery_date) as expected_transit_days,
-        datediff('day', shipment_date, actual_delivery_date) as actual_transit_days,
+        {{ dbt.datediff("shipment_date", "expected_delivery_date", 'day') }} as expected_transit_days,
+        {{ dbt.datediff("shipment_date", "actual_delivery_date", 'day') }} as actual_transit_days,
         case 
             when actual_delivery_date <= expected_delivery_date then 1 
             else 0 
         end as is_on_time_delivery,
         case 
             when actual_delivery_date > expected_delivery_date 
-            then datediff('day', expected_delivery_date, actual_delivery_date)
+            then {{ dbt.datediff("expected_delivery_date", "actual_delivery_date", 'day') }}
             else 0 
         end as days_delayed
     from source
@@ -1,11 +1,16 @@
 {{
     config(
-        materialized='view'
+        materialized=staging_materialization(),
+        unique_key='waste_id',
+        incremental_strategy=merge_strategy(),
+        on_schema_change='append_new_columns'
     )
 }}
 
 with source as (
     select * from {{ source('raw', 'waste') }}
+    where {{ dev_sample('waste_id') }}  -- Dev sample (macros/dev_sampling.sql)
+    {{ staging_incremental_filter('updated_date') }}
 ),
 
 renamed as (
@@ -0,0 +1,38 @@
+{% snapshot snap_customers %}
+
+{{
+    config(
+        target_schema='snapshots',
+        unique_key='customer_id',
+        strategy='check',
+        check_cols=['row_hash']
+    )
+}}
+
+-- Customer history (SCD Type 2)
+-- A new version starts when the hash of the tracked attributes changes.
+-- Order statistics (lifetime_value, total_orders, last_order_date, ...)
+-- change with every order and are not versioned; dim_customers carries
+-- their current values.
+
+{%- set tracked_columns = [
+    'customer_type', 'customer_name', 'email', 'phone',
+    'address_line1', 'address_line2', 'city', 'state', 'postal_code', 'country',
+    'customer_segment', 'is_active', 'credit_limit', 'payment_terms_days'
+] -%}
+
+{%- set existing = adapter.get_relation(database=this.database, schema=this.schema, identifier=this.identifier) %}
+
+select
+    customer_id,
+    {{ tracked_columns | join(',\n    ') }},
+    updated_date,
+    {{ dbt_utils.generate_surrogate_key(tracked_columns) }} as row_hash
+from {{ ref('stg_customers') }}
+{% if existing is not none %}
+-- Only rows updated since the last snapshot; the last day is re-read and
+-- unchanged hashes add no version
+where updated_date >= (select max(updated_date) from {{ this }})
+{% endif %}
+
+{% endsnapshot %}
@@ -0,0 +1,36 @@
+{% snapshot snap_products %}
+
+{{
+    config(
+        target_schema='snapshots',
+        unique_key='product_id',
+        strategy='check',
+        check_cols=['row_hash']
+    )
+}}
+
+-- Product history (SCD Type 2)
+-- A new version starts when the hash of the tracked attributes changes.
+
+{%- set tracked_columns = [
+    'sku', 'product_name', 'category', 'subcategory', 'brand',
+    'unit_cost', 'unit_price', 'weight_kg', 'dimensions_cm', 'is_active',
+    'reorder_point', 'lead_time_days'
+] -%}
+
+{%- set existing = adapter.get_relation(database=this.database, schema=this.schema, identifier=this.identifier) %}
+
+select
+    product_id,
+    {{ tracked_columns | join(',\n    ') }},
+    created_date,
+    updated_date,
+    {{ dbt_utils.generate_surrogate_key(tracked_columns) }} as row_hash
+from {{ ref('stg_products') }}
+{% if existing is not none %}
+-- Only rows updated since the last snapshot; the last day is re-read and
+-- unchanged hashes add no version
+where updated_date >= (select max(updated_date) from {{ this }})
+{% endif %}
+
+{% endsnapshot %}
@@ -0,0 +1,81 @@
+"""
+Ingestion Startup-Time Benchmark
+
+Measures the cold-start cost of the ingestion entry points in fresh
+interpreters, which is what each short Airflow task pays:
+
+  - bare interpreter (baseline)
+  - `ingest.py --dry-run` (config parsing + planning, no SDK)
+  - importing each ingest_to_<platform> module (SDK deferred to connect)
+  - pandas + each warehouse SDK, i.e. what every task paid when the
+    scripts imported them at module level
+
+Usage:
+    python benchmark_startup.py [config.yaml] [--runs 5]
+"""
+
+import os
+import sys
+import time
+import argparse
+import statistics
+import subprocess
+
+from common import BACKENDS
+
+
+# What the ingest_to_*.py modules used to import eagerly
+EAGER_IMPORTS = {
+    'databricks': 'import pandas; from databricks import sql',
+    'snowflake': 'import pandas; import snowflake.connector',
+    'bigquery': 'import pandas; from google.cloud import bigquery; from google.oauth2 import service_account',
+}
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+
+def time_command(cmd, runs):
+    """Return the median wall time in ms of `cmd`, or None if it fails."""
+    timings = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        result = subprocess.run(cmd, cwd=HERE, capture_output=True)
+        elapsed = (time.perf_counter() - start) * 1000
+        if result.returncode != 0:
+            return None
+        timings.append(elapsed)
+    return statistics.median(timings)
+
+
+def main(argv=None):
+    """Main execution function."""
+    parser = argparse.ArgumentParser(description='Benchmark ingestion start-up time.')
+    parser.add_argument('config_path', nargs='?', default='config_template.yaml')
+    parser.add_argument('--runs', type=int, default=5)
+    args = parser.parse_args(argv)
+
+    config_path = os.path.abspath(args.config_path)
+    python = sys.executable
+
+    cases = [
+        ('interpreter baseline', [python, '-c', 'pass']),
+        ('ingest.py --dry-run', [python, 'ingest.py', config_path, '--dry-run']),
+    ]
+    for module_name, _ in BACKENDS.values():
+        cases.append((f'import {module_name} (lazy)', [python, '-c', f'import {module_name}']))
+    for platform, statement in EAGER_IMPORTS.items():
+        cases.append((f'{platform} SDK + pandas (eager)', [python, '-c', statement]))
+
+    print("=" * 80)
+    print(f"INGESTION STARTUP BENCHMARK (median of {args.runs} runs)")
+    print("=" * 80)
+    for label, cmd in cases:
+        median_ms = time_command(cmd, args.runs)
+        if median_ms is None:
+            print(f"{label:<45} {'n/a (failed or not installed)':>30}")
+        else:
+            print(f"{label:<45} {median_ms:>27.1f} ms")
+
+
+if __name__ == '__main__':
+    main()
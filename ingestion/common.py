@@ -0,0 +1,286 @@
+"""
+Shared Ingestion Helpers
+
+Table registry and file-reading helpers shared by the ingestion scripts.
+
+pandas is imported inside the readers rather than at module level, so that
+planning a load (ingest.py --dry-run) never pays for it.
+"""
+
+import os
+import re
+import glob
+import yaml
+from datetime import date
+
+
+# Raw tables and the CSV file each one is loaded from. Load them in
+# load_order(), which does not depend on the order listed here.
+TABLES = {
+    'products': 'products.csv',
+    'recipes': 'recipes.csv',
+    'recipe_lines': 'recipe_lines.csv',
+    'customers': 'customers.csv',
+    'order_lines': 'order_lines.csv',
+    'orders': 'orders.csv',
+    'shipments': 'shipments.csv',
+    'returns': 'returns.csv',
+    'waste': 'waste.csv',
+    'quality_inspections': 'quality_inspections.csv'
+}
+
+# platform name -> (module, ingestion class); modules are imported on demand
+BACKENDS = {
+    'databricks': ('ingest_to_databricks', 'DatabricksIngestion'),
+    'snowflake': ('ingest_to_snowflake', 'SnowflakeIngestion'),
+    'bigquery': ('ingest_to_bigquery', 'BigQueryIngestion'),
+}
+
+# data_source.layout: how the date-keyed tables are stored under the data
+# path. 'flat' reads <table>.csv (generate_all.py); 'partitioned' reads
+# <table>/<date column>=<day>/part-* (generate_all.py --partitioned,
+# backfill.py). Tables without a date are always flat CSVs.
+DATA_LAYOUTS = ('flat', 'partitioned')
+
+# Date column each partitioned table is partitioned by. The single definition
+# of the layout: data_generators/partitioning.py writes partitions with it.
+PARTITION_COLUMNS = {
+    'orders': 'order_date',
+    'order_lines': 'order_date',
+    'shipments': 'shipment_date',
+    'returns': 'return_request_date',
+    'waste': 'waste_date',
+    'quality_inspections': 'inspection_date',
+}
+
+# Hive-style date partition directory, e.g. "order_date=2024-01-15"
+PARTITION_DIR_PATTERN = re.compile(r'^(\w+)=(\d{4}-\d{2}-\d{2})$')
+
+# Tables partitioned by a parent's date: table -> (join key, parent table).
+# The partition column is the parent's, so it is not restored on read and
+# partitions are deleted through the parent.
+PARENT_PARTITIONS = {
+    'order_lines': ('order_id', 'orders'),
+}
+
+
+def load_order(tables):
+    """Return `tables` in the order they must be loaded.
+
+    A child table in PARENT_PARTITIONS goes before its parent: replacing
+    the child's date partitions deletes the child rows whose parent row is
+    on those dates (partition_predicate), so the parent must not have been
+    replaced yet.
+    """
+    ordered = [t for t in tables if t not in PARENT_PARTITIONS]
+    for child, (_, parent) in PARENT_PARTITIONS.items():
+        if child in tables:
+            ordered.insert(ordered.index(parent) if parent in ordered else len(ordered), child)
+    return ordered
+
+
+def load_config(config_path='config.yaml'):
+    """Load the ingestion YAML configuration."""
+    with open(config_path, 'r') as f:
+        return yaml.safe_load(f)
+
+
+def data_layout_from_config(config):
+    """Return the configured `data_source.layout` (default 'flat')."""
+    layout = config['data_source'].get('layout') or 'flat'
+    if layout not in DATA_LAYOUTS:
+        raise ValueError(f"Unknown data_source.layout '{layout}'; expected one of {DATA_LAYOUTS}")
+    return layout
+
+
+def partition_filter_from_config(config):
+    """Return the `data_source.partitions` filter, or None to load everything."""
+    partition_filter = config['data_source'].get('partitions') or None
+    if partition_filter and not any(partition_filter.get(k) for k in ('start_date', 'end_date', 'dates')):
+        return None
+    return partition_filter
+
+
+def resolve_partitions(data_path, table_name, partition_filter=None, layout='flat'):
+    """Find the date partitions to load for a table.
+
+    Returns None when the table is read from its flat CSV: in the 'flat'
+    layout, and for tables without a date. Otherwise returns
+    `(column, [(value, path), ...])` for the partitions matching
+    `partition_filter`, which may contain an inclusive
+    `start_date`/`end_date` range and/or an explicit `dates` list. A
+    partitioned table without partition directories has no partitions;
+    its flat CSV is never read instead.
+    """
+    if layout == 'flat' or table_name not in PARTITION_COLUMNS:
+        return None
+
+    table_dir = os.path.join(data_path, table_name)
+    column = PARTITION_COLUMNS[table_name]
+    partitions = []
+    for entry in sorted(os.listdir(table_dir)) if os.path.isdir(table_dir) else []:
+        match = PARTITION_DIR_PATTERN.match(entry)
+        if not match:
+            continue
+        _, value = match.groups()
+        partitions.append((value, os.path.join(table_dir, entry)))
+
+    if partition_filter:
+        start_date = partition_filter.get('start_date')
+        end_date = partition_filter.get('end_date')
+        dates = partition_filter.get('dates')
+        if start_date:
+            partitions = [p for p in partitions if p[0] >= str(start_date)]
+        if end_date:
+            partitions = [p for p in partitions if p[0] <= str(end_date)]
+        if dates:
+            wanted = {str(d) for d in dates}
+            partitions = [p for p in partitions if p[0] in wanted]
+
+    return column, partitions
+
+
+def partition_predicate(column, requested, table_name=None, table_ref=lambda table: table):
+    """Build a SQL predicate selecting the requested partitions.
+
+    `requested` is the normalized filter from partitions_to_replace (an
+    inclusive `start_date`/`end_date` range and/or `dates`), whose values
+    are always plain YYYY-MM-DD dates. For a table partitioned by its
+    parent's date, the predicate selects the rows whose parent is in those
+    partitions; `table_ref(name)` qualifies the parent table.
+    """
+    conditions = []
+    if requested['start_date']:
+        conditions.append(f"{column} >= '{requested['start_date']}'")
+    if requested['end_date']:
+        conditions.append(f"{column} <= '{requested['end_date']}'")
+    if requested['dates']:
+        quoted = ', '.join(f"'{value}'" for value in requested['dates'])
+        conditions.append(f"{column} IN ({quoted})")
+    condition = ' AND '.join(conditions)
+    if table_name in PARENT_PARTITIONS:
+        key, parent = PARENT_PARTITIONS[table_name]
+        return f"{key} IN (SELECT {key} FROM {table_ref(parent)} WHERE {condition})"
+    return condition
+
+
+def _read_partition_file(path, column, value):
+    """Read one partition part file and restore the partition column, if any."""
+    import pandas as pd
+
+    if path.endswith('.parquet'):
+        df = pd.read_parquet(path)
+    else:
+        df = pd.read_csv(path)
+    if column:
+        df[column] = value
+    return df
+
+
+def iter_table_chunks(data_path, table_name, csv_file, chunksize, partitions=None):
+    """Yield a table's data as DataFrame chunks of at most `chunksize` rows.
+
+    Reads the selected partition part files when `partitions` (from
+    resolve_partitions) is given, otherwise the flat CSV file. Returns
+    nothing if the CSV does not exist, mirroring the scripts'
+    skip-with-warning behaviour.
+    """
+    import pandas as pd
+
+    if partitions is not None:
+        column, selected = partitions
+        if table_name in PARENT_PARTITIONS:
+            column = None
+        for value, partition_dir in selected:
+            for path in sorted(glob.glob(os.path.join(partition_dir, 'part-*'))):
+                df = _read_partition_file(path, column, value)
+                for start in range(0, len(df), chunksize):
+                    yield df.iloc[start:start + chunksize]
+        return
+
+    csv_path = os.path.join(data_path, csv_file)
+    if not os.path.exists(csv_path):
+        print(f"  Warning: File {csv_path} not found. Skipping.")
+        return
+
+    for chunk in pd.read_csv(csv_path, chunksize=chunksize):
+        yield chunk
+
+
+def read_table(data_path, table_name, csv_file, partitions=None):
+    """Read a whole table (selected partitions or flat CSV) into one DataFrame.
+
+    Returns None when there is nothing to load.
+    """
+    import pandas as pd
+
+    if partitions is None:
+        csv_path = os.path.join(data_path, csv_file)
+        if not os.path.exists(csv_path):
+            print(f"  Warning: File {csv_path} not found. Skipping.")
+            return None
+        return pd.read_csv(csv_path)
+
+    column, selected = partitions
+    if table_name in PARENT_PARTITIONS:
+        column = None
+    frames = [
+        _read_partition_file(path, column, value)
+        for value, partition_dir in selected
+        for path in sorted(glob.glob(os.path.join(partition_dir, 'part-*')))
+    ]
+    if not frames:
+        print(f"  Warning: No matching partitions for {table_name}. Skipping.")
+        return None
+    return pd.concat(frames, ignore_index=True)
+
+
+def _date_literal(value):
+    """Return a YYYY-MM-DD string for a date or date string, or raise ValueError."""
+    return date.fromisoformat(str(value)).isoformat()
+
+
+def partitions_to_replace(partitions, partition_filter):
+    """Return `(column, requested)` to delete before a filtered partition load.
+
+    A filtered load replaces the requested partitions (delete, then
+    append) instead of truncating the whole table, which keeps reloads of
+    a date range idempotent. The delete covers every requested date,
+    including dates without a partition directory (e.g. regenerated empty
+    or removed), so their old rows do not survive the reload. `requested`
+    holds the filter's `start_date`, `end_date` and `dates` as YYYY-MM-DD
+    strings (or None). Returns None for full loads.
+    """
+    if partitions is None or not partition_filter:
+        return None
+    dates = partition_filter.get('dates')
+    requested = {
+        'start_date': partition_filter.get('start_date'),
+        'end_date': partition_filter.get('end_date'),
+        'dates': sorted({_date_literal(d) for d in dates}) if dates else None,
+    }
+    for bound in ('start_date', 'end_date'):
+        if requested[bound]:
+            requested[bound] = _date_literal(requested[bound])
+    return partitions[0], requested
+
+
+def describe_partitions(column, requested):
+    """Describe the requested partitions of a replace, for log output."""
+    if requested['dates']:
+        text = f"{len(requested['dates'])} {column} partition(s)"
+    else:
+        text = f"{column} partitions"
+    if requested['start_date']:
+        text += f" from {requested['start_date']}"
+    if requested['end_date']:
+        text += f" through {requested['end_date']}"
+    return text
+
+
+def describe_source(csv_file, partitions):
+    """Describe where a table's rows were read from, for log output."""
+    if partitions is None:
+        return csv_file
+    column, selected = partitions
+    return f"{len(selected)} {column} partition(s)"
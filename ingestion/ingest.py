@@ -0,0 +1,278 @@
+"""
+Unified Ingestion CLI
+
+Single entry point for every warehouse. Dispatches on `platform:` (or
+`platforms:` for fan-out) in the config and imports only the backend that
+is actually used, so short Airflow tasks do not pay for SDKs they never
+touch. `--dry-run` parses the config and prints the load plan without
+importing pandas or any warehouse SDK.
+
+Usage:
+    python ingest.py config.yaml
+    python ingest.py config.yaml --dry-run
+    python ingest.py config.yaml --platform snowflake --table orders --table order_lines
+    python ingest.py config.yaml --platform databricks --platform snowflake
+    python ingest.py config.yaml --start-date 2024-01-01 --end-date 2024-01-31
+    python ingest.py config.yaml --data-path ../backfill_data --layout partitioned --date 2024-01-15
+    python ingest.py config.yaml --skip-unchanged
+"""
+
+import os
+import sys
+import glob
+import json
+import argparse
+import tempfile
+import importlib
+from datetime import date
+
+from common import (
+    BACKENDS, TABLES, DATA_LAYOUTS, load_config, load_order, data_layout_from_config,
+    partition_filter_from_config, resolve_partitions, partitions_to_replace, describe_partitions,
+    describe_source
+)
+from validate_files import VALIDATION_FILE
+
+
+def date_arg(value):
+    """argparse type for a YYYY-MM-DD date."""
+    try:
+        return date.fromisoformat(value).isoformat()
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"invalid date '{value}', expected YYYY-MM-DD")
+
+
+def parse_args(argv=None):
+    """Parse command line arguments."""
+    parser = argparse.ArgumentParser(description='Load raw data into the data warehouse.')
+    parser.add_argument('config_path', nargs='?', default='config.yaml',
+                        help='Path to the ingestion config (default: config.yaml)')
+    parser.add_argument('--platform', action='append', choices=sorted(BACKENDS),
+                        help='Override the configured platform; repeat to fan out')
+    parser.add_argument('--table', action='append', choices=list(TABLES),
+                        help='Only load this table; may be repeated')
+    parser.add_argument('--data-path', help='Override data_source.path')
+    parser.add_argument('--layout', choices=DATA_LAYOUTS,
+                        help='Override data_source.layout: flat CSVs or date partitions')
+    parser.add_argument('--start-date', type=date_arg, help='First date partition to load (YYYY-MM-DD)')
+    parser.add_argument('--end-date', type=date_arg, help='Last date partition to load (YYYY-MM-DD)')
+    parser.add_argument('--date', action='append', dest='dates', type=date_arg,
+                        help='Load only this date partition; may be repeated')
+    parser.add_argument('--skip-unchanged', action='store_true',
+                        help=f'Skip tables whose {VALIDATION_FILE} hash matches the last load')
+    parser.add_argument('--dry-run', action='store_true',
+                        help='Print the load plan without importing any warehouse SDK')
+    return parser.parse_args(argv)
+
+
+def resolve_platforms(args, config):
+    """Return the list of platforms to load, CLI first, then config."""
+    if args.platform:
+        return args.platform
+    return config.get('platforms') or [config['platform']]
+
+
+def resolve_partition_filter(args, config):
+    """Return the partition filter, with CLI dates overriding the config."""
+    if args.start_date or args.end_date or args.dates:
+        return {
+            'start_date': args.start_date,
+            'end_date': args.end_date,
+            'dates': args.dates,
+        }
+    return partition_filter_from_config(config)
+
+
+def plan_loads(config, tables, partition_filter, data_path, layout):
+    """Describe what would be loaded for each table, without reading data."""
+    truncate = config['options']['truncate_before_load']
+
+    plan = []
+    for table_name in tables:
+        csv_file = TABLES[table_name]
+        partitions = resolve_partitions(data_path, table_name, partition_filter, layout)
+
+        if partitions is None:
+            files = [os.path.join(data_path, csv_file)]
+            files = [f for f in files if os.path.exists(f)]
+        else:
+            files = [
+                path
+                for _, partition_dir in partitions[1]
+                for path in glob.glob(os.path.join(partition_dir, 'part-*'))
+            ]
+
+        replace = partitions_to_replace(partitions, partition_filter)
+        if replace:
+            action = f"replace {describe_partitions(*replace)}"
+        elif not files:
+            action = 'skip (no data)'
+        elif truncate:
+            action = 'truncate + load'
+        else:
+            action = 'append'
+
+        plan.append({
+            'table': table_name,
+            'source': describe_source(csv_file, partitions),
+            'files': len(files),
+            'bytes': sum(os.path.getsize(f) for f in files),
+            'action': action,
+        })
+
+    return plan
+
+
+def print_plan(platforms, plan):
+    """Print a load plan."""
+    print("=" * 80)
+    print(f"INGESTION PLAN (dry run) -> {', '.join(platforms)}")
+    print("=" * 80)
+    print(f"{'Table':<22} {'Source':<36} {'Files':>6} {'MB':>9}  Action")
+    for p in plan:
+        print(
+            f"{p['table']:<22} {p['source']:<36} {p['files']:>6} "
+            f"{p['bytes'] / 1e6:>9.2f}  {p['action']}"
+        )
+    print()
+    print(f"Total: {sum(p['files'] for p in plan)} files, "
+          f"{sum(p['bytes'] for p in plan) / 1e6:.2f} MB")
+
+
+def print_load_metrics(rows, size):
+    """Print rows/bytes processed as the last output line.
+
+    Airflow's BashOperator pushes that line as the task's XCom, which the
+    pipeline instrumentation (airflow/dags/pipeline_metrics.py) records.
+    """
+    print(json.dumps({'rows_processed': rows, 'bytes_processed': size}))
+
+
+def loaded_hash_path(data_path, platforms, table):
+    """Return the file recording the hash of `table` last loaded to `platforms`.
+
+    One file per table, so the per-table load tasks, which run
+    concurrently, never write the same file.
+    """
+    return os.path.join(data_path, f"_loaded_{'+'.join(sorted(platforms))}", f"{table}.sha256")
+
+
+def read_loaded_hash(data_path, platforms, table):
+    """Return the hash of `table` last loaded to `platforms`, or None."""
+    path = loaded_hash_path(data_path, platforms, table)
+    if not os.path.exists(path):
+        return None
+    with open(path, 'r') as f:
+        return f.read().strip() or None
+
+
+def read_json(path):
+    """Return the parsed JSON file, or an empty dict if it does not exist."""
+    if not os.path.exists(path):
+        return {}
+    with open(path, 'r') as f:
+        return json.load(f)
+
+
+def unchanged_tables(data_path, platforms, tables):
+    """Return the tables whose validated content hash was already loaded."""
+    validated = read_json(os.path.join(data_path, VALIDATION_FILE)).get('tables', {})
+    return [
+        t for t in tables
+        if validated.get(t, {}).get('sha256')
+        and validated[t]['sha256'] == read_loaded_hash(data_path, platforms, t)
+    ]
+
+
+def record_loaded(data_path, platforms, tables):
+    """Record the validated hashes of the tables that were just loaded.
+
+    Each hash is written to a unique temporary file and renamed into place,
+    so a concurrent reader sees the old hash or the new one, never a
+    partial file.
+    """
+    validated = read_json(os.path.join(data_path, VALIDATION_FILE)).get('tables', {})
+    for table in tables:
+        path = loaded_hash_path(data_path, platforms, table)
+        sha256 = validated.get(table, {}).get('sha256')
+        if not sha256:
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            continue
+
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), prefix=f'.{table}.', suffix='.tmp')
+        with os.fdopen(fd, 'w') as f:
+            f.write(sha256 + '\n')
+        os.replace(tmp_path, path)
+
+
+def create_ingestion(config_path, platforms):
+    """Import and construct the ingestion class for the selected platform(s)."""
+    if len(platforms) > 1:
+        from ingest_fanout import FanOutIngestion
+        return FanOutIngestion(config_path, platforms=platforms)
+
+    module_name, class_name = BACKENDS[platforms[0]]
+    module = importlib.import_module(module_name)
+    return getattr(module, class_name)(config_path)
+
+
+def main(argv=None):
+    """Main execution function."""
+    args = parse_args(argv)
+
+    if not os.path.exists(args.config_path):
+        print(f"Error: Configuration file '{args.config_path}' not found.")
+        print("Please copy config_template.yaml to config.yaml and configure it.")
+        sys.exit(1)
+
+    config = load_config(args.config_path)
+    platforms = resolve_platforms(args, config)
+    tables = load_order([t for t in TABLES if t in args.table] if args.table else list(TABLES))
+    partition_filter = resolve_partition_filter(args, config)
+    data_path = args.data_path or config['data_source']['path']
+    layout = args.layout or data_layout_from_config(config)
+
+    # Hashes cover whole tables, so only full loads can be skipped or recorded
+    track_hashes = args.skip_unchanged and not partition_filter
+    if args.skip_unchanged and partition_filter:
+        print("Note: --skip-unchanged is ignored for partition-filtered loads")
+    if track_hashes:
+        skipped = unchanged_tables(data_path, platforms, tables)
+        for table in skipped:
+            print(f"✓ {table}: unchanged since last load, skipping")
+        tables = [t for t in tables if t not in skipped]
+        if not tables:
+            print("All tables unchanged, nothing to load")
+            print_load_metrics(0, 0)
+            return
+
+    if args.dry_run:
+        print_plan(platforms, plan_loads(config, tables, partition_filter, data_path, layout))
+        return
+
+    ingestion = create_ingestion(args.config_path, platforms)
+    ingestion.partition_filter = partition_filter
+    ingestion.data_path = data_path
+    ingestion.layout = layout
+    try:
+        ingestion.ingest_all(tables=tables)
+    except RuntimeError as e:
+        print(f"\nError: {e}")
+        sys.exit(1)
+
+    # Only reached when every table loaded: a failed load raises above
+    if track_hashes:
+        record_loaded(data_path, platforms, tables)
+
+    print_load_metrics(
+        ingestion.rows_loaded,
+        sum(p['bytes'] for p in plan_loads(config, tables, partition_filter, data_path, layout))
+    )
+
+
+if __name__ == '__main__':
+    main()
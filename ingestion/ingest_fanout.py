@@ -0,0 +1,295 @@
+"""
+Multi-Warehouse Fan-Out Ingestion Script
+
+Reads each CSV in sample_data once and fans the same chunks out to every
+platform listed under `platforms:` in the config (e.g. Databricks and
+Snowflake during a migration). Each platform gets its own worker pool, and
+a failure on one platform does not stop loading into the others.
+"""
+
+import os
+import sys
+import time
+import importlib
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+from common import (
+    BACKENDS, TABLES, PARENT_PARTITIONS, load_config, load_order, data_layout_from_config,
+    partition_filter_from_config, resolve_partitions, iter_table_chunks, partitions_to_replace,
+    describe_source
+)
+
+
+class PlatformWorker:
+    """Per-platform worker pool, failure state and load statistics."""
+
+    def __init__(self, platform, ingestion, max_workers, max_pending):
+        self.platform = platform
+        self.ingestion = ingestion
+        self.executor = ThreadPoolExecutor(
+            max_workers=max_workers,
+            thread_name_prefix=f'ingest-{platform}'
+        )
+        # Bounds the number of chunks queued for this platform so a slow
+        # warehouse applies back-pressure instead of buffering whole files
+        self.pending = threading.Semaphore(max_pending)
+        self.lock = threading.Lock()
+
+        self.error = None
+        self.first_chunks = {}
+        self.rows = {}
+        self.chunks = 0
+        self.busy_seconds = 0.0
+        self.started_at = None
+        self.finished_at = None
+
+    @property
+    def failed(self):
+        return self.error is not None
+
+    def submit(self, table_name, chunk, first_chunk, replace=None):
+        """Queue a chunk for loading on this platform.
+
+        `replace` is an optional `(column, requested)` pair of date
+        partitions (partitions_to_replace) to delete before the table's
+        first chunk is loaded. A None chunk only deletes them.
+        """
+        if self.failed:
+            return
+
+        self.pending.acquire()
+        if self.started_at is None:
+            self.started_at = time.perf_counter()
+
+        future = self.executor.submit(self._load, table_name, chunk, first_chunk, replace)
+        if first_chunk:
+            self.first_chunks[table_name] = future
+
+    def _load(self, table_name, chunk, first_chunk, replace):
+        """Load one chunk, recording failures instead of raising."""
+        try:
+            if self.failed:
+                return
+
+            # Later chunks must not land before the first chunk has
+            # (optionally) truncated the table or replaced its partitions
+            if not first_chunk:
+                self.first_chunks[table_name].result()
+                if self.failed:
+                    return
+
+            # A parent must not replace its partitions before its children
+            # have deleted theirs, which select the rows through the parent
+            if first_chunk and replace:
+                for child, (_, parent) in PARENT_PARTITIONS.items():
+                    if parent == table_name and child in self.first_chunks:
+                        self.first_chunks[child].result()
+                if self.failed:
+                    return
+
+            start = time.perf_counter()
+            if first_chunk and replace:
+                self.ingestion.delete_partitions(table_name, *replace)
+            if chunk is not None:
+                self.ingestion.load_chunk(
+                    table_name, chunk, first_chunk=(first_chunk and not replace)
+                )
+            elapsed = time.perf_counter() - start
+
+            with self.lock:
+                if chunk is not None:
+                    self.rows[table_name] = self.rows.get(table_name, 0) + len(chunk)
+                    self.chunks += 1
+                self.busy_seconds += elapsed
+        except Exception as e:
+            with self.lock:
+                if self.error is None:
+                    self.error = f"{table_name}: {e}"
+                    print(f"  ✗ [{self.platform}] {self.error} - skipping remaining loads")
+        finally:
+            self.pending.release()
+
+    def shutdown(self):
+        """Wait for queued chunks and record the finish time."""
+        self.executor.shutdown(wait=True)
+        self.finished_at = time.perf_counter()
+
+    def summary(self):
+        """Return a summary dictionary for this platform."""
+        wall_seconds = 0.0
+        if self.started_at is not None:
+            wall_seconds = self.finished_at - self.started_at
+
+        return {
+            'platform': self.platform,
+            'status': 'FAILED' if self.failed else 'OK',
+            'error': self.error,
+            'tables': len(self.rows),
+            'rows': sum(self.rows.values()),
+            'chunks': self.chunks,
+            'load_seconds': round(self.busy_seconds, 2),
+            'wall_seconds': round(wall_seconds, 2),
+        }
+
+
+class FanOutIngestion:
+    """Read every table once and load it into several warehouses."""
+
+    def __init__(self, config_path='config.yaml', platforms=None):
+        """Initialize with configuration; `platforms` overrides the config."""
+        self.config_path = config_path
+        self.config = load_config(config_path)
+
+        self.data_path = self.config['data_source']['path']
+        self.options = self.config['options']
+        self.partition_filter = partition_filter_from_config(self.config)
+        self.layout = data_layout_from_config(self.config)
+        self.rows_loaded = 0  # Across ingest_all, for run instrumentation
+        self.platforms = platforms or self.config.get('platforms') or [self.config['platform']]
+
+        unknown = [p for p in self.platforms if p not in BACKENDS]
+        if unknown:
+            raise ValueError(f"Unknown platform(s) in config: {unknown}")
+
+        self.workers = []
+        self.read_seconds = 0.0
+
+    def connect(self):
+        """Create and connect one ingestion backend per platform.
+
+        A platform that fails to connect is reported and left out; the
+        remaining platforms still load.
+        """
+        max_workers = self.options.get('fanout_workers_per_platform', 1)
+        max_pending = self.options.get('fanout_max_pending_chunks', 4)
+
+        for platform in self.platforms:
+            module_name, class_name = BACKENDS[platform]
+            worker = None
+            try:
+                module = importlib.import_module(module_name)
+                ingestion = getattr(module, class_name)(self.config_path)
+                worker = PlatformWorker(platform, ingestion, max_workers, max_pending)
+                ingestion.connect()
+            except Exception as e:
+                print(f"  ✗ [{platform}] Could not connect: {e}")
+                if worker is None:
+                    worker = PlatformWorker(platform, None, 1, 1)
+                worker.error = f"connect: {e}"
+            self.workers.append(worker)
+
+    def disconnect(self):
+        """Close every backend connection that supports it."""
+        for worker in self.workers:
+            disconnect = getattr(worker.ingestion, 'disconnect', None)
+            if disconnect is not None:
+                try:
+                    disconnect()
+                except Exception as e:
+                    print(f"  Note: [{worker.platform}] Could not disconnect: {e}")
+
+    def ingest_table(self, table_name, csv_file):
+        """Read a CSV once and fan its chunks out to every healthy platform."""
+        print(f"\nIngesting {table_name}...")
+
+        total_rows = 0
+        first_chunk = True
+        partitions = resolve_partitions(self.data_path, table_name, self.partition_filter, self.layout)
+        replace = partitions_to_replace(partitions, self.partition_filter)
+        chunks = iter_table_chunks(
+            self.data_path, table_name, csv_file, self.options['batch_size'], partitions
+        )
+
+        while True:
+            start = time.perf_counter()
+            chunk = next(chunks, None)
+            self.read_seconds += time.perf_counter() - start
+            if chunk is None:
+                break
+
+            for worker in self.workers:
+                worker.submit(table_name, chunk, first_chunk, replace)
+            first_chunk = False
+            total_rows += len(chunk)
+
+        # Requested dates without data are still cleared
+        if first_chunk and replace:
+            for worker in self.workers:
+                worker.submit(table_name, None, True, replace)
+
+        if total_rows:
+            print(f"  Read {total_rows} rows from {describe_source(csv_file, partitions)}")
+        self.rows_loaded += total_rows
+
+    def ingest_all(self, tables=None):
+        """Ingest all tables (or only the given ones) into all configured platforms."""
+        print("=" * 80)
+        print(f"FAN-OUT DATA INGESTION ({', '.join(self.platforms).upper()})")
+        print("=" * 80)
+        print(f"Start time: {datetime.now()}")
+        print()
+
+        self.connect()
+
+        try:
+            for table_name in load_order(tables or list(TABLES)):
+                if all(worker.failed for worker in self.workers):
+                    print("\nAll platforms failed, stopping.")
+                    break
+                self.ingest_table(table_name, TABLES[table_name])
+        finally:
+            for worker in self.workers:
+                worker.shutdown()
+            self.disconnect()
+
+        summaries = [worker.summary() for worker in self.workers]
+        self.print_summary(summaries)
+
+        if any(s['status'] == 'FAILED' for s in summaries):
+            raise RuntimeError(
+                f"Ingestion failed for: {[s['platform'] for s in summaries if s['status'] == 'FAILED']}"
+            )
+
+        return summaries
+
+    def print_summary(self, summaries):
+        """Print a per-platform summary table."""
+        print()
+        print("=" * 80)
+        print("INGESTION SUMMARY")
+        print("=" * 80)
+        print(f"CSV read/parse time: {self.read_seconds:.2f}s (shared by all platforms)")
+        print()
+        print(f"{'Platform':<12} {'Status':<8} {'Tables':>6} {'Rows':>10} {'Chunks':>7} {'Load s':>8} {'Wall s':>8}")
+        for s in summaries:
+            print(
+                f"{s['platform']:<12} {s['status']:<8} {s['tables']:>6} {s['rows']:>10} "
+                f"{s['chunks']:>7} {s['load_seconds']:>8.2f} {s['wall_seconds']:>8.2f}"
+            )
+            if s['error']:
+                print(f"  Error: {s['error']}")
+        print()
+        print(f"End time: {datetime.now()}")
+
+
+def main():
+    """Main execution function."""
+    config_path = sys.argv[1] if len(sys.argv) > 1 else 'config.yaml'
+
+    if not os.path.exists(config_path):
+        print(f"Error: Configuration file '{config_path}' not found.")
+        print("Please copy config_template.yaml to config.yaml and configure it.")
+        sys.exit(1)
+
+    ingestion = FanOutIngestion(config_path)
+    try:
+        ingestion.ingest_all()
+    except RuntimeError as e:
+        print(f"\nError: {e}")
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -2,34 +2,43 @@
 BigQuery Data Ingestion Script
 
 Ingests CSV data from sample_data directory into BigQuery tables.
+
+The google-cloud-bigquery SDK is imported on first use so that importing this
+module (e.g. from ingest.py) stays cheap.
 """
 
 import os
 import sys
-import yaml
-import pandas as pd
-from google.cloud import bigquery
-from google.oauth2 import service_account
 from datetime import datetime
 
+from common import (
+    TABLES, load_config, load_order, data_layout_from_config, partition_filter_from_config,
+    resolve_partitions, read_table, partitions_to_replace, partition_predicate, describe_partitions,
+    describe_source
+)
+
 
 class BigQueryIngestion:
     """Handle data ingestion to BigQuery."""
     
     def __init__(self, config_path='config.yaml'):
         """Initialize with configuration."""
-        with open(config_path, 'r') as f:
-            self.config = yaml.safe_load(f)
+        self.config = load_config(config_path)
         
         self.bq_config = self.config['bigquery']
         self.data_path = self.config['data_source']['path']
         self.options = self.config['options']
+        self.partition_filter = partition_filter_from_config(self.config)
+        self.layout = data_layout_from_config(self.config)
+        self.rows_loaded = 0  # Across ingest_all, for run instrumentation
         
         self.client = None
         
     def connect(self):
         """Establish connection to BigQuery."""
         print("Connecting to BigQuery...")
+        from google.cloud import bigquery
+        from google.oauth2 import service_account
         
         # Load credentials
         credentials = service_account.Credentials.from_service_account_file(
@@ -42,18 +51,28 @@ class BigQueryIngestion:
         )
         print("Connected successfully!")
         
-    def ingest_table(self, table_name, csv_file):
-        """Ingest a single CSV file into a BigQuery table."""
-        print(f"\nIngesting {table_name}...")
-        
-        # Read CSV file
-        csv_path = os.path.join(self.data_path, csv_file)
-        if not os.path.exists(csv_path):
-            print(f"  Warning: File {csv_path} not found. Skipping.")
-            return
-        
-        df = pd.read_csv(csv_path)
-        print(f"  Loaded {len(df)} rows from {csv_file}")
+    def delete_partitions(self, table_name, column, requested):
+        """Delete the rows of the requested date partitions before reloading them."""
+        dataset = f"{self.bq_config['project_id']}.{self.bq_config['dataset_id']}"
+        predicate = partition_predicate(column, requested, table_name, lambda t: f"`{dataset}.{t}`")
+        try:
+            self.client.query(
+                f"DELETE FROM `{dataset}.{table_name}` WHERE {predicate}"
+            ).result()
+            print(f"  Replacing {describe_partitions(column, requested)} in {table_name}")
+        except Exception as e:
+            # Appending without the delete would duplicate the partitions
+            print(f"  Error deleting partitions: {e}")
+            raise
+    
+    def load_chunk(self, table_name, df, first_chunk=True):
+        """Load a DataFrame chunk into a BigQuery table.
+
+        The first chunk of a table uses WRITE_TRUNCATE when the
+        `truncate_before_load` option is enabled; later chunks append.
+        Returns the table's row count after the load.
+        """
+        from google.cloud import bigquery
         
         # Prepare table reference
         table_id = f"{self.bq_config['project_id']}.{self.bq_config['dataset_id']}.{table_name}"
@@ -61,7 +80,7 @@ class BigQueryIngestion:
         # Configure load job
         job_config = bigquery.LoadJobConfig()
         
-        if self.options['truncate_before_load']:
+        if first_chunk and self.options['truncate_before_load']:
             job_config.write_disposition = bigquery.WriteDisposition.WRITE_TRUNCATE
             print(f"  Will truncate table {table_name}")
         else:
@@ -72,39 +91,50 @@ class BigQueryIngestion:
             job_config.create_disposition = bigquery.CreateDisposition.CREATE_IF_NEEDED
         
         # Load data from DataFrame
+        job = self.client.load_table_from_dataframe(
+            df,
+            table_id,
+            job_config=job_config
+        )
+        
+        # Wait for the job to complete
+        job.result()
+        
+        # Get the destination table
+        table = self.client.get_table(table_id)
+        return table.num_rows
+    
+    def ingest_table(self, table_name, csv_file):
+        """Ingest a single CSV file into a BigQuery table."""
+        print(f"\nIngesting {table_name}...")
+        
+        # Read CSV file (or the selected date partitions)
+        partitions = resolve_partitions(self.data_path, table_name, self.partition_filter, self.layout)
+        df = read_table(self.data_path, table_name, csv_file, partitions)
+        
+        # A filtered partition load replaces only the requested partitions,
+        # clearing them even when they no longer have any data
+        first_chunk = True
+        replace = partitions_to_replace(partitions, self.partition_filter)
+        if replace:
+            self.delete_partitions(table_name, *replace)
+            first_chunk = False
+        if df is None:
+            return
+        
+        print(f"  Loaded {len(df)} rows from {describe_source(csv_file, partitions)}")
+        
         try:
-            job = self.client.load_table_from_dataframe(
-                df,
-                table_id,
-                job_config=job_config
-            )
-            
-            # Wait for the job to complete
-            job.result()
-            
-            # Get the destination table
-            table = self.client.get_table(table_id)
-            print(f"  ✓ Successfully ingested {table.num_rows} rows into {table_name}")
+            num_rows = self.load_chunk(table_name, df, first_chunk=first_chunk)
+            print(f"  ✓ Successfully ingested {num_rows} rows into {table_name}")
+            self.rows_loaded += num_rows
             
         except Exception as e:
             print(f"  Error ingesting data: {e}")
             raise
     
-    def ingest_all(self):
-        """Ingest all tables."""
-        tables = {
-            'products': 'products.csv',
-            'recipes': 'recipes.csv',
-            'recipe_lines': 'recipe_lines.csv',
-            'customers': 'customers.csv',
-            'orders': 'orders.csv',
-            'order_lines': 'order_lines.csv',
-            'shipments': 'shipments.csv',
-            'returns': 'returns.csv',
-            'waste': 'waste.csv',
-            'quality_inspections': 'quality_inspections.csv'
-        }
-        
+    def ingest_all(self, tables=None):
+        """Ingest all tables, or only the given table names."""
         print("=" * 80)
         print("BIGQUERY DATA INGESTION")
         print("=" * 80)
@@ -114,8 +144,8 @@ class BigQueryIngestion:
         self.connect()
         
         try:
-            for table_name, csv_file in tables.items():
-                self.ingest_table(table_name, csv_file)
+            for table_name in load_order(tables or list(TABLES)):
+                self.ingest_table(table_name, TABLES[table_name])
         except Exception as e:
             print(f"\nError during ingestion: {e}")
             raise
@@ -2,33 +2,43 @@
 Databricks Data Ingestion Script
 
 Ingests CSV data from sample_data directory into Databricks tables.
+
+The Databricks SQL connector is imported on connect() so that importing this
+module (e.g. from ingest.py) stays cheap.
 """
 
 import os
 import sys
-import yaml
-import pandas as pd
-from databricks import sql
 from datetime import datetime
 
+from common import (
+    TABLES, load_config, load_order, data_layout_from_config, partition_filter_from_config,
+    resolve_partitions, read_table, partitions_to_replace, partition_predicate, describe_partitions,
+    describe_source
+)
+
 
 class DatabricksIngestion:
     """Handle data ingestion to Databricks."""
     
     def __init__(self, config_path='config.yaml'):
         """Initialize with configuration."""
-        with open(config_path, 'r') as f:
-            self.config = yaml.safe_load(f)
+        self.config = load_config(config_path)
         
         self.db_config = self.config['databricks']
         self.data_path = self.config['data_source']['path']
         self.options = self.config['options']
+        self.partition_filter = partition_filter_from_config(self.config)
+        self.layout = data_layout_from_config(self.config)
+        self.rows_loaded = 0  # Across ingest_all, for run instrumentation
         
         self.connection = None
         
     def connect(self):
         """Establish connection to Databricks."""
         print("Connecting to Databricks...")
+        from databricks import sql
+        
         self.connection = sql.connect(
             server_hostname=self.db_config['server_hostname'],
             http_path=self.db_config['http_path'],
@@ -42,38 +52,73 @@ class DatabricksIngestion:
             self.connection.close()
             print("Disconnected from Databricks")
     
+    def delete_partitions(self, table_name, column, requested):
+        """Delete the rows of the requested date partitions before reloading them."""
+        catalog = self.db_config['catalog']
+        predicate = partition_predicate(column, requested, table_name, lambda t: f"{catalog}.{t}")
+        cursor = self.connection.cursor()
+        try:
+            cursor.execute(f"DELETE FROM {catalog}.{table_name} WHERE {predicate}")
+            print(f"  Replacing {describe_partitions(column, requested)} in {table_name}")
+        except Exception as e:
+            # Appending without the delete would duplicate the partitions
+            print(f"  Error deleting partitions: {e}")
+            raise
+        finally:
+            cursor.close()
+    
+    def load_chunk(self, table_name, df, first_chunk=True):
+        """Insert a DataFrame chunk into a Databricks table.
+
+        When `first_chunk` is set the table is truncated first if the
+        `truncate_before_load` option is enabled.
+        """
+        cursor = self.connection.cursor()
+        
+        try:
+            # Optionally truncate table
+            if first_chunk and self.options['truncate_before_load']:
+                try:
+                    cursor.execute(f"TRUNCATE TABLE {self.db_config['catalog']}.{table_name}")
+                    print(f"  Truncated table {table_name}")
+                except Exception as e:
+                    print(f"  Note: Could not truncate table: {e}")
+            
+            # Prepare INSERT statement
+            columns = ', '.join(df.columns)
+            placeholders = ', '.join(['?' for _ in df.columns])
+            insert_sql = f"""
+                INSERT INTO {self.db_config['catalog']}.{table_name} 
+                ({columns})
+                VALUES ({placeholders})
+            """
+            
+            rows = [tuple(x) for x in df.values]
+            cursor.executemany(insert_sql, rows)
+        finally:
+            cursor.close()
+        
+        return len(df)
+    
     def ingest_table(self, table_name, csv_file):
         """Ingest a single CSV file into a Databricks table."""
         print(f"\nIngesting {table_name}...")
         
-        # Read CSV file
-        csv_path = os.path.join(self.data_path, csv_file)
-        if not os.path.exists(csv_path):
-            print(f"  Warning: File {csv_path} not found. Skipping.")
+        # Read CSV file (or the selected date partitions)
+        partitions = resolve_partitions(self.data_path, table_name, self.partition_filter, self.layout)
+        df = read_table(self.data_path, table_name, csv_file, partitions)
+        
+        # A filtered partition load replaces only the requested partitions,
+        # clearing them even when they no longer have any data
+        first_chunk = True
+        replace = partitions_to_replace(partitions, self.partition_filter)
+        if replace:
+            self.delete_partitions(table_name, *replace)
+            first_chunk = False
+        if df is None:
             return
         
-        df = pd.read_csv(csv_path)
-        print(f"  Loaded {len(df)} rows from {csv_file}")
-        
-        # Create cursor
-        cursor = self.connection.cursor()
-        
-        # Optionally truncate table
-        if self.options['truncate_before_load']:
-            try:
-                cursor.execute(f"TRUNCATE TABLE {self.db_config['catalog']}.{table_name}")
-                print(f"  Truncated table {table_name}")
-            except Exception as e:
-                print(f"  Note: Could not truncate table: {e}")
-        
-        # Prepare INSERT statement
-        columns = ', '.join(df.columns)
-        placeholders = ', '.join(['?' for _ in df.columns])
-        insert_sql = f"""
-            INSERT INTO {self.db_config['catalog']}.{table_name} 
-            ({columns})
-            VALUES ({placeholders})
-        """
+        print(f"  Loaded {len(df)} rows from {describe_source(csv_file, partitions)}")
         
         # Insert data in batches
         batch_size = self.options['batch_size']
@@ -81,33 +126,19 @@ class DatabricksIngestion:
         
         for i in range(0, total_rows, batch_size):
             batch = df.iloc[i:i+batch_size]
-            rows = [tuple(x) for x in batch.values]
             
             try:
-                cursor.executemany(insert_sql, rows)
+                self.load_chunk(table_name, batch, first_chunk=(first_chunk and i == 0))
                 print(f"  Inserted {min(i+batch_size, total_rows)}/{total_rows} rows")
             except Exception as e:
                 print(f"  Error inserting batch: {e}")
                 raise
         
-        cursor.close()
         print(f"  ✓ Successfully ingested {total_rows} rows into {table_name}")
+        self.rows_loaded += total_rows
     
-    def ingest_all(self):
-        """Ingest all tables."""
-        tables = {
-            'products': 'products.csv',
-            'recipes': 'recipes.csv',
-            'recipe_lines': 'recipe_lines.csv',
-            'customers': 'customers.csv',
-            'orders': 'orders.csv',
-            'order_lines': 'order_lines.csv',
-            'shipments': 'shipments.csv',
-            'returns': 'returns.csv',
-            'waste': 'waste.csv',
-            'quality_inspections': 'quality_inspections.csv'
-        }
-        
+    def ingest_all(self, tables=None):
+        """Ingest all tables, or only the given table names."""
         print("=" * 80)
         print("DATABRICKS DATA INGESTION")
         print("=" * 80)
@@ -117,8 +148,8 @@ class DatabricksIngestion:
         self.connect()
         
         try:
-            for table_name, csv_file in tables.items():
-                self.ingest_table(table_name, csv_file)
+            for table_name in load_order(tables or list(TABLES)):
+                self.ingest_table(table_name, TABLES[table_name])
         finally:
             self.disconnect()
         
@@ -2,33 +2,43 @@
 Snowflake Data Ingestion Script
 
 Ingests CSV data from sample_data directory into Snowflake tables.
+
+The Snowflake connector is imported on connect() so that importing this
+module (e.g. from ingest.py) stays cheap.
 """
 
 import os
 import sys
-import yaml
-import pandas as pd
-import snowflake.connector
 from datetime import datetime
 
+from common import (
+    TABLES, load_config, load_order, data_layout_from_config, partition_filter_from_config,
+    resolve_partitions, read_table, partitions_to_replace, partition_predicate, describe_partitions,
+    describe_source
+)
+
 
 class SnowflakeIngestion:
     """Handle data ingestion to Snowflake."""
     
     def __init__(self, config_path='config.yaml'):
         """Initialize with configuration."""
-        with open(config_path, 'r') as f:
-            self.config = yaml.safe_load(f)
+        self.config = load_config(config_path)
         
         self.db_config = self.config['snowflake']
         self.data_path = self.config['data_source']['path']
         self.options = self.config['options']
+        self.partition_filter = partition_filter_from_config(self.config)
+        self.layout = data_layout_from_config(self.config)
+        self.rows_loaded = 0  # Across ingest_all, for run instrumentation
         
         self.connection = None
         
     def connect(self):
         """Establish connection to Snowflake."""
         print("Connecting to Snowflake...")
+        import snowflake.connector
+        
         self.connection = snowflake.connector.connect(
             user=self.db_config['user'],
             password=self.db_config['password'],
@@ -46,24 +56,32 @@ class SnowflakeIngestion:
             self.connection.close()
             print("Disconnected from Snowflake")
     
-    def ingest_table(self, table_name, csv_file):
-        """Ingest a single CSV file into a Snowflake table."""
-        print(f"\nIngesting {table_name}...")
-        
-        # Read CSV file
-        csv_path = os.path.join(self.data_path, csv_file)
-        if not os.path.exists(csv_path):
-            print(f"  Warning: File {csv_path} not found. Skipping.")
-            return
-        
-        df = pd.read_csv(csv_path)
-        print(f"  Loaded {len(df)} rows from {csv_file}")
+    def delete_partitions(self, table_name, column, requested):
+        """Delete the rows of the requested date partitions before reloading them."""
+        cursor = self.connection.cursor()
+        try:
+            cursor.execute(f"DELETE FROM {table_name} WHERE {partition_predicate(column, requested, table_name)}")
+            print(f"  Replacing {describe_partitions(column, requested)} in {table_name}")
+        except Exception as e:
+            # Appending without the delete would duplicate the partitions
+            print(f"  Error deleting partitions: {e}")
+            raise
+        finally:
+            cursor.close()
+    
+    def load_chunk(self, table_name, df, first_chunk=True):
+        """Load a DataFrame chunk into a Snowflake table.
+
+        When `first_chunk` is set the table is truncated/overwritten first
+        if the `truncate_before_load` option is enabled.
+        """
+        truncate = first_chunk and self.options['truncate_before_load']
         
         # Create cursor
         cursor = self.connection.cursor()
         
         # Optionally truncate table
-        if self.options['truncate_before_load']:
+        if truncate:
             try:
                 cursor.execute(f"TRUNCATE TABLE {table_name}")
                 print(f"  Truncated table {table_name}")
@@ -82,35 +100,49 @@ class SnowflakeIngestion:
                 database=self.db_config['database'],
                 schema=self.db_config['schema'],
                 auto_create_table=self.options['create_tables_if_not_exist'],
-                overwrite=self.options['truncate_before_load']
+                overwrite=truncate
             )
-            
-            if success:
-                print(f"  ✓ Successfully ingested {nrows} rows into {table_name}")
-            else:
-                print(f"  ✗ Failed to ingest {table_name}")
-                
-        except Exception as e:
-            print(f"  Error ingesting data: {e}")
-            raise
         finally:
             cursor.close()
+        
+        if not success:
+            raise RuntimeError(f"write_pandas reported failure for {table_name}")
+        
+        return nrows
     
-    def ingest_all(self):
-        """Ingest all tables."""
-        tables = {
-            'products': 'products.csv',
-            'recipes': 'recipes.csv',
-            'recipe_lines': 'recipe_lines.csv',
-            'customers': 'customers.csv',
-            'orders': 'orders.csv',
-            'order_lines': 'order_lines.csv',
-            'shipments': 'shipments.csv',
-            'returns': 'returns.csv',
-            'waste': 'waste.csv',
-            'quality_inspections': 'quality_inspections.csv'
-        }
+    def ingest_table(self, table_name, csv_file):
+        """Ingest a single CSV file into a Snowflake table."""
+        print(f"\nIngesting {table_name}...")
         
+        # Read CSV file (or the selected date partitions)
+        partitions = resolve_partitions(self.data_path, table_name, self.partition_filter, self.layout)
+        df = read_table(self.data_path, table_name, csv_file, partitions)
+        
+        # A filtered partition load replaces only the requested partitions,
+        # clearing them even when they no longer have any data
+        first_chunk = True
+        replace = partitions_to_replace(partitions, self.partition_filter)
+        if replace:
+            self.delete_partitions(table_name, *replace)
+            first_chunk = False
+        if df is None:
+            return
+        
+        print(f"  Loaded {len(df)} rows from {describe_source(csv_file, partitions)}")
+        
+        try:
+            nrows = self.load_chunk(table_name, df, first_chunk=first_chunk)
+            print(f"  ✓ Successfully ingested {nrows} rows into {table_name}")
+            self.rows_loaded += nrows
+        except RuntimeError:
+            print(f"  ✗ Failed to ingest {table_name}")
+            raise
+        except Exception as e:
+            print(f"  Error ingesting data: {e}")
+            raise
+    
+    def ingest_all(self, tables=None):
+        """Ingest all tables, or only the given table names."""
         print("=" * 80)
         print("SNOWFLAKE DATA INGESTION")
         print("=" * 80)
@@ -120,8 +152,8 @@ class SnowflakeIngestion:
         self.connect()
         
         try:
-            for table_name, csv_file in tables.items():
-                self.ingest_table(table_name, csv_file)
+            for table_name in load_order(tables or list(TABLES)):
+                self.ingest_table(table_name, TABLES[table_name])
         finally:
             self.disconnect()
         
@@ -0,0 +1,354 @@
+"""
+Micro-Batch Stream Consumer
+
+Tails the order event stream written by data_generators/stream_orders.py
+(rotating NDJSON files or the local socket stand-in) and loads it into the
+warehouse in micro-batches. A batch is flushed every `flush_seconds` or
+once `flush_rows` events are buffered, whichever comes first, through the
+backend's `load_chunk` in append mode.
+
+End-to-end latency (producer event_ts -> flush committed) is tracked per
+event and reported as p50/p95/p99 per flush and for the whole run.
+
+The file source keeps a checkpoint (file + byte offset) that is only
+advanced after a flush succeeds, so a restart re-delivers at most the batch
+that was in flight (at-least-once).
+
+Usage:
+    python stream_consumer.py config.yaml
+    python stream_consumer.py config.yaml --source socket://127.0.0.1:9099
+    python stream_consumer.py config.yaml --sink local --max-seconds 60
+"""
+
+import os
+import sys
+import json
+import time
+import socket
+import argparse
+import importlib
+import statistics
+
+from common import BACKENDS, load_config
+
+
+# event_type -> raw table
+EVENT_TABLES = {
+    'order': 'orders',
+    'order_line': 'order_lines',
+}
+
+STREAMING_DEFAULTS = {
+    'log_dir': '../sample_data/stream',
+    'checkpoint_path': None,
+    'flush_seconds': 5,
+    'flush_rows': 50000,
+}
+
+
+class FileLogSource:
+    """Reads complete lines from the rotating NDJSON log, in file order."""
+
+    def __init__(self, log_dir, checkpoint_path):
+        self.log_dir = log_dir
+        self.checkpoint_path = checkpoint_path
+        self.file_name = None
+        self.offset = 0
+
+        if os.path.exists(checkpoint_path):
+            with open(checkpoint_path, 'r') as f:
+                checkpoint = json.load(f)
+            self.file_name = checkpoint['file']
+            self.offset = checkpoint['offset']
+            print(f"Resuming from {self.file_name} @ {self.offset}")
+
+        self.committed = (self.file_name, self.offset)
+
+    def _log_files(self):
+        if not os.path.isdir(self.log_dir):
+            return []
+        return sorted(f for f in os.listdir(self.log_dir) if f.endswith('.ndjson'))
+
+    def poll(self, max_lines, timeout):
+        """Return up to `max_lines` new lines, waiting at most `timeout` seconds."""
+        deadline = time.monotonic() + timeout
+        while True:
+            files = self._log_files()
+            if files and (self.file_name is None or self.file_name not in files):
+                later = [f for f in files if self.file_name is None or f > self.file_name]
+                if later:
+                    self.file_name, self.offset = later[0], 0
+
+            if self.file_name:
+                with open(os.path.join(self.log_dir, self.file_name), 'rb') as f:
+                    f.seek(self.offset)
+                    data = f.read()
+
+                # Only consume complete lines; the producer may be mid-write
+                end = data.rfind(b'\n') + 1
+                if end:
+                    lines = data[:end].splitlines()[:max_lines]
+                    self.offset += sum(len(line) + 1 for line in lines)
+                    return lines
+
+                # Current file drained: move on once the producer has rotated
+                later = [f for f in files if f > self.file_name]
+                if later:
+                    self.file_name, self.offset = later[0], 0
+                    continue
+
+            if time.monotonic() >= deadline:
+                return []
+            time.sleep(min(0.05, max(0.0, deadline - time.monotonic())))
+
+    def commit(self):
+        """Persist the read position after a successful flush."""
+        if (self.file_name, self.offset) == self.committed:
+            return
+        os.makedirs(os.path.dirname(self.checkpoint_path) or '.', exist_ok=True)
+        tmp_path = self.checkpoint_path + '.tmp'
+        with open(tmp_path, 'w') as f:
+            json.dump({'file': self.file_name, 'offset': self.offset}, f)
+        os.replace(tmp_path, self.checkpoint_path)
+        self.committed = (self.file_name, self.offset)
+
+    def close(self):
+        pass
+
+
+class SocketSource:
+    """Reads lines from the producer's local TCP socket."""
+
+    def __init__(self, host, port):
+        self.sock = socket.create_connection((host, port))
+        self.buffer = b''
+        self.closed = False
+
+    def poll(self, max_lines, timeout):
+        """Return up to `max_lines` new lines, waiting at most `timeout` seconds."""
+        if b'\n' not in self.buffer and not self.closed:
+            self.sock.settimeout(max(timeout, 0.001))
+            try:
+                data = self.sock.recv(1024 * 1024)
+                if data:
+                    self.buffer += data
+                else:
+                    self.closed = True
+            except socket.timeout:
+                pass
+
+        end = self.buffer.rfind(b'\n') + 1
+        lines = self.buffer[:end].splitlines()[:max_lines]
+        consumed = sum(len(line) + 1 for line in lines)
+        self.buffer = self.buffer[consumed:]
+        return lines
+
+    def commit(self):
+        pass
+
+    def close(self):
+        self.sock.close()
+
+
+class LocalCSVSink:
+    """Appends micro-batches to local CSV files; stands in for a warehouse."""
+
+    def __init__(self, output_dir):
+        self.output_dir = output_dir
+
+    def connect(self):
+        os.makedirs(self.output_dir, exist_ok=True)
+        print(f"✓ Writing micro-batches to {self.output_dir}")
+
+    def load_chunk(self, table_name, df, first_chunk=True):
+        path = os.path.join(self.output_dir, f'{table_name}.csv')
+        df.to_csv(path, mode='a', header=not os.path.exists(path), index=False)
+        return len(df)
+
+    def disconnect(self):
+        pass
+
+
+def percentiles(values):
+    """Return (p50, p95, p99) of `values`."""
+    if len(values) < 2:
+        value = values[0] if values else 0.0
+        return value, value, value
+    cuts = statistics.quantiles(values, n=100, method='inclusive')
+    return cuts[49], cuts[94], cuts[98]
+
+
+class MicroBatchConsumer:
+    """Buffers stream events and flushes them to a sink in micro-batches."""
+
+    def __init__(self, source, sink, flush_seconds=5, flush_rows=50000):
+        self.source = source
+        self.sink = sink
+        self.flush_seconds = flush_seconds
+        self.flush_rows = flush_rows
+
+        self.buffer = {table: [] for table in EVENT_TABLES.values()}
+        self.event_times = []
+        self.latencies = []
+        self.batches = 0
+        self.rows = 0
+        self.flush_time = 0.0
+
+    def buffered(self):
+        return len(self.event_times)
+
+    def flush(self):
+        """Load buffered events, then commit the source position."""
+        if not self.event_times:
+            return
+
+        import pandas as pd
+
+        start = time.perf_counter()
+        for table_name, payloads in self.buffer.items():
+            if payloads:
+                self.sink.load_chunk(table_name, pd.DataFrame(payloads), first_chunk=False)
+        self.source.commit()
+        elapsed = time.perf_counter() - start
+
+        done = time.time()
+        latencies = [done - ts for ts in self.event_times]
+        p50, p95, p99 = percentiles(latencies)
+        counts = ', '.join(f"{t}={len(p)}" for t, p in self.buffer.items() if p)
+        print(f"  Batch {self.batches + 1}: {len(latencies)} events ({counts}) "
+              f"in {elapsed:.2f}s | latency p50={p50:.2f}s p95={p95:.2f}s p99={p99:.2f}s")
+
+        self.latencies.extend(latencies)
+        self.batches += 1
+        self.rows += len(latencies)
+        self.flush_time += elapsed
+        self.buffer = {table: [] for table in EVENT_TABLES.values()}
+        self.event_times = []
+
+    def run(self, max_seconds=None, idle_exit_seconds=None):
+        """Consume until stopped, `max_seconds` elapse, or the stream is idle."""
+        start = time.monotonic()
+        last_flush = start
+        last_event = start
+
+        while True:
+            now = time.monotonic()
+            if max_seconds is not None and now - start >= max_seconds:
+                break
+            if idle_exit_seconds is not None and now - last_event >= idle_exit_seconds:
+                break
+            if getattr(self.source, 'closed', False) and not self.event_times:
+                break
+
+            wait = max(0.0, self.flush_seconds - (now - last_flush))
+            lines = self.source.poll(self.flush_rows - self.buffered(), timeout=min(wait, 0.5))
+            if lines:
+                last_event = time.monotonic()
+            for line in lines:
+                event = json.loads(line)
+                table_name = EVENT_TABLES.get(event['event_type'])
+                if table_name is None:
+                    continue
+                self.buffer[table_name].append(event['payload'])
+                self.event_times.append(event['event_ts'])
+
+            if (self.buffered() >= self.flush_rows
+                    or time.monotonic() - last_flush >= self.flush_seconds):
+                self.flush()
+                last_flush = time.monotonic()
+
+        self.flush()
+        return time.monotonic() - start
+
+    def print_summary(self, elapsed):
+        """Print throughput and end-to-end latency for the whole run."""
+        print()
+        print("=" * 80)
+        print("STREAM INGESTION SUMMARY")
+        print("=" * 80)
+        print(f"Batches:    {self.batches}")
+        print(f"Events:     {self.rows} ({self.rows / elapsed:.0f} events/sec over {elapsed:.1f}s)")
+        print(f"Flush time: {self.flush_time:.2f}s total")
+        if self.latencies:
+            p50, p95, p99 = percentiles(self.latencies)
+            print(f"End-to-end latency: p50={p50:.2f}s p95={p95:.2f}s "
+                  f"p99={p99:.2f}s max={max(self.latencies):.2f}s")
+
+
+def create_sink(args, config):
+    """Construct the sink: a warehouse backend, or local CSV files."""
+    if args.sink == 'local':
+        return LocalCSVSink(args.output_dir)
+
+    platform = args.sink or config['platform']
+    module_name, class_name = BACKENDS[platform]
+    module = importlib.import_module(module_name)
+    return getattr(module, class_name)(args.config_path)
+
+
+def create_source(args, settings):
+    """Construct the source from `--source` or the streaming config."""
+    if args.source and args.source.startswith('socket://'):
+        host, port = args.source[len('socket://'):].rsplit(':', 1)
+        return SocketSource(host, int(port))
+
+    # The checkpoint lives next to the log unless configured explicitly
+    log_dir = args.source or settings['log_dir']
+    checkpoint_path = settings['checkpoint_path']
+    if args.source or not checkpoint_path:
+        checkpoint_path = os.path.join(log_dir, '_checkpoint.json')
+    return FileLogSource(log_dir, checkpoint_path)
+
+
+def main(argv=None):
+    """Main execution function."""
+    parser = argparse.ArgumentParser(description='Micro-batch ingestion of the order event stream.')
+    parser.add_argument('config_path', nargs='?', default='config.yaml')
+    parser.add_argument('--source', help='Log directory or socket://host:port (default: streaming.log_dir)')
+    parser.add_argument('--sink', choices=sorted(BACKENDS) + ['local'],
+                        help="Target platform (default: config platform); 'local' appends to CSV")
+    parser.add_argument('--output-dir', default='../sample_data/stream_loaded',
+                        help='Output directory for the local sink')
+    parser.add_argument('--flush-seconds', type=float, help='Flush at least this often')
+    parser.add_argument('--flush-rows', type=int, help='Flush once this many events are buffered')
+    parser.add_argument('--max-seconds', type=float, help='Stop after this many seconds')
+    parser.add_argument('--idle-exit', type=float, help='Stop after this many seconds without events')
+    args = parser.parse_args(argv)
+
+    if not os.path.exists(args.config_path):
+        print(f"Error: Configuration file '{args.config_path}' not found.")
+        print("Please copy config_template.yaml to config.yaml and configure it.")
+        sys.exit(1)
+
+    config = load_config(args.config_path)
+    settings = {**STREAMING_DEFAULTS, **(config.get('streaming') or {})}
+    if args.flush_seconds is not None:
+        settings['flush_seconds'] = args.flush_seconds
+    if args.flush_rows is not None:
+        settings['flush_rows'] = args.flush_rows
+
+    sink = create_sink(args, config)
+    source = create_source(args, settings)
+    consumer = MicroBatchConsumer(source, sink, settings['flush_seconds'], settings['flush_rows'])
+
+    print("=" * 80)
+    print(f"STREAM INGESTION (flush every {settings['flush_seconds']}s or "
+          f"{settings['flush_rows']} events)")
+    print("=" * 80)
+
+    sink.connect()
+    start = time.monotonic()
+    try:
+        elapsed = consumer.run(args.max_seconds, args.idle_exit)
+    except KeyboardInterrupt:
+        consumer.flush()
+        elapsed = time.monotonic() - start
+    finally:
+        source.close()
+        sink.disconnect()
+
+    consumer.print_summary(elapsed)
+
+
+if __name__ == '__main__':
+    main()
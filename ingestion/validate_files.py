@@ -0,0 +1,291 @@
+"""
+Data File Validation
+
+Validates every raw data file in parallel before ingestion:
+
+  - streaming SHA-256 content hash and byte size
+  - row count (newline count; memory-mapped for large files)
+  - header vs. the raw table schema (schemas/databricks/create_raw_tables.sql)
+  - truncation: a file that does not end with a newline, or whose last row
+    has a different field count than the header
+
+Flat CSVs and the partitioned layout (generate_all.py --partitioned) are
+both handled, as selected by `data_source.layout`. Results are written to
+`<data_path>/_validation.json`, which `ingest.py --skip-unchanged` compares
+against the hashes it last loaded to skip tables whose files have not
+changed.
+
+Usage:
+    python validate_files.py config.yaml
+    python validate_files.py config.yaml --workers 8 --output /tmp/validation.json
+"""
+
+import os
+import re
+import io
+import csv
+import sys
+import mmap
+import glob
+import json
+import hashlib
+import argparse
+from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor
+
+from common import (
+    TABLES, DATA_LAYOUTS, PARTITION_COLUMNS, PARTITION_DIR_PATTERN, load_config,
+    data_layout_from_config
+)
+
+VALIDATION_FILE = '_validation.json'
+
+# Files at least this large are read through mmap instead of buffered reads
+MMAP_THRESHOLD = 64 * 1024 * 1024
+CHUNK_SIZE = 8 * 1024 * 1024
+
+DEFAULT_SCHEMA = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), '..', 'schemas', 'databricks', 'create_raw_tables.sql'
+)
+
+
+def load_schema(ddl_path):
+    """Return `{table: [columns]}` parsed from a CREATE TABLE script."""
+    with open(ddl_path, 'r') as f:
+        ddl = f.read()
+
+    schema = {}
+    for match in re.finditer(r'CREATE TABLE IF NOT EXISTS (\w+) \((.*?)\n\)', ddl, re.S):
+        schema[match.group(1)] = [
+            line.strip().split()[0]
+            for line in match.group(2).splitlines()
+            if line.strip() and not line.strip().startswith('--')
+        ]
+    return schema
+
+
+def _iter_chunks(path, size):
+    """Yield the file's bytes in chunks, through mmap for large files."""
+    with open(path, 'rb') as f:
+        if size >= MMAP_THRESHOLD:
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                if hasattr(mmap, 'MADV_SEQUENTIAL'):
+                    mm.madvise(mmap.MADV_SEQUENTIAL)
+                for start in range(0, size, CHUNK_SIZE):
+                    yield mm[start:start + CHUNK_SIZE]
+        else:
+            while True:
+                chunk = f.read(CHUNK_SIZE)
+                if not chunk:
+                    break
+                yield chunk
+
+
+def _last_line(path, size):
+    """Return the last non-empty line of a file."""
+    with open(path, 'rb') as f:
+        f.seek(max(0, size - 64 * 1024))
+        lines = f.read().rstrip(b'\n').rsplit(b'\n', 1)
+    return lines[-1].decode('utf-8', errors='replace')
+
+
+def scan_csv(path):
+    """Hash, count and check one CSV file.
+
+    Row counts are newline counts, which assumes no embedded newlines in
+    quoted fields (true for the generated data).
+    """
+    size = os.path.getsize(path)
+    digest = hashlib.sha256()
+    newlines = 0
+    last_byte = b''
+    for chunk in _iter_chunks(path, size):
+        digest.update(chunk)
+        newlines += chunk.count(b'\n')
+        last_byte = chunk[-1:]
+
+    with open(path, 'r', newline='') as f:
+        header = next(csv.reader(f), [])
+
+    ends_with_newline = last_byte == b'\n'
+    rows = max(0, newlines - 1 + (0 if ends_with_newline or not size else 1))
+
+    truncated = bool(size) and not ends_with_newline
+    if rows and not truncated:
+        last_row = next(csv.reader(io.StringIO(_last_line(path, size))), [])
+        truncated = len(last_row) != len(header)
+
+    return {
+        'path': path,
+        'bytes': size,
+        'sha256': digest.hexdigest(),
+        'rows': rows,
+        'header': header,
+        'truncated': truncated,
+    }
+
+
+def scan_parquet(path):
+    """Hash one Parquet file and read its row count and columns from the footer."""
+    import pyarrow.parquet as pq
+
+    size = os.path.getsize(path)
+    digest = hashlib.sha256()
+    for chunk in _iter_chunks(path, size):
+        digest.update(chunk)
+
+    try:
+        parquet_file = pq.ParquetFile(path)
+        rows = parquet_file.metadata.num_rows
+        header = parquet_file.schema_arrow.names
+        truncated = False
+    except Exception:
+        # A missing/corrupt footer is what a truncated Parquet file looks like
+        rows, header, truncated = 0, [], True
+
+    return {
+        'path': path,
+        'bytes': size,
+        'sha256': digest.hexdigest(),
+        'rows': rows,
+        'header': header,
+        'truncated': truncated,
+    }
+
+
+def table_files(data_path, table_name, csv_file, layout='flat'):
+    """Return (files, partition column or None) for a table in `layout`."""
+    table_dir = os.path.join(data_path, table_name)
+    if layout == 'partitioned' and table_name in PARTITION_COLUMNS:
+        files = sorted(glob.glob(os.path.join(table_dir, '*=*', 'part-*')))
+        partition_column = None
+        if files:
+            match = PARTITION_DIR_PATTERN.match(os.path.basename(os.path.dirname(files[0])))
+            partition_column = match.group(1) if match else None
+        return files, partition_column
+
+    path = os.path.join(data_path, csv_file)
+    return ([path] if os.path.exists(path) else []), None
+
+
+def summarize_table(table_name, files, partition_column, scans, expected_columns):
+    """Combine per-file scans into one table result."""
+    if not files:
+        return {'status': 'MISSING', 'files': 0}
+
+    problems = []
+    expected = [c for c in expected_columns or [] if c != partition_column]
+    headers = {tuple(s['header']) for s in scans}
+    missing = sorted(set(expected) - set().union(*map(set, headers))) if expected else []
+    extra = sorted(set().union(*map(set, headers)) - set(expected)) if expected else []
+    if missing or extra:
+        problems.append('header mismatch')
+    truncated = [s['path'] for s in scans if s['truncated']]
+    if truncated:
+        problems.append('truncated')
+
+    # A partitioned table's hash covers every part file and its location
+    if len(scans) == 1:
+        table_hash = scans[0]['sha256']
+    else:
+        digest = hashlib.sha256()
+        for scan in scans:
+            digest.update(os.path.relpath(scan['path'], os.path.dirname(files[0])).encode())
+            digest.update(scan['sha256'].encode())
+        table_hash = digest.hexdigest()
+
+    return {
+        'status': 'INVALID' if problems else 'OK',
+        'problems': problems,
+        'files': len(files),
+        'bytes': sum(s['bytes'] for s in scans),
+        'rows': sum(s['rows'] for s in scans),
+        'sha256': table_hash,
+        'missing_columns': missing,
+        'extra_columns': extra,
+        'truncated_files': truncated,
+    }
+
+
+def validate_all(data_path, schema, tables=None, max_workers=8, layout='flat'):
+    """Validate all tables' files in parallel; returns `{table: result}`."""
+    tables = tables or list(TABLES)
+    table_layout = {t: table_files(data_path, t, TABLES[t], layout) for t in tables}
+    all_files = [path for files, _ in table_layout.values() for path in files]
+
+    def scan(path):
+        return scan_parquet(path) if path.endswith('.parquet') else scan_csv(path)
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        scans = dict(zip(all_files, executor.map(scan, all_files)))
+
+    return {
+        table: summarize_table(
+            table, files, partition_column, [scans[f] for f in files], schema.get(table)
+        )
+        for table, (files, partition_column) in table_layout.items()
+    }
+
+
+def write_results(results, output_path):
+    """Write validation results for ingest.py --skip-unchanged."""
+    tmp_path = output_path + '.tmp'
+    with open(tmp_path, 'w') as f:
+        json.dump({'validated_at': datetime.now().isoformat(), 'tables': results}, f, indent=2)
+    os.replace(tmp_path, output_path)
+
+
+def main(argv=None):
+    """Main execution function."""
+    parser = argparse.ArgumentParser(description='Validate raw data files before ingestion.')
+    parser.add_argument('config_path', nargs='?', default='config.yaml')
+    parser.add_argument('--schema', default=DEFAULT_SCHEMA, help='CREATE TABLE script to check headers against')
+    parser.add_argument('--workers', type=int, default=8, help='Files validated in parallel')
+    parser.add_argument('--output', help=f'Results file (default: <data_path>/{VALIDATION_FILE})')
+    parser.add_argument('--data-path', help='Override data_source.path')
+    parser.add_argument('--layout', choices=DATA_LAYOUTS, help='Override data_source.layout')
+    args = parser.parse_args(argv)
+
+    if not os.path.exists(args.config_path):
+        print(f"Error: Configuration file '{args.config_path}' not found.")
+        print("Please copy config_template.yaml to config.yaml and configure it.")
+        sys.exit(1)
+
+    config = load_config(args.config_path)
+    data_path = args.data_path or config['data_source']['path']
+    layout = args.layout or data_layout_from_config(config)
+    start = datetime.now()
+    results = validate_all(data_path, load_schema(args.schema), max_workers=args.workers, layout=layout)
+    elapsed = (datetime.now() - start).total_seconds()
+
+    print("=" * 80)
+    print("DATA FILE VALIDATION")
+    print("=" * 80)
+    for table, r in results.items():
+        marker = '✓' if r['status'] == 'OK' else '✗'
+        if r['status'] == 'MISSING':
+            print(f"{marker} {table:<22} missing")
+            continue
+        detail = f" ({', '.join(r['problems'])})" if r['problems'] else ''
+        print(f"{marker} {table:<22} {r['rows']:>10} rows {r['files']:>5} files "
+              f"{r['bytes'] / 1e6:>9.2f} MB  {r['sha256'][:12]}{detail}")
+    print(f"\nValidated {sum(r['files'] for r in results.values())} files in {elapsed:.2f}s")
+
+    output_path = args.output or os.path.join(data_path, VALIDATION_FILE)
+    write_results(results, output_path)
+    print(f"Results written to {output_path}")
+
+    failed = sorted(t for t, r in results.items() if r['status'] != 'OK')
+    if failed:
+        print(f"\nError: validation failed for {failed}")
+        sys.exit(1)
+
+    # Last line: picked up as XCom by the Airflow run instrumentation
+    print(json.dumps({
+        'rows_processed': sum(r['rows'] for r in results.values()),
+        'bytes_processed': sum(r['bytes'] for r in results.values()),
+    }))
+
+
+if __name__ == '__main__':
+    main()
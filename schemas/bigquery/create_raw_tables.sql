@@ -1,5 +1,9 @@
 -- BigQuery Schema Definitions
 -- Raw Layer: Bronze Tables
+--
+-- The date-keyed tables are partitioned by their date and clustered on the
+-- keys the staging/fact models join and filter on. BigQuery cannot change an
+-- existing table's partitioning with DDL, so recreate tables to change it.
 
 -- Create dataset
 -- Run this in BigQuery console or via bq CLI:
@@ -137,6 +141,7 @@ CREATE OR REPLACE TABLE `physical_product_raw.order_lines` (
     notes STRING,
     _loaded_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP()
 )
+CLUSTER BY order_id, product_id
 OPTIONS(
     description="Sales order line items"
 );
@@ -169,7 +174,7 @@ CREATE OR REPLACE TABLE `physical_product_raw.shipments` (
     _loaded_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP()
 )
 PARTITION BY DATE(shipment_date)
-CLUSTER BY carrier, shipment_status
+CLUSTER BY order_id, carrier, shipment_status
 OPTIONS(
     description="Shipment and delivery tracking",
     partition_expiration_days=1825  -- 5 years
@@ -202,7 +207,7 @@ CREATE OR REPLACE TABLE `physical_product_raw.returns` (
     _loaded_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP()
 )
 PARTITION BY DATE(return_request_date)
-CLUSTER BY return_status, return_reason
+CLUSTER BY product_id, customer_id, return_status
 OPTIONS(
     description="Product returns and refunds",
     partition_expiration_days=1825  -- 5 years
@@ -238,7 +243,7 @@ CREATE OR REPLACE TABLE `physical_product_raw.waste` (
     _loaded_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP()
 )
 PARTITION BY DATE(waste_date)
-CLUSTER BY waste_category, facility_location
+CLUSTER BY product_id, waste_category, facility_location
 OPTIONS(
     description="Manufacturing waste and scrap tracking",
     partition_expiration_days=1825  -- 5 years
@@ -282,7 +287,7 @@ CREATE OR REPLACE TABLE `physical_product_raw.quality_inspections` (
     _loaded_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP()
 )
 PARTITION BY DATE(inspection_date)
-CLUSTER BY inspection_status, facility_location
+CLUSTER BY product_id, inspection_status, facility_location
 OPTIONS(
     description="Quality control and inspection records",
     partition_expiration_days=1825  -- 5 years
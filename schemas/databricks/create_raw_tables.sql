@@ -1,5 +1,13 @@
 -- Databricks Schema Definitions
 -- Raw Layer: Bronze Tables
+--
+-- The large date-keyed tables use liquid clustering (CLUSTER BY, Databricks
+-- Runtime 13.3+) on their date and the keys the staging/fact models join and
+-- filter on. To change the keys of existing tables, edit raw_table_clustering in
+-- dbt_project.yml and run `dbt run-operation apply_raw_table_layout`.
+--
+-- For date-partitioned orders, shipments, returns, waste and quality_inspections
+-- (PARTITIONED BY the date column), see create_raw_tables_partitioned.sql.
 
 -- Create database
 CREATE DATABASE IF NOT EXISTS physical_product_raw;
@@ -109,6 +117,7 @@ CREATE TABLE IF NOT EXISTS orders (
     updated_date TIMESTAMP
 )
 USING DELTA
+CLUSTER BY (order_date, customer_id)
 LOCATION '/mnt/datalake/raw/orders';
 
 -- Order Lines Table
@@ -124,6 +133,7 @@ CREATE TABLE IF NOT EXISTS order_lines (
     notes STRING
 )
 USING DELTA
+CLUSTER BY (order_id, product_id)
 LOCATION '/mnt/datalake/raw/order_lines';
 
 -- Shipments Table
@@ -153,6 +163,7 @@ CREATE TABLE IF NOT EXISTS shipments (
     updated_date TIMESTAMP
 )
 USING DELTA
+CLUSTER BY (shipment_date, order_id)
 LOCATION '/mnt/datalake/raw/shipments';
 
 -- Returns Table
@@ -181,6 +192,7 @@ CREATE TABLE IF NOT EXISTS returns (
     updated_date TIMESTAMP
 )
 USING DELTA
+CLUSTER BY (return_request_date, product_id, customer_id)
 LOCATION '/mnt/datalake/raw/returns';
 
 -- Waste Table
@@ -212,6 +224,7 @@ CREATE TABLE IF NOT EXISTS waste (
     updated_date TIMESTAMP
 )
 USING DELTA
+CLUSTER BY (waste_date, product_id)
 LOCATION '/mnt/datalake/raw/waste';
 
 -- Quality Inspections Table
@@ -251,4 +264,5 @@ CREATE TABLE IF NOT EXISTS quality_inspections (
     updated_date TIMESTAMP
 )
 USING DELTA
+CLUSTER BY (inspection_date, product_id)
 LOCATION '/mnt/datalake/raw/quality_inspections';
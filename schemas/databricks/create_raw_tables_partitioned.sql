@@ -0,0 +1,186 @@
+-- Databricks Schema Definitions (Date-Partitioned Variant)
+-- Raw Layer: Bronze Tables
+--
+-- Alternative DDL for the date-keyed tables, matching the Hive layout written by
+-- `python data_generators/generate_all.py --partitioned`
+-- (e.g. orders/order_date=YYYY-MM-DD/part-*.parquet).
+-- Partitioning by the load date lets a daily reload replace only the affected
+-- partitions and lets queries filtering on the date prune whole directories.
+--
+-- Run this instead of the matching statements in create_raw_tables.sql. Existing
+-- unpartitioned tables must be dropped (or recreated) first, as Delta cannot
+-- change the partitioning of an existing table in place.
+--
+-- Partitioned tables cannot use liquid clustering; Z-order them within each
+-- partition instead (statements at the end; with databricks_layout: 'partitioned'
+-- in dbt_project.yml, `dbt run-operation apply_raw_table_layout` runs the same).
+
+USE physical_product_raw;
+
+-- Orders Table (partitioned by order_date)
+CREATE TABLE IF NOT EXISTS orders (
+    order_id STRING,
+    customer_id STRING,
+    order_date DATE,
+    order_time TIME,
+    order_status STRING,
+    payment_method STRING,
+    shipping_address STRING,
+    shipping_city STRING,
+    shipping_state STRING,
+    shipping_postal_code STRING,
+    billing_address STRING,
+    billing_city STRING,
+    billing_state STRING,
+    billing_postal_code STRING,
+    subtotal DECIMAL(12,2),
+    tax_amount DECIMAL(12,2),
+    shipping_cost DECIMAL(12,2),
+    discount_amount DECIMAL(12,2),
+    total_amount DECIMAL(12,2),
+    notes STRING,
+    created_date TIMESTAMP,
+    updated_date TIMESTAMP
+)
+USING DELTA
+PARTITIONED BY (order_date)
+LOCATION '/mnt/datalake/raw/orders';
+
+-- Shipments Table (partitioned by shipment_date)
+CREATE TABLE IF NOT EXISTS shipments (
+    shipment_id STRING,
+    order_id STRING,
+    tracking_number STRING,
+    carrier STRING,
+    service_level STRING,
+    shipment_date DATE,
+    expected_delivery_date DATE,
+    actual_delivery_date DATE,
+    shipment_status STRING,
+    origin_warehouse STRING,
+    destination_city STRING,
+    destination_state STRING,
+    destination_postal_code STRING,
+    weight_kg DECIMAL(10,2),
+    dimensions_cm STRING,
+    shipping_cost DECIMAL(10,2),
+    package_count INT,
+    is_signature_required BOOLEAN,
+    is_insured BOOLEAN,
+    insurance_value DECIMAL(10,2),
+    delivery_notes STRING,
+    created_date TIMESTAMP,
+    updated_date TIMESTAMP
+)
+USING DELTA
+PARTITIONED BY (shipment_date)
+LOCATION '/mnt/datalake/raw/shipments';
+
+-- Returns Table (partitioned by return_request_date)
+CREATE TABLE IF NOT EXISTS returns (
+    return_id STRING,
+    order_id STRING,
+    order_line_id STRING,
+    product_id STRING,
+    customer_id STRING,
+    return_request_date DATE,
+    return_reason STRING,
+    return_status STRING,
+    quantity_returned INT,
+    return_condition STRING,
+    approved_date DATE,
+    received_date DATE,
+    refund_date DATE,
+    refund_method STRING,
+    refund_amount DECIMAL(12,2),
+    restocking_fee DECIMAL(12,2),
+    shipping_label_cost DECIMAL(10,2),
+    is_warranty_return BOOLEAN,
+    inspector_notes STRING,
+    customer_comments STRING,
+    created_date TIMESTAMP,
+    updated_date TIMESTAMP
+)
+USING DELTA
+PARTITIONED BY (return_request_date)
+LOCATION '/mnt/datalake/raw/returns';
+
+-- Waste Table (partitioned by waste_date)
+CREATE TABLE IF NOT EXISTS waste (
+    waste_id STRING,
+    waste_date DATE,
+    waste_type STRING,
+    waste_category STRING,
+    product_id STRING,
+    material_sku STRING,
+    batch_id STRING,
+    facility_location STRING,
+    department STRING,
+    quantity DECIMAL(10,2),
+    unit_of_measure STRING,
+    unit_cost DECIMAL(10,2),
+    total_material_cost DECIMAL(12,2),
+    disposal_method STRING,
+    disposal_cost DECIMAL(12,2),
+    disposal_date DATE,
+    disposal_vendor STRING,
+    is_preventable BOOLEAN,
+    root_cause STRING,
+    corrective_action STRING,
+    environmental_impact_score DECIMAL(3,1),
+    carbon_footprint_kg DECIMAL(10,2),
+    recorded_by STRING,
+    created_date TIMESTAMP,
+    updated_date TIMESTAMP
+)
+USING DELTA
+PARTITIONED BY (waste_date)
+LOCATION '/mnt/datalake/raw/waste';
+
+-- Quality Inspections Table (partitioned by inspection_date)
+CREATE TABLE IF NOT EXISTS quality_inspections (
+    inspection_id STRING,
+    inspection_date DATE,
+    inspection_time TIME,
+    inspection_type STRING,
+    inspection_status STRING,
+    product_id STRING,
+    batch_id STRING,
+    order_id STRING,
+    facility_location STRING,
+    inspector_name STRING,
+    inspector_id STRING,
+    sample_size INT,
+    defect_count INT,
+    defect_type STRING,
+    severity_level STRING,
+    defect_description STRING,
+    measurement_1 DECIMAL(10,2),
+    measurement_2 DECIMAL(10,2),
+    measurement_3 DECIMAL(10,2),
+    specification_met BOOLEAN,
+    tolerance_percentage DECIMAL(5,2),
+    visual_inspection_score DECIMAL(3,1),
+    functional_test_result STRING,
+    compliance_standard STRING,
+    corrective_action_required BOOLEAN,
+    corrective_action_description STRING,
+    follow_up_date DATE,
+    root_cause_analysis STRING,
+    cost_of_quality DECIMAL(10,2),
+    disposition STRING,
+    notes STRING,
+    created_date TIMESTAMP,
+    updated_date TIMESTAMP
+)
+USING DELTA
+PARTITIONED BY (inspection_date)
+LOCATION '/mnt/datalake/raw/quality_inspections';
+
+-- Z-order each partition on the keys the staging/fact models join and filter on.
+-- Re-run periodically (or enable predictive optimization) as new data arrives.
+OPTIMIZE orders ZORDER BY (customer_id);
+OPTIMIZE shipments ZORDER BY (order_id);
+OPTIMIZE returns ZORDER BY (product_id, customer_id);
+OPTIMIZE waste ZORDER BY (product_id);
+OPTIMIZE quality_inspections ZORDER BY (product_id);
@@ -1,5 +1,10 @@
 -- Snowflake Schema Definitions
 -- Raw Layer: Bronze Tables
+--
+-- The large date-keyed tables are clustered on their date and the keys the
+-- staging/fact models join and filter on. To change the keys of existing
+-- tables, edit raw_table_clustering in dbt_project.yml and run
+-- `dbt run-operation apply_raw_table_layout`.
 
 -- Create database and schema
 CREATE DATABASE IF NOT EXISTS PHYSICAL_PRODUCT_DB;
@@ -107,7 +112,8 @@ CREATE OR REPLACE TABLE orders (
     created_date TIMESTAMP_NTZ,
     updated_date TIMESTAMP_NTZ,
     _loaded_at TIMESTAMP_NTZ DEFAULT CURRENT_TIMESTAMP()
-);
+)
+CLUSTER BY (order_date, customer_id);
 
 -- Order Lines Table
 CREATE OR REPLACE TABLE order_lines (
@@ -121,7 +127,8 @@ CREATE OR REPLACE TABLE order_lines (
     line_status VARCHAR(50),
     notes TEXT,
     _loaded_at TIMESTAMP_NTZ DEFAULT CURRENT_TIMESTAMP()
-);
+)
+CLUSTER BY (order_id, product_id);
 
 -- Shipments Table
 CREATE OR REPLACE TABLE shipments (
@@ -149,7 +156,8 @@ CREATE OR REPLACE TABLE shipments (
     created_date TIMESTAMP_NTZ,
     updated_date TIMESTAMP_NTZ,
     _loaded_at TIMESTAMP_NTZ DEFAULT CURRENT_TIMESTAMP()
-);
+)
+CLUSTER BY (shipment_date, order_id);
 
 -- Returns Table
 CREATE OR REPLACE TABLE returns (
@@ -176,7 +184,8 @@ CREATE OR REPLACE TABLE returns (
     created_date TIMESTAMP_NTZ,
     updated_date TIMESTAMP_NTZ,
     _loaded_at TIMESTAMP_NTZ DEFAULT CURRENT_TIMESTAMP()
-);
+)
+CLUSTER BY (return_request_date, product_id, customer_id);
 
 -- Waste Table
 CREATE OR REPLACE TABLE waste (
@@ -206,7 +215,8 @@ CREATE OR REPLACE TABLE waste (
     created_date TIMESTAMP_NTZ,
     updated_date TIMESTAMP_NTZ,
     _loaded_at TIMESTAMP_NTZ DEFAULT CURRENT_TIMESTAMP()
-);
+)
+CLUSTER BY (waste_date, product_id);
 
 -- Quality Inspections Table
 CREATE OR REPLACE TABLE quality_inspections (
@@ -244,7 +254,8 @@ CREATE OR REPLACE TABLE quality_inspections (
     created_date TIMESTAMP_NTZ,
     updated_date TIMESTAMP_NTZ,
     _loaded_at TIMESTAMP_NTZ DEFAULT CURRENT_TIMESTAMP()
-);
+)
+CLUSTER BY (inspection_date, product_id);
 
 -- Create foreign key relationships (optional, for data integrity)
 -- Note: These are informational in Snowflake and don't enforce referential integrity